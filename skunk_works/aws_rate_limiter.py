@@ -0,0 +1,158 @@
+import threading
+import time
+from dataclasses import dataclass
+
+THROTTLING_ERROR_CODES = {"Throttling", "ThrottlingException", "RequestLimitExceeded", "TooManyRequestsException", "PriorRequestNotComplete"}
+
+# Requests per second each service may send, keyed by botocore service id.
+DEFAULT_SERVICE_RATES = {
+    "ec2": 20.0,
+    "ssm": 10.0,
+    "route-53": 5.0,
+    "elastic-load-balancing-v2": 10.0,
+}
+
+# Tighter starting rates for the mutating calls the orchestrator fans out; the adaptive rate moves from here.
+DEFAULT_API_RATES = {
+    ("ec2", "RunInstances"): 2.0,
+    ("ec2", "TerminateInstances"): 5.0,
+    ("ec2", "CreateTags"): 10.0,
+    ("ssm", "SendCommand"): 5.0,
+    ("route-53", "ChangeResourceRecordSets"): 2.0,
+    ("route-53", "GetChange"): 5.0,
+}
+
+
+# Data Classes
+@dataclass(kw_only=True)
+class RateLimiterCounters():
+    calls : int = 0
+    throttled : int = 0
+    wait_seconds : float = 0.0
+    rate_per_second : float = 0.0
+
+
+# Support Classes
+class AdaptiveTokenBucket():
+
+
+    def __init__(self, rate_per_second : float, min_rate : float=0.5, backoff_factor : float=0.5, recovery_per_success : float=0.1):
+        self.max_rate = rate_per_second
+        self.rate = rate_per_second
+        self.min_rate = min(min_rate, rate_per_second)
+        self.backoff_factor = backoff_factor
+        self.recovery_per_success = recovery_per_success
+        self.counters = RateLimiterCounters(rate_per_second=rate_per_second)
+        self._tokens = max(1.0, rate_per_second)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def reserve(self) -> float:
+        # Takes a token now, going into debt if needed, and returns how long the caller must sleep to honour it.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.counters.calls += 1
+            self.counters.wait_seconds += delay
+            return delay
+
+
+    def throttled(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            self.counters.throttled += 1
+            self.counters.rate_per_second = self.rate
+
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery_per_success)
+            self.counters.rate_per_second = self.rate
+
+
+class AWSRateLimiter():
+    # One instance is shared by every client an orchestrator creates, so all threads draw from the same buckets.
+
+
+    def __init__(self, service_rates : dict[str, float] | None=None, api_rates : dict[tuple[str, str], float] | None=None, default_rate : float=10.0):
+        self.service_rates = dict(DEFAULT_SERVICE_RATES if service_rates is None else service_rates)
+        self.api_rates = dict(DEFAULT_API_RATES if api_rates is None else api_rates)
+        self.default_rate = default_rate
+        self._lock = threading.Lock()
+        self._service_buckets = {}
+        self._api_buckets = {}
+
+
+    def _buckets(self, service : str, operation : str) -> tuple[AdaptiveTokenBucket, AdaptiveTokenBucket]:
+        with self._lock:
+            if service not in self._service_buckets:
+                self._service_buckets[service] = AdaptiveTokenBucket(self.service_rates.get(service, self.default_rate))
+            if (service, operation) not in self._api_buckets:
+                rate = self.api_rates.get((service, operation), self._service_buckets[service].max_rate)
+                self._api_buckets[(service, operation)] = AdaptiveTokenBucket(rate)
+            return self._service_buckets[service], self._api_buckets[(service, operation)]
+
+
+    def attach(self, client) -> None:
+        # before-send fires once per HTTP attempt, so botocore's own retries are metered too.
+        client.meta.events.register('before-send', self._before_send)
+        client.meta.events.register('needs-retry', self._after_attempt)
+
+
+    @staticmethod
+    def _parse_event_name(event_name : str) -> tuple[str, str]:
+        _, service, operation = event_name.split('.', 2)
+        return service, operation
+
+
+    def reserve(self, service : str, operation : str) -> float:
+        # Returns the delay instead of sleeping, so callers on an event loop can await it.
+        service_bucket, api_bucket = self._buckets(service, operation)
+        return max(service_bucket.reserve(), api_bucket.reserve())
+
+
+    def observe(self, service : str, operation : str, error_code : str) -> None:
+        service_bucket, api_bucket = self._buckets(service, operation)
+        if error_code in THROTTLING_ERROR_CODES:
+            service_bucket.throttled()
+            api_bucket.throttled()
+        elif not error_code:
+            service_bucket.succeeded()
+            api_bucket.succeeded()
+
+
+    def _before_send(self, event_name : str, **kwargs) -> None:
+        delay = self.reserve(*self._parse_event_name(event_name))
+        if delay > 0:
+            time.sleep(delay)
+
+
+    def _after_attempt(self, event_name : str, response=None, **kwargs) -> None:
+        # Observes every attempt and returns None, leaving the retry decision to botocore.
+        if response is None:
+            return
+        self.observe(*self._parse_event_name(event_name), response[1].get('Error', {}).get('Code', ""))
+
+
+    def counters(self) -> dict[str, RateLimiterCounters]:
+        with self._lock:
+            buckets = {f"{service}:{operation}": bucket for (service, operation), bucket in self._api_buckets.items()}
+        return {name: RateLimiterCounters(**vars(bucket.counters)) for name, bucket in sorted(buckets.items())}
+
+
+    def totals(self) -> RateLimiterCounters:
+        totals = RateLimiterCounters()
+        for counters in self.counters().values():
+            totals.calls += counters.calls
+            totals.throttled += counters.throttled
+            totals.wait_seconds += counters.wait_seconds
+        return totals
+
+
+    def print_summary(self) -> None:
+        for name, counters in self.counters().items():
+            print(f"{name}: calls={counters.calls} throttled={counters.throttled} waited={counters.wait_seconds:0.1f}s rate={counters.rate_per_second:0.1f}/s")
@@ -0,0 +1,97 @@
+import getpass
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import mysql.connector.pooling
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+
+OPS_DB_HOST = "opsdb-01.p2.pmstudent.powerschool.host"
+KEYRING_SERVICE = "ops-db"
+
+
+# Data Classes
+@dataclass(kw_only=True)
+class OpsDBCredentials():
+    host : str
+    user : str
+    password : str
+
+
+# Support Functions
+def load_credentials(host : str | None=None) -> OpsDBCredentials:
+    # Environment first, then the keyring, and a prompt only when someone is at a terminal to answer it.
+    host = host or os.environ.get("OPSDB_HOST", OPS_DB_HOST)
+    user = os.environ.get("OPSDB_USER", "")
+    password = os.environ.get("OPSDB_PASSWORD", "")
+    if user and password:
+        return OpsDBCredentials(host=host, user=user, password=password)
+
+    if keyring is not None:
+        if user:
+            password = keyring.get_password(KEYRING_SERVICE, user) or ""
+        else:
+            credential = keyring.get_credential(KEYRING_SERVICE, None)
+            if credential is not None:
+                user, password = credential.username, credential.password
+        if user and password:
+            return OpsDBCredentials(host=host, user=user, password=password)
+
+    if not sys.stdin.isatty():
+        raise RuntimeError(f"No credentials for {host}. Set OPSDB_USER and OPSDB_PASSWORD or store them in the '{KEYRING_SERVICE}' keyring service.")
+    user = user or input("Username: ")
+    password = getpass.getpass()
+    return OpsDBCredentials(host=host, user=user, password=password)
+
+
+# Connection Pool
+class OpsDBPool():
+    # Callers block for a free connection rather than getting PoolError when every connection is checked out.
+
+
+    def __init__(self, credentials : OpsDBCredentials, pool_size : int=5, pool_name : str="ops_db"):
+        self.credentials = credentials
+        self.pool_size = pool_size
+        self._available = threading.BoundedSemaphore(pool_size)
+        self._pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name=pool_name,
+            pool_size=pool_size,
+            pool_reset_session=True,
+            host=credentials.host,
+            user=credentials.user,
+            password=credentials.password,
+            autocommit=True,
+        )
+
+
+    @contextmanager
+    def connection(self):
+        self._available.acquire()
+        try:
+            conn = self._pool.get_connection()
+            try:
+                yield conn
+            finally:
+                # close() hands the connection back to the pool.
+                conn.close()
+        finally:
+            self._available.release()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool(pool_size : int=5) -> OpsDBPool:
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = OpsDBPool(load_credentials(), pool_size=pool_size)
+        return _shared_pool
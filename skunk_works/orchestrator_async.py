@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from contextlib import AsyncExitStack
+from dataclasses import asdict
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from aws_rate_limiter import AWSRateLimiter
+from orchestrator_benchmark import SimulatedAWS, SimulatedAWSProfile
+from orchestrator_metrics import PhaseMetrics, percentile
+from orchestrator_v2 import (
+    SSM_MAX_EXECUTION_TIMEOUT,
+    THROTTLING_ERROR_CODES,
+    CommandStepError,
+    CommandStepResult,
+    PowerSchoolProduct,
+    SISAWSConfiguration,
+    SISOrchestrator,
+    SISTenant,
+    StockRestoreMode,
+    TenantOperationResult,
+    TenantStatus,
+)
+
+# Botocore service ids, which key the shared rate limiter's buckets.
+SERVICE_IDS = {
+    "ec2": "ec2",
+    "ssm": "ssm",
+    "route53": "route-53",
+}
+SSM_TERMINAL_INVOCATION_STATUSES = {"Success", "Failed", "Cancelled", "TimedOut"}
+DECOMMISSION_PROTECTED_STATUSES = {TenantStatus.RESERVE, TenantStatus.RETAIN}
+
+
+# Orchestrators
+class AsyncSISOrchestrator():
+    # Not an Orchestrator: every operation is a coroutine, so it cannot stand in where the synchronous interface is expected.
+
+
+    def __init__(self, session=None, max_pool_connections : int=100, rate_limiter : AWSRateLimiter | None=None,
+                 endpoint_url : str | None=None, poll_delay : float=2.0, max_poll_delay : float=30.0):
+        self.session = session or get_session()
+        self.max_pool_connections = max_pool_connections
+        self.endpoint_url = endpoint_url
+        self.poll_delay = poll_delay
+        self.max_poll_delay = max_poll_delay
+        self.aws_config = SISAWSConfiguration()
+        self.stock_restore_mode = StockRestoreMode.SERIAL
+        # Off only against endpoints with no SSM instance registry, where running instances count as online.
+        self.await_ssm_registration = True
+        self.rate_limiter = rate_limiter or AWSRateLimiter()
+        self.metrics = PhaseMetrics()
+        self.clients = {}
+        self._exit_stack = None
+
+
+    async def __aenter__(self):
+        # One client per service, shared by every tenant coroutine, so they share one connection pool.
+        self._exit_stack = AsyncExitStack()
+        # _call owns retries and rate limiting, so botocore makes a single attempt per call.
+        config = AioConfig(max_pool_connections=self.max_pool_connections, retries={'mode': 'standard', 'max_attempts': 1})
+        for service in ("ec2", "ssm", "route53"):
+            client_arguments = {'region_name': "us-east-1", 'config': config}
+            if self.endpoint_url:
+                client_arguments['endpoint_url'] = self.endpoint_url
+            self.clients[service] = await self._exit_stack.enter_async_context(self.session.create_client(service, **client_arguments))
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+        await self._exit_stack.__aexit__(*exc_info)
+        self.clients = {}
+
+
+    async def _call(self, service : str, operation : str, max_attempts : int=5, **kwargs) -> dict:
+        service_id = SERVICE_IDS[service]
+        api = "".join(part.title() for part in operation.split("_"))
+        delay = self.poll_delay
+        for attempt in range(1, max_attempts + 1):
+            await asyncio.sleep(self.rate_limiter.reserve(service_id, api))
+            try:
+                response = await getattr(self.clients[service], operation)(**kwargs)
+            except Exception as error:
+                error_code = getattr(error, "response", {}).get('Error', {}).get('Code', "")
+                self.rate_limiter.observe(service_id, api, error_code)
+                if error_code not in THROTTLING_ERROR_CODES or attempt == max_attempts:
+                    raise
+                delay = await self._backoff(delay)
+                continue
+            self.rate_limiter.observe(service_id, api, "")
+            return response
+
+
+    async def _backoff(self, delay : float) -> float:
+        await asyncio.sleep(random.uniform(delay / 2, delay))
+        return min(delay * 1.5, self.max_poll_delay)
+
+
+    async def _update_orchestrator_status(self, tenant : SISTenant) -> None:
+        await self._call("ec2", "create_tags",
+            Resources=[tenant.aws_instance_id],
+            Tags=[{'Key': 'OrchestratorTenantStatus', 'Value': f"{tenant.status.value}"}],
+        )
+
+
+    async def _create_instance(self, tenant : SISTenant) -> None:
+        print(f"{tenant.common_name}: Creating EC2 Instance for {tenant.common_name}.")
+        with self.metrics.phase(tenant.common_name, "create_instance"):
+            response = await self._call("ec2", "run_instances",
+                ImageId=self.aws_config.ami_id,
+                MinCount=1,
+                MaxCount=1,
+                InstanceType=self.aws_config.instance_type,
+                KeyName=self.aws_config.key_name,
+                IamInstanceProfile={'Arn': self.aws_config.iam_profile_instance_arn},
+                TagSpecifications=[
+                    {
+                        "ResourceType": "instance",
+                        "Tags": SISOrchestrator._instance_identity_tags(tenant.common_name, self.aws_config) + SISOrchestrator._managed_instance_tags(tenant.status)
+                    },
+                ],
+                SecurityGroupIds=[self.aws_config.security_group_id],
+                SubnetId=self.aws_config.subnet_id,
+            )
+        tenant.aws_instance_id = response['Instances'][0]['InstanceId']
+
+        with self.metrics.phase(tenant.common_name, "wait_until_running"):
+            delay = self.poll_delay
+            while True:
+                reservations = (await self._call("ec2", "describe_instances", InstanceIds=[tenant.aws_instance_id]))['Reservations']
+                instance = reservations[0]['Instances'][0] if reservations else {}
+                if instance.get('State', {}).get('Name') == "running":
+                    break
+                delay = await self._backoff(delay)
+
+        tenant.aws_private_ip = instance.get('PrivateIpAddress', "")
+        tenant.status = TenantStatus.INSTANTIATED
+        await self._update_orchestrator_status(tenant)
+
+
+    async def _await_ssm_availability(self, tenant : SISTenant, deadline_seconds : float=1200.0) -> None:
+        deadline = time.monotonic() + deadline_seconds
+        with self.metrics.phase(tenant.common_name, "await_ssm_availability"):
+            delay = self.poll_delay
+            while not tenant.ssm_available:
+                response = await self._call("ssm", "describe_instance_information",
+                    Filters=[{'Key': 'InstanceIds', 'Values': [tenant.aws_instance_id]}])
+                tenant.ssm_available = any(
+                    information['InstanceId'] == tenant.aws_instance_id and information['PingStatus'] == "Online"
+                    for information in response['InstanceInformationList']
+                )
+                if tenant.ssm_available:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Instance {tenant.aws_instance_id} did not come online in SSM.")
+                delay = await self._backoff(delay)
+
+
+    async def _run_powershell_steps(self, tenant : SISTenant, command_steps : list[dict]) -> list[CommandStepResult]:
+        results = [CommandStepResult.from_step(step) for step in command_steps]
+        response = await self._call("ssm", "send_command",
+            InstanceIds=[tenant.aws_instance_id],
+            DocumentName="AWS-RunPowerShellScript",
+            Parameters={
+                'commands': SISOrchestrator._build_batched_script(command_steps),
+                'executionTimeout': [str(min(SSM_MAX_EXECUTION_TIMEOUT, 3600 * len(command_steps)))],
+            },
+        )
+        command_id = response['Command']['CommandId']
+
+        delay = self.poll_delay
+        while True:
+            delay = await self._backoff(delay)
+            try:
+                invocation = await self._call("ssm", "get_command_invocation", CommandId=command_id, InstanceId=tenant.aws_instance_id)
+            except Exception as error:
+                if getattr(error, "response", {}).get('Error', {}).get('Code') == "InvocationDoesNotExist":
+                    continue
+                raise
+            if invocation['Status'] in SSM_TERMINAL_INVOCATION_STATUSES:
+                break
+
+        SISOrchestrator._apply_step_markers(results, invocation.get('StandardOutputContent', ""))
+        for result in results:
+            if result.status != "Skipped":
+                self.metrics.record(tenant.common_name, f"powershell: {result.key}", result.elapsed_seconds, succeeded=result.completed)
+        if invocation['Status'] != "Success":
+            failed_step = next((result for result in results if not result.completed), results[-1])
+            failed_step.status = "Failed"
+            raise CommandStepError(tenant, results)
+        return results
+
+
+    async def provision_tenant(self, tenant : SISTenant, restore_stock_schema : bool=False, stop_after_provisioning : bool=True) -> None:
+        with self.metrics.phase(tenant.common_name, "provision_tenant"):
+            await self._create_instance(tenant)
+            if self.await_ssm_registration:
+                await self._await_ssm_availability(tenant)
+
+            print(f"{tenant.common_name}: Executing PowerShell Commands")
+            command_steps = SISOrchestrator._post_instantiation_command_steps(tenant.aws_private_ip)
+            if restore_stock_schema:
+                command_steps += SISOrchestrator._restore_stock_database_command_steps(self.stock_restore_mode, self.aws_config)
+            await self._run_powershell_steps(tenant, SISOrchestrator._keyed_steps("provision", command_steps))
+
+            tenant.status = TenantStatus.PENDING_APPLICATION_INSTALLATION
+            await self._update_orchestrator_status(tenant)
+
+            if stop_after_provisioning:
+                print(f"{tenant.common_name}: Stopping Instance")
+                await self._call("ec2", "stop_instances", InstanceIds=[tenant.aws_instance_id])
+
+
+    async def _describe_managed_instances(self, filters : list[dict]) -> list[dict]:
+        instances = []
+        arguments = {'Filters': [{'Name': 'tag:OrchestratorManaged', 'Values': ['True']}] + filters}
+        while True:
+            response = await self._call("ec2", "describe_instances", **arguments)
+            instances += [instance for reservation in response['Reservations'] for instance in reservation['Instances']]
+            if not response.get('NextToken'):
+                return instances
+            arguments['NextToken'] = response['NextToken']
+
+
+    async def decommission_tenant(self, tenant : SISTenant) -> None:
+        # Only orchestrator-managed instances are terminated, and never reserves or retained tenants that share the name.
+        instances = await self._describe_managed_instances([
+            {'Name': 'tag:Name', 'Values': [tenant.common_name]},
+            {'Name': 'tag:OrchestratorTenantStatus', 'Values': [status.value for status in TenantStatus if status not in DECOMMISSION_PROTECTED_STATUSES]},
+            {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']},
+        ])
+        instance_ids = [instance['InstanceId'] for instance in instances]
+        if not instance_ids:
+            print(f"{tenant.common_name}: No Instance with Name: {tenant.common_name}.")
+            return
+        print(f"{tenant.common_name}: Terminating Instance(s) {', '.join(instance_ids)}")
+        await self._call("ec2", "terminate_instances", InstanceIds=instance_ids)
+
+
+    async def list_tenants(self) -> list[SISTenant]:
+        tenants = []
+        for instance in await self._describe_managed_instances([]):
+            tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+            try:
+                status = TenantStatus(tags.get('OrchestratorTenantStatus'))
+            except ValueError:
+                status = TenantStatus.ACTIVE
+            tenants.append(SISTenant(
+                common_name=tags.get('Name', instance['InstanceId']),
+                product=PowerSchoolProduct.SIS,
+                status=status,
+                aws_instance_id=instance['InstanceId'],
+                aws_private_ip=instance.get('PrivateIpAddress', ""),
+            ))
+        return tenants
+
+
+    async def _publish_dns_batch(self, results : list[TenantOperationResult], timeout_seconds : float) -> None:
+        # UPSERTs count twice against Route53's 1000 record-element limit per change batch, hence batches of 500.
+        changes = [
+            {
+                'Action': 'UPSERT',
+                'ResourceRecordSet': {
+                    'Name': f"{result.tenant.common_name}.{self.aws_config.domain_name}",
+                    'Type': 'A',
+                    'TTL': 300,
+                    'ResourceRecords': [{'Value': self.aws_config.public_endpoint_ip}],
+                },
+            }
+            for result in results
+        ]
+        try:
+            response = await self._call("route53", "change_resource_record_sets",
+                HostedZoneId=self.aws_config.hosted_zone_id,
+                ChangeBatch={'Comment': 'Orchestrator DNS update', 'Changes': changes},
+            )
+        except Exception as error:
+            error_code = getattr(error, "response", {}).get('Error', {}).get('Code', "")
+            if error_code == 'InvalidChangeBatch' and len(results) > 1:
+                # One bad record rejects the whole batch; bisect so only its own tenant fails.
+                middle = len(results) // 2
+                await asyncio.gather(self._publish_dns_batch(results[:middle], timeout_seconds), self._publish_dns_batch(results[middle:], timeout_seconds))
+            else:
+                self._fail_dns_publish(results, error)
+            return
+
+        try:
+            change_info = response['ChangeInfo']
+            deadline = time.monotonic() + timeout_seconds
+            delay = self.poll_delay
+            while change_info['Status'] != "INSYNC":
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Route53 change {change_info['Id']} was not INSYNC after {timeout_seconds:0.0f}s.")
+                delay = await self._backoff(delay)
+                change_info = (await self._call("route53", "get_change", Id=change_info['Id']))['ChangeInfo']
+        except Exception as error:
+            self._fail_dns_publish(results, error)
+
+
+    def _fail_dns_publish(self, results : list[TenantOperationResult], error : Exception) -> None:
+        # A failed batch fails only its own tenants.
+        for result in results:
+            result.succeeded = False
+            result.error = f"DNS publish failed. {type(error).__name__}: {error}"
+            print(f"{result.tenant.common_name}: {result.error}")
+
+
+    async def _publish_dns(self, results : list[TenantOperationResult], timeout_seconds : float=600.0) -> None:
+        with self.metrics.phase("fleet", "dns_update"):
+            await asyncio.gather(*(self._publish_dns_batch(results[i:i + 500], timeout_seconds) for i in range(0, len(results), 500)))
+
+
+    async def provision_tenants(self, tenants : list[SISTenant], max_concurrency : int=50, update_dns : bool=True, **kwargs) -> list[TenantOperationResult]:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(tenant : SISTenant) -> TenantOperationResult:
+            result = TenantOperationResult(tenant=tenant, operation="provision")
+            tic = time.perf_counter()
+            async with semaphore:
+                try:
+                    await self.provision_tenant(tenant, **kwargs)
+                    result.succeeded = True
+                except Exception as error:
+                    result.error = f"{type(error).__name__}: {error}"
+                    print(f"{tenant.common_name}: provision failed. {result.error}")
+            result.elapsed_seconds = time.perf_counter() - tic
+            return result
+
+        results = await asyncio.gather(*(run(tenant) for tenant in tenants))
+        if update_dns:
+            await self._publish_dns([result for result in results if result.succeeded])
+        return list(results)
+
+
+# Actions
+async def seed_moto_endpoint(orchestrator : AsyncSISOrchestrator) -> None:
+    # A bare moto server has none of the account's fixtures, so stand-ins are created (or reused) and aws_config points at them.
+    aws_config = orchestrator.aws_config
+    async with orchestrator.session.create_client("iam", region_name="us-east-1", endpoint_url=orchestrator.endpoint_url) as iam_client:
+        try:
+            instance_profile = (await iam_client.create_instance_profile(InstanceProfileName="SE-Orchestrator"))['InstanceProfile']
+        except Exception as error:
+            if getattr(error, "response", {}).get('Error', {}).get('Code') != 'EntityAlreadyExists':
+                raise
+            instance_profile = (await iam_client.get_instance_profile(InstanceProfileName="SE-Orchestrator"))['InstanceProfile']
+    aws_config.iam_profile_instance_arn = instance_profile['Arn']
+    aws_config.ami_id = (await orchestrator._call("ec2", "describe_images", Owners=["amazon"]))['Images'][0]['ImageId']
+    aws_config.subnet_id = (await orchestrator._call("ec2", "describe_subnets"))['Subnets'][0]['SubnetId']
+    aws_config.security_group_id = (await orchestrator._call("ec2", "describe_security_groups", GroupNames=["default"]))['SecurityGroups'][0]['GroupId']
+    if not (await orchestrator._call("ec2", "describe_key_pairs", Filters=[{'Name': 'key-name', 'Values': [aws_config.key_name]}]))['KeyPairs']:
+        await orchestrator._call("ec2", "create_key_pair", KeyName=aws_config.key_name)
+
+    hosted_zones = (await orchestrator._call("route53", "list_hosted_zones_by_name", DNSName=aws_config.domain_name))['HostedZones']
+    hosted_zone = next((zone for zone in hosted_zones if zone['Name'].rstrip('.') == aws_config.domain_name), None)
+    if hosted_zone is None:
+        hosted_zone = (await orchestrator._call("route53", "create_hosted_zone", Name=aws_config.domain_name, CallerReference=uuid.uuid4().hex))['HostedZone']
+    aws_config.hosted_zone_id = hosted_zone['Id'].split("/")[-1]
+
+    # moto has no SSM instance registry (DescribeInstanceInformation is not implemented).
+    orchestrator.await_ssm_registration = False
+
+
+async def run_benchmark(concurrency : int, session, endpoint_url : str | None, poll_delay : float) -> dict:
+    tenants = [SISTenant(common_name=f"bench-{concurrency}-{index}", product=PowerSchoolProduct.SIS) for index in range(concurrency)]
+    async with AsyncSISOrchestrator(session=session, endpoint_url=endpoint_url, poll_delay=poll_delay) as orchestrator:
+        if endpoint_url:
+            await seed_moto_endpoint(orchestrator)
+        tic = time.perf_counter()
+        results = await orchestrator.provision_tenants(tenants, max_concurrency=concurrency)
+        wall_seconds = time.perf_counter() - tic
+
+    elapsed = [result.elapsed_seconds for result in results if result.succeeded]
+    totals = orchestrator.rate_limiter.totals()
+    return {
+        "concurrency": concurrency,
+        "succeeded": len(elapsed),
+        "wall_seconds": wall_seconds,
+        "tenants_per_hour": len(elapsed) / wall_seconds * 3600 if wall_seconds else 0.0,
+        "p50_seconds": percentile(elapsed, 0.50),
+        "p95_seconds": percentile(elapsed, 0.95),
+        "api_calls_per_tenant": totals.calls / max(1, len(tenants)),
+        "rate_limit_wait_seconds": totals.wait_seconds,
+        "throttled_calls": totals.throttled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure async SIS provisioning throughput against the simulated backend or a local moto server.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--endpoint-url", help="Local moto server, e.g. http://127.0.0.1:5000. Uses the simulated backend when omitted.")
+    parser.add_argument("--poll-delay", type=float, default=0.5)
+    defaults = SimulatedAWSProfile(boot_seconds=2.0, ssm_seconds=3.0, dns_insync_seconds=2.0)
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    arguments = parser.parse_args()
+
+    profile = SimulatedAWSProfile(**{name: getattr(arguments, name) for name in asdict(defaults)})
+    for concurrency in arguments.concurrency:
+        session = get_session() if arguments.endpoint_url else SimulatedAWS(profile)
+        report = asyncio.run(run_benchmark(concurrency, session, arguments.endpoint_url, arguments.poll_delay))
+        print(
+            f"concurrency={report['concurrency']} succeeded={report['succeeded']} wall={report['wall_seconds']:0.1f}s "
+            f"tenants/hour={report['tenants_per_hour']:0.0f} p50={report['p50_seconds']:0.1f}s p95={report['p95_seconds']:0.1f}s "
+            f"api_calls/tenant={report['api_calls_per_tenant']:0.1f} rate_limit_wait={report['rate_limit_wait_seconds']:0.1f}s "
+            f"throttled={report['throttled_calls']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,933 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from botocore.exceptions import ClientError, WaiterError
+from orchestrator_metrics import percentile
+from orchestrator_v2 import ALBHostRouter, PowerSchoolProduct, RecycleStrategy, SISOrchestrator, SISTenant, TenantStatus
+
+SCRIPT_STEP_PATTERN = re.compile(r"ORCHESTRATOR_STEP\|(\d+)\|")
+SCRIPT_COMMAND_PATTERN = re.compile(r"^\s*\$stepOutput = & \{ (.*) \} \| Out-String$", re.DOTALL)
+SCRIPT_WARNING_PATTERN = re.compile(r"@\(([\d, ]+)\) -notcontains")
+THROTTLING_CODES = {
+    "ec2": "RequestLimitExceeded",
+    "ssm": "ThrottlingException",
+    "route53": "Throttling",
+    "elbv2": "Throttling",
+}
+SSM_FAILED_STATUSES = {"Failed", "Cancelled", "TimedOut"}
+SERVICE_IDS = {
+    "ec2": "ec2",
+    "ssm": "ssm",
+    "route53": "route-53",
+    "elbv2": "elastic-load-balancing-v2",
+}
+PAGINATION_TOKENS = {
+    "NextToken": "NextToken",
+    "NextRecordName": "StartRecordName",
+    "NextRecordType": "StartRecordType",
+}
+
+
+# Data Classes
+@dataclass(kw_only=True)
+class SimulatedAWSProfile():
+    call_latency : float = 0.05
+    requests_per_second : float = 20.0
+    throttle_probability : float = 0.0
+    max_attempts : int = 5
+    boot_seconds : float = 20.0
+    ssm_seconds : float = 30.0
+    stop_seconds : float = 10.0
+    step_seconds : float = 0.5
+    step_failure_probability : float = 0.0
+    snapshot_seconds : float = 30.0
+    replace_root_seconds : float = 60.0
+    dns_insync_seconds : float = 10.0
+    health_check_seconds : float = 20.0
+
+
+@dataclass(kw_only=True)
+class BenchmarkReport():
+    scenario : str
+    strategy : str
+    tenants : int
+    concurrency : int
+    profile : dict
+    alb_routing : bool = False
+    keep_running : bool = False
+    bulk_launch : bool = False
+    started_at : str = ""
+    succeeded : int = 0
+    wall_seconds : float = 0.0
+    tenants_per_hour : float = 0.0
+    p50_seconds : float = 0.0
+    p95_seconds : float = 0.0
+    p99_seconds : float = 0.0
+    max_seconds : float = 0.0
+    api_calls_per_tenant : float = 0.0
+    throttled_calls : int = 0
+    rate_limit_wait_seconds : float = 0.0
+    api_calls : dict = field(default_factory=dict)
+    phase_p95_seconds : dict = field(default_factory=dict)
+
+
+# Simulated AWS
+class SimulatedAWS():
+    # Thread-safe in-memory EC2, SSM, Route53 and ELBv2 with per-call latency, per-API rate limits and simulated lifecycles.
+
+
+    def __init__(self, profile : SimulatedAWSProfile | None=None):
+        self.profile = profile or SimulatedAWSProfile()
+        self._lock = threading.RLock()
+        self._buckets = {}
+        self.calls = {}
+        self.throttled = {}
+        self.instances = {}
+        self.commands = {}
+        self.snapshots = {}
+        self.root_volume_tasks = {}
+        self.dns_changes = {}
+        self.record_sets = {}
+        self.target_groups = {}
+        self.targets = {}
+        self.rules = {}
+        self.addresses = {}
+        self.launch_templates = {}
+        # Optional (instance_id, command) -> exit code, for tests that model what a step does on the instance.
+        self.command_handler = None
+
+
+    def session(self):
+        return SimulatedSession(self)
+
+
+    def _admit(self, api : str) -> bool:
+        # Each API gets its own bucket, the way AWS meters request rates per action.
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(api, (self.profile.requests_per_second, now))
+        tokens = min(self.profile.requests_per_second, tokens + (now - updated_at) * self.profile.requests_per_second)
+        admitted = tokens >= 1 and random.random() >= self.profile.throttle_probability
+        self._buckets[api] = (tokens - 1 if admitted else tokens, now)
+        return admitted
+
+
+    def _attempt(self, service : str, operation : str, handler, kwargs : dict) -> tuple[dict | None, ClientError | None]:
+        api = f"{service}:{operation}"
+        with self._lock:
+            self.calls[api] = self.calls.get(api, 0) + 1
+            if not self._admit(api):
+                self.throttled[api] = self.throttled.get(api, 0) + 1
+                return None, ClientError({'Error': {'Code': THROTTLING_CODES[service], 'Message': "Rate exceeded"}}, operation)
+            try:
+                return handler(**kwargs), None
+            except ClientError as error:
+                return None, error
+
+
+    def call(self, service : str, operation : str, handler, kwargs : dict, events=None) -> dict:
+        # Same event names botocore emits, so anything hooked onto a real client's meta.events sees the same traffic.
+        event_suffix = f"{SERVICE_IDS[service]}.{''.join(part.title() for part in operation.split('_'))}"
+        for attempt in range(1, self.profile.max_attempts + 1):
+            if events is not None:
+                events.emit(f"before-send.{event_suffix}", request=None)
+            time.sleep(random.uniform(self.profile.call_latency / 2, self.profile.call_latency * 1.5))
+            response, error = self._attempt(service, operation, handler, kwargs)
+            if events is not None:
+                events.emit(f"needs-retry.{event_suffix}", response=(None, error.response if error else response), attempts=attempt, caught_exception=None)
+            if error is None:
+                return response
+            if error.response['Error']['Code'] != THROTTLING_CODES[service] or attempt == self.profile.max_attempts:
+                raise error
+            # Mirrors botocore's legacy retry handler: exponential backoff with full jitter.
+            time.sleep(random.random() * 2 ** (attempt - 1))
+
+
+    async def call_async(self, service : str, operation : str, handler, kwargs : dict) -> dict:
+        # One attempt per call, like an aiobotocore client with retries off; the caller owns retrying.
+        await asyncio.sleep(random.uniform(self.profile.call_latency / 2, self.profile.call_latency * 1.5))
+        response, error = self._attempt(service, operation, handler, kwargs)
+        if error is not None:
+            raise error
+        return response
+
+
+    def create_client(self, service : str, **kwargs):
+        # Lets the backend stand in for an aiobotocore session.
+        return AsyncSimulatedClient(self, service)
+
+
+    def _advance(self, instance : dict) -> dict:
+        now = time.monotonic()
+        state = instance['State']['Name']
+        if state == 'pending' and now >= instance['TransitionAt']:
+            instance['State'] = {'Name': 'running'}
+        elif state == 'stopping' and now >= instance['TransitionAt']:
+            instance['State'] = {'Name': 'stopped'}
+        elif state == 'shutting-down' and now >= instance['TransitionAt']:
+            instance['State'] = {'Name': 'terminated'}
+        return instance
+
+
+    def _ssm_online(self, instance : dict) -> bool:
+        return self._advance(instance)['State']['Name'] == 'running' and time.monotonic() >= instance['SsmOnlineAt']
+
+
+    def _launch(self, tags : list[dict], running : bool=False) -> dict:
+        now = time.monotonic()
+        instance_id = f"i-{uuid.uuid4().hex[:17]}"
+        instance = {
+            'InstanceId': instance_id,
+            'PrivateIpAddress': f"10.0.{random.randint(0, 255)}.{random.randint(1, 254)}",
+            'PublicIpAddress': f"54.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}",
+            'LaunchTime': datetime.now(timezone.utc),
+            'RootDeviceName': "/dev/sda1",
+            'BlockDeviceMappings': [{'DeviceName': "/dev/sda1", 'Ebs': {'VolumeId': f"vol-{uuid.uuid4().hex[:17]}"}}],
+            'Tags': list(tags),
+            'State': {'Name': 'running' if running else 'pending'},
+            'TransitionAt': now if running else now + self.profile.boot_seconds,
+            'SsmOnlineAt': now if running else now + self.profile.boot_seconds + self.profile.ssm_seconds,
+        }
+        self.instances[instance_id] = instance
+        return instance
+
+
+    def seed_tenant(self, common_name : str, status : TenantStatus=TenantStatus.ACTIVE, domain_name : str="powerschoolsales.com",
+                    public_endpoint_ip : str="107.21.33.158", alb_routing : bool=False) -> str:
+        # Seeded tenants are already running, online in SSM, baselined and published, and cost no API calls.
+        # With alb_routing they are published the way _add_alb_route leaves them: a target group, a host rule and an alias record.
+        with self._lock:
+            snapshot_id = f"snap-{uuid.uuid4().hex[:17]}"
+            self.snapshots[snapshot_id] = {'SnapshotId': snapshot_id, 'State': 'completed', 'CompletesAt': time.monotonic()}
+            instance = self._launch([
+                {'Key': 'Name', 'Value': common_name},
+                {'Key': 'OrchestratorManaged', 'Value': "True"},
+                {'Key': 'OrchestratorTenantStatus', 'Value': status.value},
+                {'Key': 'OrchestratorBaselineSnapshot', 'Value': snapshot_id},
+            ], running=True)
+            hostname = f"{common_name}.{domain_name}".lower()
+            if alb_routing:
+                target_group_arn = self._elbv2_create_target_group(Name=ALBHostRouter.target_group_name(common_name))['TargetGroups'][0]['TargetGroupArn']
+                self.targets[target_group_arn][instance['InstanceId']] = time.monotonic()
+                instance['Tags'].append({'Key': 'OrchestratorTargetGroupArn', 'Value': target_group_arn})
+                self._elbv2_create_rule(
+                    Priority=max((rule['Priority'] for rule in self.rules.values()), default=0) + 1,
+                    Conditions=[{'Field': 'host-header', 'HostHeaderConfig': {'Values': [hostname]}}],
+                    Actions=[{'Type': 'forward', 'TargetGroupArn': target_group_arn}],
+                )
+                load_balancer = self._elbv2_describe_load_balancers(LoadBalancerArns=[""])['LoadBalancers'][0]
+                record = {'AliasTarget': {'HostedZoneId': load_balancer['CanonicalHostedZoneId'], 'DNSName': load_balancer['DNSName'], 'EvaluateTargetHealth': False}}
+            else:
+                record = {'TTL': 300, 'ResourceRecords': [{'Value': public_endpoint_ip}]}
+            self.record_sets[(hostname, 'A')] = {'Name': f"{hostname}.", 'Type': 'A', **record}
+            allocation_id = f"eipalloc-{uuid.uuid4().hex[:17]}"
+            self.addresses[allocation_id] = {
+                'AllocationId': allocation_id,
+                'AssociationId': f"eipassoc-{uuid.uuid4().hex[:17]}",
+                'PublicIp': instance['PublicIpAddress'],
+                'InstanceId': instance['InstanceId'],
+            }
+            return instance['InstanceId']
+
+
+    # EC2
+    def _ec2_run_instances(self, MinCount : int=1, MaxCount : int=1, TagSpecifications : list[dict] | None=None, **kwargs) -> dict:
+        tags = next((spec['Tags'] for spec in TagSpecifications or [] if spec['ResourceType'] == 'instance'), [])
+        instances = [self._launch(tags) for _ in range(MaxCount)]
+        return {'Instances': [self._describe(instance) for instance in instances]}
+
+
+    def _describe(self, instance : dict) -> dict:
+        return {key: value for key, value in self._advance(instance).items() if key not in ('TransitionAt', 'SsmOnlineAt')}
+
+
+    def _matches(self, instance : dict, filters : list[dict]) -> bool:
+        tags = {tag['Key']: tag['Value'] for tag in instance['Tags']}
+        for instance_filter in filters:
+            name, values = instance_filter['Name'], instance_filter['Values']
+            if name.startswith('tag:') and tags.get(name[4:]) not in values:
+                return False
+            if name == 'instance-state-name' and instance['State']['Name'] not in values:
+                return False
+            if name == 'instance-id' and instance['InstanceId'] not in values:
+                return False
+        return True
+
+
+    def _ec2_describe_instances(self, InstanceIds : list[str] | None=None, Filters : list[dict] | None=None, **kwargs) -> dict:
+        if InstanceIds:
+            missing = [instance_id for instance_id in InstanceIds if instance_id not in self.instances]
+            if missing:
+                raise ClientError({'Error': {'Code': 'InvalidInstanceID.NotFound', 'Message': f"The instance IDs '{', '.join(missing)}' do not exist"}}, 'DescribeInstances')
+            candidates = [self.instances[instance_id] for instance_id in InstanceIds]
+        else:
+            candidates = list(self.instances.values())
+        instances = [self._describe(instance) for instance in candidates if self._matches(self._advance(instance), Filters or [])]
+        return {'Reservations': [{'Instances': [instance]} for instance in instances]}
+
+
+    def _ec2_create_tags(self, Resources : list[str], Tags : list[dict], **kwargs) -> dict:
+        keys = {tag['Key'] for tag in Tags}
+        for resource_id in Resources:
+            instance = self.instances.get(resource_id)
+            if instance is not None:
+                instance['Tags'] = [tag for tag in instance['Tags'] if tag['Key'] not in keys] + list(Tags)
+        return {}
+
+
+    def _ec2_describe_tags(self, Filters : list[dict], **kwargs) -> dict:
+        criteria = {instance_filter['Name']: instance_filter['Values'] for instance_filter in Filters}
+        tags = []
+        for instance_id in criteria.get('resource-id', list(self.instances)):
+            instance = self.instances.get(instance_id)
+            for tag in instance['Tags'] if instance else []:
+                if 'key' not in criteria or tag['Key'] in criteria['key']:
+                    tags.append({'ResourceId': instance_id, 'ResourceType': 'instance', **tag})
+        return {'Tags': tags}
+
+
+    def _set_state(self, instance_ids : list[str], allowed : set[str], state : str, seconds : float) -> dict:
+        for instance_id in instance_ids:
+            instance = self._advance(self.instances[instance_id])
+            if instance['State']['Name'] not in allowed:
+                continue
+            instance['State'] = {'Name': state}
+            instance['TransitionAt'] = time.monotonic() + seconds
+            if state == 'pending':
+                instance['SsmOnlineAt'] = instance['TransitionAt'] + self.profile.ssm_seconds
+        return {}
+
+
+    def _ec2_start_instances(self, InstanceIds : list[str], **kwargs) -> dict:
+        return self._set_state(InstanceIds, {'stopped'}, 'pending', self.profile.boot_seconds)
+
+
+    def _ec2_stop_instances(self, InstanceIds : list[str], **kwargs) -> dict:
+        return self._set_state(InstanceIds, {'pending', 'running'}, 'stopping', self.profile.stop_seconds)
+
+
+    def _ec2_terminate_instances(self, InstanceIds : list[str], **kwargs) -> dict:
+        self._set_state(InstanceIds, {'pending', 'running', 'stopping', 'stopped'}, 'shutting-down', self.profile.stop_seconds)
+        return {'TerminatingInstances': [{'InstanceId': instance_id, 'CurrentState': self.instances[instance_id]['State']} for instance_id in InstanceIds]}
+
+
+    def _ec2_create_launch_template(self, LaunchTemplateName : str, LaunchTemplateData : dict, **kwargs) -> dict:
+        self.launch_templates[LaunchTemplateName] = {'Versions': [dict(LaunchTemplateData)], 'DefaultVersion': 1}
+        return {'LaunchTemplate': {'LaunchTemplateName': LaunchTemplateName, 'DefaultVersionNumber': 1, 'LatestVersionNumber': 1}}
+
+
+    def _ec2_describe_launch_template_versions(self, LaunchTemplateName : str, **kwargs) -> dict:
+        template = self.launch_templates.get(LaunchTemplateName)
+        if template is None:
+            raise ClientError({'Error': {'Code': 'InvalidLaunchTemplateName.NotFoundException', 'Message': f"The specified launch template, with template name {LaunchTemplateName}, does not exist."}}, 'DescribeLaunchTemplateVersions')
+        version = template['DefaultVersion']
+        return {'LaunchTemplateVersions': [{'VersionNumber': version, 'DefaultVersion': True, 'LaunchTemplateData': dict(template['Versions'][version - 1])}]}
+
+
+    def _ec2_create_launch_template_version(self, LaunchTemplateName : str, LaunchTemplateData : dict, **kwargs) -> dict:
+        versions = self.launch_templates[LaunchTemplateName]['Versions']
+        versions.append(dict(LaunchTemplateData))
+        return {'LaunchTemplateVersion': {'LaunchTemplateName': LaunchTemplateName, 'VersionNumber': len(versions)}}
+
+
+    def _ec2_modify_launch_template(self, LaunchTemplateName : str, DefaultVersion : str, **kwargs) -> dict:
+        self.launch_templates[LaunchTemplateName]['DefaultVersion'] = int(DefaultVersion)
+        return {'LaunchTemplate': {'LaunchTemplateName': LaunchTemplateName, 'DefaultVersionNumber': int(DefaultVersion)}}
+
+
+    def _ec2_describe_addresses(self, Filters : list[dict] | None=None, **kwargs) -> dict:
+        criteria = {address_filter['Name']: address_filter['Values'] for address_filter in Filters or []}
+        return {'Addresses': [
+            dict(address) for address in self.addresses.values()
+            if 'instance-id' not in criteria or address.get('InstanceId') in criteria['instance-id']
+        ]}
+
+
+    def _ec2_disassociate_address(self, AssociationId : str, **kwargs) -> dict:
+        for address in self.addresses.values():
+            if address.get('AssociationId') == AssociationId:
+                address.pop('AssociationId')
+                address.pop('InstanceId')
+                return {}
+        raise ClientError({'Error': {'Code': 'InvalidAssociationID.NotFound', 'Message': f"The association ID '{AssociationId}' does not exist"}}, 'DisassociateAddress')
+
+
+    def _ec2_create_snapshot(self, VolumeId : str, **kwargs) -> dict:
+        snapshot_id = f"snap-{uuid.uuid4().hex[:17]}"
+        self.snapshots[snapshot_id] = {'SnapshotId': snapshot_id, 'VolumeId': VolumeId, 'State': 'pending', 'CompletesAt': time.monotonic() + self.profile.snapshot_seconds}
+        return {'SnapshotId': snapshot_id, 'State': 'pending'}
+
+
+    def _ec2_describe_snapshots(self, SnapshotIds : list[str], **kwargs) -> dict:
+        snapshots = []
+        for snapshot_id in SnapshotIds:
+            snapshot = self.snapshots[snapshot_id]
+            if time.monotonic() >= snapshot['CompletesAt']:
+                snapshot['State'] = 'completed'
+            snapshots.append({'SnapshotId': snapshot_id, 'State': snapshot['State']})
+        return {'Snapshots': snapshots}
+
+
+    def _ec2_create_replace_root_volume_task(self, InstanceId : str, **kwargs) -> dict:
+        instance = self._advance(self.instances[InstanceId])
+        if instance['State']['Name'] != 'running':
+            raise ClientError({'Error': {'Code': 'IncorrectInstanceState', 'Message': "The instance must be running."}}, 'CreateReplaceRootVolumeTask')
+        task_id = f"replacevol-{uuid.uuid4().hex[:17]}"
+        completes_at = time.monotonic() + self.profile.replace_root_seconds
+        self.root_volume_tasks[task_id] = completes_at
+        # The instance reboots onto the new root volume, so the SSM agent drops off until it restarts.
+        instance['SsmOnlineAt'] = completes_at + self.profile.ssm_seconds
+        return {'ReplaceRootVolumeTask': {'ReplaceRootVolumeTaskId': task_id, 'TaskState': 'pending'}}
+
+
+    def _ec2_describe_replace_root_volume_tasks(self, ReplaceRootVolumeTaskIds : list[str], **kwargs) -> dict:
+        return {'ReplaceRootVolumeTasks': [
+            {'ReplaceRootVolumeTaskId': task_id, 'TaskState': 'succeeded' if time.monotonic() >= self.root_volume_tasks[task_id] else 'in-progress'}
+            for task_id in ReplaceRootVolumeTaskIds
+        ]}
+
+
+    # SSM
+    def _ssm_describe_instance_information(self, Filters : list[dict] | None=None, **kwargs) -> dict:
+        criteria = {instance_filter['Key']: instance_filter['Values'] for instance_filter in Filters or []}
+        return {'InstanceInformationList': [
+            {'InstanceId': instance_id, 'PingStatus': 'Online'}
+            for instance_id in criteria.get('InstanceIds', list(self.instances))
+            if instance_id in self.instances and self._ssm_online(self.instances[instance_id])
+        ]}
+
+
+    def _ssm_send_command(self, Parameters : dict, InstanceIds : list[str] | None=None, Targets : list[dict] | None=None, **kwargs) -> dict:
+        if Targets:
+            filters = [{'Name': target['Key'], 'Values': target['Values']} for target in Targets]
+            InstanceIds = [instance_id for instance_id, instance in self.instances.items() if self._matches(self._advance(instance), filters)]
+        steps = _script_steps(Parameters['commands'])
+
+        command_id = str(uuid.uuid4())
+        invocations = {}
+        for instance_id in InstanceIds:
+            if not self._ssm_online(self.instances[instance_id]):
+                invocations[instance_id] = {'CompletesAt': time.monotonic(), 'Status': 'Failed', 'StatusDetails': 'Undeliverable', 'ResponseCode': -1, 'Output': ""}
+                continue
+            lines, exit_code = [], 0
+            for index, command, warning_exit_codes in steps:
+                if self.command_handler is not None:
+                    exit_code = self.command_handler(instance_id, command)
+                else:
+                    exit_code = 1 if random.random() < self.profile.step_failure_probability else 0
+                lines.append(f"ORCHESTRATOR_STEP|{index}|{exit_code}|{int(self.profile.step_seconds * 1000)}")
+                if exit_code in warning_exit_codes:
+                    exit_code = 0
+                if exit_code:
+                    lines.append("Simulated step failure.")
+                    break
+            invocations[instance_id] = {
+                'CompletesAt': time.monotonic() + self.profile.step_seconds * len(lines),
+                'Status': 'Failed' if exit_code else 'Success',
+                'StatusDetails': 'Failed' if exit_code else 'Success',
+                'ResponseCode': exit_code,
+                'Output': "\n".join(lines),
+            }
+        self.commands[command_id] = invocations
+        return {'Command': {'CommandId': command_id, 'Status': 'Pending', 'TargetCount': len(invocations)}}
+
+
+    def _invocation_status(self, invocation : dict) -> str:
+        return invocation['Status'] if time.monotonic() >= invocation['CompletesAt'] else 'InProgress'
+
+
+    def _ssm_get_command_invocation(self, CommandId : str, InstanceId : str, **kwargs) -> dict:
+        invocation = self.commands.get(CommandId, {}).get(InstanceId)
+        if invocation is None:
+            raise ClientError({'Error': {'Code': 'InvocationDoesNotExist', 'Message': ""}}, 'GetCommandInvocation')
+        status = self._invocation_status(invocation)
+        finished = status != 'InProgress'
+        return {
+            'CommandId': CommandId,
+            'InstanceId': InstanceId,
+            'Status': status,
+            'StatusDetails': invocation['StatusDetails'] if finished else status,
+            'ResponseCode': invocation['ResponseCode'] if finished else -1,
+            'StandardOutputContent': invocation['Output'] if finished else "",
+            'StandardErrorContent': "",
+        }
+
+
+    def _ssm_list_commands(self, CommandId : str, **kwargs) -> dict:
+        statuses = {self._invocation_status(invocation) for invocation in self.commands[CommandId].values()}
+        if 'InProgress' in statuses:
+            status = 'InProgress'
+        else:
+            status = 'Failed' if statuses & SSM_FAILED_STATUSES else 'Success'
+        return {'Commands': [{'CommandId': CommandId, 'Status': status}]}
+
+
+    def _ssm_list_command_invocations(self, CommandId : str, Details : bool=False, **kwargs) -> dict:
+        invocations = []
+        for instance_id, invocation in self.commands[CommandId].items():
+            status = self._invocation_status(invocation)
+            invocations.append({
+                'CommandId': CommandId,
+                'InstanceId': instance_id,
+                'Status': status,
+                'StatusDetails': invocation['StatusDetails'] if status != 'InProgress' else status,
+                'CommandPlugins': [{'Output': invocation['Output'] if status != 'InProgress' else ""}] if Details else [],
+            })
+        return {'CommandInvocations': invocations}
+
+
+    # Route53
+    def _route53_change_resource_record_sets(self, HostedZoneId : str, ChangeBatch : dict, **kwargs) -> dict:
+        staged = dict(self.record_sets)
+        for change in ChangeBatch['Changes']:
+            record_set = change['ResourceRecordSet']
+            key = (record_set['Name'].rstrip('.').lower(), record_set['Type'])
+            if change['Action'] == 'DELETE':
+                if key not in staged:
+                    raise ClientError({'Error': {'Code': 'InvalidChangeBatch', 'Message': f"Tried to delete resource record set [name='{key[0]}', type='{key[1]}'] but it was not found"}}, 'ChangeResourceRecordSets')
+                if {name: value for name, value in record_set.items() if name != 'Name'} != {name: value for name, value in staged[key].items() if name != 'Name'}:
+                    raise ClientError({'Error': {'Code': 'InvalidChangeBatch', 'Message': f"Tried to delete resource record set [name='{key[0]}', type='{key[1]}'] but the values provided do not match the current values"}}, 'ChangeResourceRecordSets')
+                staged.pop(key)
+            else:
+                staged[key] = {**record_set, 'Name': f"{key[0]}."}
+        self.record_sets = staged
+        change_id = f"/change/C{uuid.uuid4().hex[:12].upper()}"
+        self.dns_changes[change_id] = time.monotonic() + self.profile.dns_insync_seconds
+        return {'ChangeInfo': {'Id': change_id, 'Status': 'PENDING'}}
+
+
+    def _route53_list_resource_record_sets(self, StartRecordName : str="", StartRecordType : str="", MaxItems : str='300', **kwargs) -> dict:
+        start = (StartRecordName.rstrip('.').lower(), StartRecordType)
+        keys = sorted(key for key in self.record_sets if key >= start)
+        page = {'ResourceRecordSets': [self.record_sets[key] for key in keys[:int(MaxItems)]], 'IsTruncated': len(keys) > int(MaxItems)}
+        if page['IsTruncated']:
+            page['NextRecordName'], page['NextRecordType'] = keys[int(MaxItems)]
+        return page
+
+
+    def _route53_get_change(self, Id : str, **kwargs) -> dict:
+        return {'ChangeInfo': {'Id': Id, 'Status': 'INSYNC' if time.monotonic() >= self.dns_changes[Id] else 'PENDING'}}
+
+
+    # ELBv2
+    def _elbv2_describe_load_balancers(self, LoadBalancerArns : list[str], **kwargs) -> dict:
+        return {'LoadBalancers': [
+            {'LoadBalancerArn': arn, 'DNSName': "simulated-alb-0000000000.us-east-1.elb.amazonaws.com", 'CanonicalHostedZoneId': "Z35SXDOTRQ7X7K"}
+            for arn in LoadBalancerArns
+        ]}
+
+
+    def _elbv2_describe_listeners(self, LoadBalancerArn : str, **kwargs) -> dict:
+        return {'Listeners': [{'ListenerArn': f"{LoadBalancerArn}/listener/443", 'Port': 443}]}
+
+
+    def _elbv2_create_target_group(self, Name : str, TargetType : str='instance', **kwargs) -> dict:
+        arn = next((arn for arn, group in self.target_groups.items() if group['TargetGroupName'] == Name), None)
+        if arn is None:
+            arn = f"arn:aws:elasticloadbalancing:us-east-1:000000000000:targetgroup/{Name}/{uuid.uuid4().hex[:16]}"
+            self.target_groups[arn] = {'TargetGroupArn': arn, 'TargetGroupName': Name, 'TargetType': TargetType}
+            self.targets[arn] = {}
+        return {'TargetGroups': [dict(self.target_groups[arn])]}
+
+
+    def _elbv2_describe_target_groups(self, **kwargs) -> dict:
+        return {'TargetGroups': [dict(group) for group in self.target_groups.values()]}
+
+
+    def _elbv2_delete_target_group(self, TargetGroupArn : str, **kwargs) -> dict:
+        if any(rule['TargetGroupArn'] == TargetGroupArn for rule in self.rules.values()):
+            raise ClientError({'Error': {'Code': 'ResourceInUse', 'Message': "Target group is currently in use by a listener or a rule"}}, 'DeleteTargetGroup')
+        self.target_groups.pop(TargetGroupArn, None)
+        self.targets.pop(TargetGroupArn, None)
+        return {}
+
+
+    def _elbv2_register_targets(self, TargetGroupArn : str, Targets : list[dict], **kwargs) -> dict:
+        for target in Targets:
+            self.targets[TargetGroupArn][target['Id']] = time.monotonic()
+        return {}
+
+
+    def _elbv2_deregister_targets(self, TargetGroupArn : str, Targets : list[dict], **kwargs) -> dict:
+        for target in Targets:
+            self.targets.get(TargetGroupArn, {}).pop(target['Id'], None)
+        return {}
+
+
+    def _target_state(self, target_group_arn : str, instance_id : str) -> str:
+        # Health checks only run for groups a rule forwards to, against an instance whose application is up.
+        instance = self.instances.get(instance_id)
+        if instance is None or not any(rule['TargetGroupArn'] == target_group_arn for rule in self.rules.values()):
+            return 'unused'
+        if self._advance(instance)['State']['Name'] != 'running':
+            return 'unused'
+        healthy_at = max(self.targets[target_group_arn][instance_id], instance['SsmOnlineAt']) + self.profile.health_check_seconds
+        return 'healthy' if time.monotonic() >= healthy_at else 'initial'
+
+
+    def _elbv2_describe_target_health(self, TargetGroupArn : str, Targets : list[dict] | None=None, **kwargs) -> dict:
+        registered = self.targets.get(TargetGroupArn, {})
+        instance_ids = [target['Id'] for target in Targets] if Targets else list(registered)
+        return {'TargetHealthDescriptions': [
+            {'Target': {'Id': instance_id}, 'TargetHealth': {'State': self._target_state(TargetGroupArn, instance_id) if instance_id in registered else 'unused'}}
+            for instance_id in instance_ids
+        ]}
+
+
+    def _elbv2_describe_rules(self, ListenerArn : str, **kwargs) -> dict:
+        rules = [
+            {
+                'RuleArn': arn,
+                'Priority': str(rule['Priority']),
+                'IsDefault': False,
+                'Conditions': [{'Field': 'host-header', 'HostHeaderConfig': {'Values': [rule['Host']]}}],
+                'Actions': [{'Type': 'forward', 'TargetGroupArn': rule['TargetGroupArn']}],
+            }
+            for arn, rule in self.rules.items()
+        ]
+        return {'Rules': rules + [{'RuleArn': f"{ListenerArn}/default", 'Priority': 'default', 'IsDefault': True, 'Conditions': [], 'Actions': []}]}
+
+
+    def _elbv2_create_rule(self, Priority : int, Conditions : list[dict], Actions : list[dict], **kwargs) -> dict:
+        if any(rule['Priority'] == Priority for rule in self.rules.values()):
+            raise ClientError({'Error': {'Code': 'PriorityInUse', 'Message': f"Priority '{Priority}' is currently in use"}}, 'CreateRule')
+        arn = f"arn:aws:elasticloadbalancing:us-east-1:000000000000:listener-rule/{uuid.uuid4().hex[:16]}"
+        self.rules[arn] = {'Priority': Priority, 'Host': Conditions[0]['HostHeaderConfig']['Values'][0], 'TargetGroupArn': Actions[0]['TargetGroupArn']}
+        return {'Rules': [{'RuleArn': arn}]}
+
+
+    def _elbv2_modify_rule(self, RuleArn : str, Actions : list[dict], **kwargs) -> dict:
+        self.rules[RuleArn]['TargetGroupArn'] = Actions[0]['TargetGroupArn']
+        return {'Rules': [{'RuleArn': RuleArn}]}
+
+
+    def _elbv2_delete_rule(self, RuleArn : str, **kwargs) -> dict:
+        self.rules.pop(RuleArn, None)
+        return {}
+
+
+def _script_steps(script : list[str]) -> list[tuple[int, str, set[int]]]:
+    # (index, command, warning exit codes) for each step of a script built by SISOrchestrator._build_batched_script.
+    steps, command = [], ""
+    for line in script:
+        command_match = SCRIPT_COMMAND_PATTERN.match(line)
+        if command_match:
+            command = command_match.group(1)
+        for index in SCRIPT_STEP_PATTERN.findall(line):
+            steps.append((int(index), command, set()))
+        warning_match = SCRIPT_WARNING_PATTERN.search(line)
+        if warning_match and steps:
+            steps[-1][2].update(int(code) for code in warning_match.group(1).split(","))
+    return steps
+
+
+# Waiter definitions: operation, default delay, default max attempts, acceptor(response) -> "success" | "failure" | None
+def _all_instances_in(success : set[str], failure : set[str]):
+    def acceptor(response : dict) -> str | None:
+        states = {instance['State']['Name'] for reservation in response['Reservations'] for instance in reservation['Instances']}
+        if states & failure:
+            return "failure"
+        return "success" if states and states <= success else None
+    return acceptor
+
+
+SIMULATED_WAITERS = {
+    ("ec2", "instance_running"): ("describe_instances", 15, 40, _all_instances_in({'running'}, {'shutting-down', 'terminated', 'stopping'})),
+    ("ec2", "instance_stopped"): ("describe_instances", 15, 40, _all_instances_in({'stopped'}, {'pending', 'terminated'})),
+    ("ec2", "instance_terminated"): ("describe_instances", 15, 40, _all_instances_in({'terminated'}, {'pending', 'stopping'})),
+    ("ec2", "snapshot_completed"): ("describe_snapshots", 15, 40,
+        lambda response: "success" if all(snapshot['State'] == 'completed' for snapshot in response['Snapshots']) else None),
+    ("ssm", "command_executed"): ("get_command_invocation", 5, 20,
+        lambda response: "success" if response['Status'] == 'Success' else "failure" if response['Status'] in SSM_FAILED_STATUSES else None),
+}
+
+
+class SimulatedWaiter():
+
+
+    def __init__(self, client, name : str):
+        self.client = client
+        self.name = name
+        self.operation, self.delay, self.max_attempts, self.acceptor = SIMULATED_WAITERS[(client.service, name)]
+
+
+    def wait(self, WaiterConfig : dict | None=None, **kwargs) -> None:
+        delay = (WaiterConfig or {}).get('Delay', self.delay)
+        max_attempts = (WaiterConfig or {}).get('MaxAttempts', self.max_attempts)
+        for attempt in range(1, max_attempts + 1):
+            response = getattr(self.client, self.operation)(**kwargs)
+            outcome = self.acceptor(response)
+            if outcome == "success":
+                return
+            if outcome == "failure":
+                raise WaiterError(self.name, "Waiter encountered a terminal failure state", response)
+            if attempt < max_attempts:
+                time.sleep(delay)
+        raise WaiterError(self.name, "Max attempts exceeded", response)
+
+
+class SimulatedPaginator():
+
+
+    def __init__(self, operation):
+        self.operation = operation
+
+
+    def paginate(self, **kwargs):
+        while True:
+            page = self.operation(**kwargs)
+            yield page
+            # Route53 pages by the next record's name and type where other services hand back a NextToken.
+            tokens = {PAGINATION_TOKENS[key]: value for key, value in page.items() if key in PAGINATION_TOKENS and value}
+            if not tokens:
+                return
+            kwargs.update(tokens)
+
+
+class SimulatedEvents():
+    # The slice of botocore's hierarchical event emitter that clients expose as meta.events.
+
+
+    def __init__(self):
+        self._handlers = []
+
+
+    def register(self, event_name : str, handler) -> None:
+        self._handlers.append((event_name, handler))
+
+
+    def emit(self, event_name : str, **kwargs) -> None:
+        for prefix, handler in list(self._handlers):
+            if event_name == prefix or event_name.startswith(f"{prefix}."):
+                handler(event_name=event_name, **kwargs)
+
+
+class SimulatedClient():
+
+
+    def __init__(self, backend : SimulatedAWS, service : str):
+        self.backend = backend
+        self.service = service
+        self.meta = SimpleNamespace(events=SimulatedEvents())
+
+
+    def __getattr__(self, operation : str):
+        handler = getattr(self.backend, f"_{self.service}_{operation}", None)
+        if handler is None:
+            raise AttributeError(f"Simulated {self.service} client has no operation {operation}.")
+        return lambda **kwargs: self.backend.call(self.service, operation, handler, kwargs, events=self.meta.events)
+
+
+    def get_paginator(self, operation : str) -> SimulatedPaginator:
+        return SimulatedPaginator(getattr(self, operation))
+
+
+    def get_waiter(self, name : str) -> SimulatedWaiter:
+        return SimulatedWaiter(self, name)
+
+
+class AsyncSimulatedClient():
+
+
+    def __init__(self, backend : SimulatedAWS, service : str):
+        self.backend = backend
+        self.service = service
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+    def __getattr__(self, operation : str):
+        handler = getattr(self.backend, f"_{self.service}_{operation}", None)
+        if handler is None:
+            raise AttributeError(f"Simulated {self.service} client has no operation {operation}.")
+        return lambda **kwargs: self.backend.call_async(self.service, operation, handler, kwargs)
+
+
+class SimulatedInstance():
+
+
+    def __init__(self, client : SimulatedClient, description : dict):
+        self.client = client
+        self.id = description['InstanceId']
+        self.private_ip_address = description['PrivateIpAddress']
+
+
+    def wait_until_running(self) -> None:
+        self.client.get_waiter('instance_running').wait(InstanceIds=[self.id])
+
+
+class SimulatedEC2Resource():
+
+
+    def __init__(self, client : SimulatedClient):
+        self.client = client
+        self.meta = SimpleNamespace(client=client)
+
+
+    def create_instances(self, **kwargs) -> list[SimulatedInstance]:
+        return [SimulatedInstance(self.client, instance) for instance in self.client.run_instances(**kwargs)['Instances']]
+
+
+class SimulatedSession():
+
+
+    def __init__(self, backend : SimulatedAWS):
+        self.backend = backend
+
+
+    def client(self, service : str, **kwargs) -> SimulatedClient:
+        return SimulatedClient(self.backend, service)
+
+
+    def resource(self, service : str, **kwargs) -> SimulatedEC2Resource:
+        return SimulatedEC2Resource(self.client(service))
+
+
+# Benchmark
+def run_scenario(scenario : str, tenant_count : int, max_concurrency : int, strategy : RecycleStrategy, profile : SimulatedAWSProfile,
+                 alb_routing : bool=False, keep_running : bool=False, bulk_launch : bool=False, verbose : bool=False) -> BenchmarkReport:
+    backend = SimulatedAWS(profile)
+    report = BenchmarkReport(scenario=scenario, strategy=strategy.value, tenants=tenant_count, concurrency=max_concurrency, profile=asdict(profile),
+                             alb_routing=alb_routing, keep_running=keep_running, bulk_launch=bulk_launch,
+                             started_at=datetime.now(timezone.utc).isoformat())
+    common_names = [f"bench{index:04d}" for index in range(tenant_count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        orchestrator = SISOrchestrator(state_store_path=os.path.join(directory, "orchestrator_state.db"), session_factory=backend.session)
+        orchestrator.alb_routing = alb_routing
+        if scenario == "provision":
+            tenants = [SISTenant(common_name=common_name, product=PowerSchoolProduct.SIS) for common_name in common_names]
+        else:
+            status = TenantStatus.PENDING_RECYCLE if scenario == "recycle" else TenantStatus.PENDING_DECOMMISSION
+            for common_name in common_names:
+                # Fleet decommission finds its tenants by status tag rather than being handed them.
+                seeded_status = status if scenario == "fleet-decommission" else TenantStatus.ACTIVE
+                backend.seed_tenant(common_name, status=seeded_status, domain_name=orchestrator.aws_config.domain_name,
+                                    public_endpoint_ip=orchestrator.aws_config.public_endpoint_ip, alb_routing=alb_routing)
+            tenants = [SISTenant(common_name=common_name, product=PowerSchoolProduct.SIS, status=status) for common_name in common_names]
+
+        tic = time.perf_counter()
+        with nullcontext() if verbose else redirect_stdout(io.StringIO()):
+            if scenario == "provision":
+                results = orchestrator.provision_tenants(tenants, max_concurrency=max_concurrency, stop_after_provisioning=not keep_running,
+                                                         bulk_launch=bulk_launch)
+            elif scenario == "fleet-decommission":
+                results = orchestrator.decommission_pending_tenants(max_concurrency=max_concurrency)
+            elif scenario == "decommission":
+                results = orchestrator.decommission_tenants(tenants, max_concurrency=max_concurrency)
+            else:
+                results = orchestrator.recycle_tenants(tenants, max_concurrency=max_concurrency, strategy=strategy, stop_after_provisioning=not keep_running)
+        report.wall_seconds = time.perf_counter() - tic
+
+    elapsed = [result.elapsed_seconds for result in results if result.succeeded]
+    report.succeeded = len(elapsed)
+    report.tenants_per_hour = report.succeeded / report.wall_seconds * 3600 if report.wall_seconds else 0.0
+    report.p50_seconds = percentile(elapsed, 0.50)
+    report.p95_seconds = percentile(elapsed, 0.95)
+    report.p99_seconds = percentile(elapsed, 0.99)
+    report.max_seconds = max(elapsed, default=0.0)
+    report.api_calls = dict(sorted(backend.calls.items(), key=lambda item: item[1], reverse=True))
+    report.api_calls_per_tenant = sum(backend.calls.values()) / max(1, tenant_count)
+    report.throttled_calls = sum(backend.throttled.values())
+    report.rate_limit_wait_seconds = orchestrator.rate_limiter.totals().wait_seconds
+    report.phase_p95_seconds = {
+        phase: round(stats["p95"], 3) for phase, stats in orchestrator.metrics.summary().items() if not phase.startswith("powershell: ")
+    }
+    return report
+
+
+def _comparable(report : dict) -> tuple:
+    return (report["scenario"], report["strategy"], report["tenants"], report["concurrency"], report.get("alb_routing", False),
+            report.get("keep_running", False), report.get("bulk_launch", False), json.dumps(report["profile"], sort_keys=True))
+
+
+def find_regressions(report : BenchmarkReport, history_path : str, threshold : float) -> list[str]:
+    # Compares against the most recent run of the same scenario, size and simulated profile.
+    if not os.path.exists(history_path):
+        return []
+    previous = None
+    with open(history_path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                if _comparable(record) == _comparable(asdict(report)):
+                    previous = record
+    if previous is None:
+        return []
+
+    regressions = []
+    if report.tenants_per_hour < previous["tenants_per_hour"] * (1 - threshold):
+        regressions.append(f"tenants/hour {previous['tenants_per_hour']:0.0f} -> {report.tenants_per_hour:0.0f}")
+    for key in ("p50_seconds", "p95_seconds", "api_calls_per_tenant"):
+        if getattr(report, key) > previous[key] * (1 + threshold):
+            regressions.append(f"{key} {previous[key]:0.1f} -> {getattr(report, key):0.1f}")
+    return regressions
+
+
+def print_report(report : BenchmarkReport) -> None:
+    print(
+        f"{report.scenario} ({report.strategy}): {report.succeeded}/{report.tenants} tenants at concurrency {report.concurrency} "
+        f"in {report.wall_seconds:0.1f}s, {report.tenants_per_hour:0.0f} tenants/hour, "
+        f"p50={report.p50_seconds:0.1f}s p95={report.p95_seconds:0.1f}s p99={report.p99_seconds:0.1f}s, "
+        f"{report.api_calls_per_tenant:0.1f} API calls/tenant, {report.throttled_calls} throttled, {report.rate_limit_wait_seconds:0.1f}s rate limited"
+    )
+    for api, count in list(report.api_calls.items())[:5]:
+        print(f"    {api}: {count} ({count / max(1, report.tenants):0.1f}/tenant)")
+
+
+# Actions
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SISOrchestrator against a simulated AWS backend.")
+    parser.add_argument("--scenario", nargs="+", choices=["provision", "decommission", "fleet-decommission", "recycle"], default=["provision", "decommission", "recycle"])
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--strategy", choices=[strategy.value for strategy in RecycleStrategy], default=RecycleStrategy.REBUILD.value)
+    parser.add_argument("--history", default="orchestrator_benchmark.jsonl", help="JSON lines file each run is appended to and compared against.")
+    parser.add_argument("--regression-threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--alb-routing", action="store_true", help="Route tenants through ALB host-header rules instead of Route53 A records.")
+    parser.add_argument("--keep-running", action="store_true", help="Leave provisioned tenants running, which also awaits ALB target health.")
+    parser.add_argument("--bulk-launch", action="store_true", help="Launch every tenant from the launch template in one call.")
+    parser.add_argument("--verbose", action="store_true", help="Show the orchestrator's own progress output.")
+    defaults = SimulatedAWSProfile()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    arguments = parser.parse_args()
+
+    profile = SimulatedAWSProfile(**{name: getattr(arguments, name) for name in asdict(defaults)})
+    regressed = False
+    for scenario in arguments.scenario:
+        report = run_scenario(scenario, arguments.tenants, arguments.concurrency, RecycleStrategy(arguments.strategy), profile,
+                              alb_routing=arguments.alb_routing, keep_running=arguments.keep_running,
+                              bulk_launch=arguments.bulk_launch, verbose=arguments.verbose)
+        print_report(report)
+        regressions = find_regressions(report, arguments.history, arguments.regression_threshold)
+        for regression in regressions:
+            print(f"    REGRESSION: {regression}")
+        regressed = regressed or bool(regressions)
+        with open(arguments.history, "a", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(report)) + "\n")
+
+    if regressed and arguments.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
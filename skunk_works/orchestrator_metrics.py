@@ -0,0 +1,127 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+
+# Data Classes
+@dataclass(kw_only=True)
+class PhaseRecord():
+    tenant : str
+    phase : str
+    started_at : str
+    elapsed_seconds : float
+    succeeded : bool = True
+
+
+# Helpers
+def percentile(values : list[float], fraction : float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _escape_label(value : str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+
+# Metrics
+class PhaseMetrics():
+
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = []
+
+
+    @contextmanager
+    def phase(self, tenant : str, phase : str):
+        started_at = datetime.now(timezone.utc).isoformat()
+        tic = time.perf_counter()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            self.record(tenant, phase, time.perf_counter() - tic, succeeded=succeeded, started_at=started_at)
+
+
+    def record(self, tenant : str, phase : str, elapsed_seconds : float, succeeded : bool=True, started_at : str="") -> None:
+        record = PhaseRecord(
+            tenant=tenant,
+            phase=phase,
+            started_at=started_at or datetime.now(timezone.utc).isoformat(),
+            elapsed_seconds=elapsed_seconds,
+            succeeded=succeeded,
+        )
+        with self._lock:
+            self._records.append(record)
+
+
+    def records(self) -> list[PhaseRecord]:
+        with self._lock:
+            return list(self._records)
+
+
+    def summary(self) -> dict[str, dict]:
+        durations = {}
+        failures = {}
+        for record in self.records():
+            durations.setdefault(record.phase, []).append(record.elapsed_seconds)
+            failures[record.phase] = failures.get(record.phase, 0) + (0 if record.succeeded else 1)
+
+        return {
+            phase: {
+                "count": len(values),
+                "failures": failures[phase],
+                "sum": sum(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": max(values),
+            }
+            for phase, values in durations.items()
+        }
+
+
+    def print_summary(self) -> None:
+        for phase, stats in sorted(self.summary().items(), key=lambda item: item[1]["sum"], reverse=True):
+            print(f"{phase}: n={stats['count']} p50={stats['p50']:0.1f}s p95={stats['p95']:0.1f}s max={stats['max']:0.1f}s failures={stats['failures']}")
+
+
+    def write_json_lines(self, path : str) -> None:
+        # Appends, so one file accumulates history across runs for regression tracking.
+        with open(path, "a", encoding="utf-8") as file:
+            for record in self.records():
+                file.write(json.dumps(asdict(record)) + "\n")
+
+
+    def write_prometheus(self, path : str) -> None:
+        lines = [
+            "# HELP orchestrator_phase_seconds Time spent in each orchestrator phase.",
+            "# TYPE orchestrator_phase_seconds summary",
+        ]
+        summary = self.summary()
+        for phase, stats in sorted(summary.items()):
+            label = _escape_label(phase)
+            lines += [
+                f"orchestrator_phase_seconds{{phase=\"{label}\",quantile=\"0.5\"}} {stats['p50']:.3f}",
+                f"orchestrator_phase_seconds{{phase=\"{label}\",quantile=\"0.95\"}} {stats['p95']:.3f}",
+                f"orchestrator_phase_seconds_sum{{phase=\"{label}\"}} {stats['sum']:.3f}",
+                f"orchestrator_phase_seconds_count{{phase=\"{label}\"}} {stats['count']}",
+            ]
+        lines += [
+            "# HELP orchestrator_phase_failures_total Orchestrator phases that raised or reported failure.",
+            "# TYPE orchestrator_phase_failures_total counter",
+        ]
+        for phase, stats in sorted(summary.items()):
+            lines.append(f"orchestrator_phase_failures_total{{phase=\"{_escape_label(phase)}\"}} {stats['failures']}")
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
@@ -0,0 +1,179 @@
+import ops_db
+import pm_support_builds
+from orchestrator_metrics import PhaseMetrics
+from orchestrator_v2 import (
+    Orchestrator,
+    PMTenant,
+    PowerSchoolProduct,
+    RecycleStrategy,
+    SISOrchestrator,
+    SISTenant,
+    TenantOperationResult,
+    TenantStatus,
+)
+
+
+# Orchestrators
+class PMOrchestrator(Orchestrator):
+    # PM tenants are rebuilt by queueing their etl_imp job on pmi_build.job_queue; the processing servers do the work.
+
+
+    def __init__(self, pool : ops_db.OpsDBPool | None=None, poll_seconds : float=3.0, timeout_seconds : float=14400.0, slots_per_server : int=1):
+        # Without a pool of its own, the orchestrator shares the process-wide one, created on first use.
+        self.pool = pool
+        self.slots_per_server = slots_per_server
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds
+        self.metrics = PhaseMetrics()
+
+
+    def _connection(self):
+        return (self.pool or ops_db.shared_pool()).connection()
+
+
+    def queue_builds(self, tenants : list[PMTenant]) -> list[TenantOperationResult]:
+        # Queues every tenant in one transaction and returns straight away; await_builds tracks them.
+        results = [TenantOperationResult(tenant=tenant, operation="provision") for tenant in tenants]
+        for tenant in tenants:
+            tenant.core_files_rendered = False
+            tenant.measure_files_rendered = False
+        print(f"Fleet: Queueing {len(tenants)} PM build(s).")
+        with self._connection() as conn:
+            queued = {build.client_id: build for build in pm_support_builds.queue_builds(conn, [tenant.client_id for tenant in tenants])}
+        for result in results:
+            build = queued.get(str(result.tenant.client_id))
+            if build is None:
+                result.error = f"No etl_imp schedule for client {result.tenant.client_id}."
+                print(f"{result.tenant.common_name}: provision failed. {result.error}")
+                continue
+            self._record_queued_build(result.tenant, build)
+        return results
+
+
+    def _record_queued_build(self, tenant : PMTenant, build : pm_support_builds.QueuedBuild) -> None:
+        print(f"{tenant.common_name}: Queued build {build.job_id} for {build.db_name}.")
+        tenant.build_job_id = build.job_id
+        tenant.db_name = tenant.db_name or build.db_name
+        tenant.status = TenantStatus.PENDING_APPLICATION_INSTALLATION
+
+
+    def _record_build_outcome(self, result : TenantOperationResult, outcome : pm_support_builds.BuildOutcome) -> None:
+        result.tenant.build_job_id = outcome.job_id or result.tenant.build_job_id
+        result.elapsed_seconds = outcome.elapsed_seconds
+        self.metrics.record(result.tenant.common_name, "pm_build", outcome.elapsed_seconds, succeeded=outcome.succeeded)
+        if not outcome.succeeded:
+            result.error = f"Build {outcome.job_id} ended {outcome.status or 'still pending'} after {outcome.elapsed_seconds:0.0f} seconds."
+            print(f"{result.tenant.common_name}: provision failed. {result.error}")
+            return
+        # etl_imp renders the core and the measure files in the same run, so both are done together.
+        result.tenant.core_files_rendered = True
+        result.tenant.measure_files_rendered = True
+        result.tenant.status = TenantStatus.ACTIVE
+        result.succeeded = True
+        print(f"{result.tenant.common_name}: Build Done in {result.elapsed_seconds:0.1f} seconds.")
+
+
+    def await_builds(self, results : list[TenantOperationResult]) -> list[TenantOperationResult]:
+        # One watcher on one connection follows every queued build and reports each as it finishes.
+        # Tenants listed twice for one client share its build, so each job id maps to every result waiting on it.
+        waiting = {}
+        for result in results:
+            if not result.error:
+                waiting.setdefault(result.tenant.build_job_id, []).append(result)
+        with self._connection() as conn, self.metrics.phase("fleet", "await_pm_builds"):
+            watcher = pm_support_builds.BuildWatcher(conn.cursor(), min_delay=self.poll_seconds)
+            jobs = {job_id: job_results[0].tenant.db_name for job_id, job_results in waiting.items()}
+            for outcome in watcher.watch(jobs, timeout_seconds=self.timeout_seconds):
+                for result in waiting.pop(outcome.job_id):
+                    self._record_build_outcome(result, outcome)
+
+        succeeded = sum(1 for result in results if result.succeeded)
+        print(f"provision: {succeeded} of {len(results)} tenants succeeded.")
+        return results
+
+
+    def provision_tenants(self, tenants : list[PMTenant], waves : bool=True) -> list[TenantOperationResult]:
+        # Waves hold builds back until a processing server in their build group has room, longest builds first.
+        if not waves:
+            return self.await_builds(self.queue_builds(tenants))
+
+        # One result per tenant as given; tenants that share a client share its build.
+        results = [TenantOperationResult(tenant=tenant, operation="provision") for tenant in tenants]
+        by_client = {}
+        for result in results:
+            result.tenant.core_files_rendered = False
+            result.tenant.measure_files_rendered = False
+            by_client.setdefault(str(result.tenant.client_id), []).append(result)
+
+        def record_wave(builds : list[pm_support_builds.QueuedBuild]) -> None:
+            for build in builds:
+                for result in by_client[build.client_id]:
+                    self._record_queued_build(result.tenant, build)
+
+        with self._connection() as conn, self.metrics.phase("fleet", "pm_build_waves"):
+            scheduler = pm_support_builds.BuildScheduler(conn, slots_per_server=self.slots_per_server, min_delay=self.poll_seconds)
+            for outcome in scheduler.run(list(by_client), timeout_seconds=self.timeout_seconds, on_release=record_wave):
+                for result in by_client[outcome.client_id]:
+                    self._record_build_outcome(result, outcome)
+        for client_id in scheduler.unscheduled:
+            for result in by_client[client_id]:
+                result.error = f"No etl_imp schedule for client {client_id}."
+                print(f"{result.tenant.common_name}: provision failed. {result.error}")
+        for build in scheduler.unreleased:
+            for result in by_client[build.client_id]:
+                result.error = f"Build for {build.db_name} was never released; build group {build.build_group} had no free processing server slot before the timeout."
+                print(f"{result.tenant.common_name}: provision failed. {result.error}")
+
+        succeeded = sum(1 for result in results if result.succeeded)
+        print(f"provision: {succeeded} of {len(results)} tenants succeeded.")
+        return results
+
+
+    def provision_tenant(self, tenant : PMTenant) -> None:
+        result = self.provision_tenants([tenant])[0]
+        if not result.succeeded:
+            raise RuntimeError(f"{tenant.common_name}: {result.error}")
+
+
+    def decommission_tenants(self, tenants : list[PMTenant]) -> list[TenantOperationResult]:
+        # Nothing is torn down on the PM side; decommissioning withdraws the builds this orchestrator queued that are still waiting.
+        results = [TenantOperationResult(tenant=tenant, operation="decommission") for tenant in tenants]
+        job_ids = [tenant.build_job_id for tenant in tenants if tenant.build_job_id]
+        with self._connection() as conn:
+            cancelled = pm_support_builds.cancel_queued_builds(conn, job_ids)
+        print(f"Fleet: Cancelled {len(cancelled)} queued PM build(s).")
+        for result in results:
+            tenant = result.tenant
+            if tenant.build_job_id not in cancelled:
+                result.error = f"Build {tenant.build_job_id} was not waiting in the queue." if tenant.build_job_id else "No queued build to cancel."
+                print(f"{tenant.common_name}: Nothing to cancel. {result.error}")
+                continue
+            tenant.build_job_id = 0
+            tenant.core_files_rendered = False
+            tenant.measure_files_rendered = False
+            result.succeeded = True
+        return results
+
+
+    def decommission_tenant(self, tenant : PMTenant) -> None:
+        self.decommission_tenants([tenant])
+
+
+    def list_tenants(self) -> list[PMTenant]:
+        return [
+            PMTenant(common_name=se_tenant["db_name"], product=PowerSchoolProduct.PERFORMANCE_MATTERS, db_name=se_tenant["db_name"], client_id=se_tenant["client_id"])
+            for se_tenant in pm_support_builds.SUPPORT_SITE_SE_TENANTS
+        ]
+
+
+# Actions
+def refresh_fleet(sis_orchestrator : SISOrchestrator, sis_tenants : list[SISTenant], pm_orchestrator : PMOrchestrator, pm_tenants : list[PMTenant],
+                  max_concurrency : int=4, strategy : RecycleStrategy=RecycleStrategy.REBUILD) -> list[TenantOperationResult]:
+    # PM builds run on the processing servers, so they are queued first and finish while the SIS recycles run here.
+    pm_results = pm_orchestrator.queue_builds(pm_tenants)
+    try:
+        sis_results = sis_orchestrator.recycle_tenants(sis_tenants, max_concurrency=max_concurrency, strategy=strategy)
+    finally:
+        # Queued builds are still tracked to completion when the SIS side raises.
+        pm_results = pm_orchestrator.await_builds(pm_results)
+    return sis_results + pm_results
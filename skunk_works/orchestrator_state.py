@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+
+# One store per user, wherever the orchestrator is run from, so a resume always finds the checkpoints it left.
+DEFAULT_STATE_STORE_PATH = os.path.join(os.path.expanduser("~"), ".orchestrator", "orchestrator_state.db")
+
+SCHEMA = """
+create table if not exists tenants (
+    common_name text primary key,
+    product text not null,
+    status text not null,
+    aws_instance_id text not null default '',
+    aws_private_ip text not null default '',
+    updated_at text not null
+);
+
+create table if not exists checkpoints (
+    common_name text not null,
+    step text not null,
+    completed_at text not null,
+    primary key (common_name, step)
+);
+
+create table if not exists bookings (
+    common_name text not null,
+    starts_at text not null,
+    ends_at text not null,
+    primary key (common_name, starts_at)
+);
+"""
+
+
+# State Store
+class OrchestratorStateStore():
+
+
+    def __init__(self, path : str=DEFAULT_STATE_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("pragma journal_mode=wal")
+            connection.executescript(SCHEMA)
+
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+
+    def _write(self, statement : str, parameters : tuple) -> None:
+        with self._lock, closing(self._connect()) as connection, connection:
+            connection.execute(statement, parameters)
+
+
+    def _read(self, statement : str, parameters : tuple) -> list[dict]:
+        with closing(self._connect()) as connection:
+            return [dict(row) for row in connection.execute(statement, parameters).fetchall()]
+
+
+    def save_tenant(self, common_name : str, product : str, status : str, aws_instance_id : str="", aws_private_ip : str="") -> None:
+        self._write(
+            """insert into tenants (common_name, product, status, aws_instance_id, aws_private_ip, updated_at)
+            values (?, ?, ?, ?, ?, ?)
+            on conflict (common_name) do update set
+                product = excluded.product,
+                status = excluded.status,
+                aws_instance_id = excluded.aws_instance_id,
+                aws_private_ip = excluded.aws_private_ip,
+                updated_at = excluded.updated_at""",
+            (common_name, product, status, aws_instance_id, aws_private_ip, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+    def tenant(self, common_name : str) -> dict | None:
+        rows = self._read("select * from tenants where common_name = ?", (common_name,))
+        return rows[0] if rows else None
+
+
+    def tenants(self, status : str | None=None) -> list[dict]:
+        if status is None:
+            return self._read("select * from tenants order by common_name", ())
+        return self._read("select * from tenants where status = ? order by common_name", (status,))
+
+
+    def forget_tenant(self, common_name : str) -> None:
+        self.reset_checkpoints(common_name)
+        self._write("delete from tenants where common_name = ?", (common_name,))
+
+
+    def complete_step(self, common_name : str, step : str) -> None:
+        self._write(
+            "insert or replace into checkpoints (common_name, step, completed_at) values (?, ?, ?)",
+            (common_name, step, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+    def completed_steps(self, common_name : str) -> set[str]:
+        return {row["step"] for row in self._read("select step from checkpoints where common_name = ?", (common_name,))}
+
+
+    def reset_checkpoints(self, common_name : str) -> None:
+        self._write("delete from checkpoints where common_name = ?", (common_name,))
+
+
+    def save_booking(self, common_name : str, starts_at : datetime, ends_at : datetime) -> None:
+        self._write(
+            "insert or replace into bookings (common_name, starts_at, ends_at) values (?, ?, ?)",
+            (common_name, starts_at.astimezone(timezone.utc).isoformat(), ends_at.astimezone(timezone.utc).isoformat()),
+        )
+
+
+    def bookings(self, window_start : datetime, window_end : datetime) -> list[dict]:
+        # Every booking that overlaps the window; UTC isoformat strings compare in time order.
+        rows = self._read(
+            "select * from bookings where starts_at < ? and ends_at > ? order by starts_at",
+            (window_end.astimezone(timezone.utc).isoformat(), window_start.astimezone(timezone.utc).isoformat()),
+        )
+        for row in rows:
+            row["starts_at"] = datetime.fromisoformat(row["starts_at"])
+            row["ends_at"] = datetime.fromisoformat(row["ends_at"])
+        return rows
+
+
+    def forget_bookings(self, ended_before : datetime) -> None:
+        self._write("delete from bookings where ends_at < ?", (ended_before.astimezone(timezone.utc).isoformat(),))
@@ -1,9 +1,53 @@
+import base64
+import contextvars
 import boto3
+import random
+import re
+import threading
 import time
+import traceback
+import urllib.error
+import urllib.request
+import uuid
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from datetime import date
+from aws_rate_limiter import THROTTLING_ERROR_CODES, AWSRateLimiter
+from botocore.exceptions import BotoCoreError, ClientError, WaiterError
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, timezone
 from enum import Enum
+from orchestrator_metrics import PhaseMetrics
+from orchestrator_state import DEFAULT_STATE_STORE_PATH, OrchestratorStateStore
+
+# Marker line each batched PowerShell step writes: ORCHESTRATOR_STEP|<index>|<exit code>|<milliseconds>
+STEP_MARKER_PATTERN = re.compile(r"^ORCHESTRATOR_STEP\|(\d+)\|(-?\d+)\|(\d+)\s*$", re.MULTILINE)
+SSM_MAX_EXECUTION_TIMEOUT = 172800
+SSM_MAX_INSTANCE_IDS = 50
+EC2_MAX_BATCH_IDS = 1000
+EC2_MAX_FILTER_VALUES = 200
+SSM_TERMINAL_COMMAND_STATUSES = {"Success", "Failed", "Cancelled", "TimedOut"}
+ROUTE53_MAX_RECORD_ELEMENTS = 1000
+ROUTE53_MAX_VALUE_CHARACTERS = 32000
+ALB_MAX_RULE_PRIORITY = 50000
+# Baked AMIs carry a bootstrap script that EC2Launch runs from user data on first boot and that leaves a done marker behind.
+BOOTSTRAP_SCRIPT_PATH = "$Env:ORCHESTRATOR_HOME\\bootstrap.ps1"
+BOOTSTRAP_MARKER_PATH = "$Env:ORCHESTRATOR_HOME\\bootstrap.done"
+IMDS_PRIVATE_IP_COMMAND = ("$imdsToken = Invoke-RestMethod -Method Put -Uri http://169.254.169.254/latest/api/token -Headers @{'X-aws-ec2-metadata-token-ttl-seconds'='300'} ; "
+                           "$privateIp = Invoke-RestMethod -Uri http://169.254.169.254/latest/meta-data/local-ipv4 -Headers @{'X-aws-ec2-metadata-token'=$imdsToken}")
+BOOTSTRAP_USER_DATA = f"<powershell>\n& \"{BOOTSTRAP_SCRIPT_PATH}\"\n</powershell>\n<persist>false</persist>"
+# Drops everything PSPRODDB owns but keeps the user, so its grants, quotas and password survive an IN_PLACE restore.
+# Indexes, triggers and LOBs go with their tables; an object already dropped along with its parent is skipped.
+DROP_PSPRODDB_OBJECTS_COMMAND = ("\"whenever sqlerror exit failure`n"
+                                 "begin for o in (select object_type, object_name from dba_objects where owner = 'PSPRODDB' "
+                                 "and object_type in ('MATERIALIZED VIEW', 'TABLE', 'VIEW', 'SEQUENCE', 'SYNONYM', 'PACKAGE', 'PROCEDURE', 'FUNCTION', 'TYPE') "
+                                 "order by decode(object_type, 'MATERIALIZED VIEW', 1, 'TABLE', 2, 3)) loop "
+                                 "begin execute immediate 'drop ' || o.object_type || ' PSPRODDB.' || dbms_assert.enquote_name(o.object_name, false) "
+                                 "|| case o.object_type when 'TABLE' then ' cascade constraints purge' when 'TYPE' then ' force' end; "
+                                 "exception when others then if sqlcode not in (-942, -1434, -2289, -4043, -12003) then raise; end if; end; "
+                                 "end loop; end;`n/`nexit\" | sqlplus -s / as sysdba")
+# Errors from StopInstances(Hibernate=True) after which a plain stop still works.
+HIBERNATION_UNSUPPORTED_ERROR_CODES = {"UnsupportedHibernationConfiguration", "UnsupportedOperation", "IncorrectInstanceState"}
 
 # Enumerations
 class PowerSchoolProduct(Enum):
@@ -17,6 +61,21 @@ class PowerSchoolProduct(Enum):
     ATTENDANCE_INTERVENTION = "AIS"
 
 
+class StockRestoreMode(Enum):
+    SERIAL = "SERIAL"
+    # PARALLEL and IN_PLACE import only the PSPRODDB schema from stock.dmp (schemas=PSPRODDB), where SERIAL's import wrapper
+    # restores the full dump. Anything outside the schema, such as roles and public synonyms, keeps the state the AMI shipped with.
+    PARALLEL = "PARALLEL"
+    # IN_PLACE keeps the PSPRODDB user and drops only the objects it owns before the import, instead of dropschema.
+    IN_PLACE = "IN_PLACE"
+
+
+class RecycleStrategy(Enum):
+    REBUILD = "REBUILD"
+    REPLACE_ROOT_FROM_SNAPSHOT = "REPLACE_ROOT_FROM_SNAPSHOT"
+    REPLACE_ROOT_FROM_AMI = "REPLACE_ROOT_FROM_AMI"
+
+
 class TenantStatus(Enum):
     NEW = "NEW"
     INITIATIED = "INITIATIED"
@@ -46,6 +105,9 @@ class SISTenant(OrchestratorTenant):
     aws_allocation_id : str = ""
     aws_public_ip : str = ""
     aws_target_group_arn : str = ""
+    aws_instance_state : str = ""
+    aws_hibernation_configured : bool = False
+    aws_scheduled : bool = False
 
     def __post_init__(self):
         self.product = PowerSchoolProduct.SIS
@@ -53,6 +115,9 @@ class SISTenant(OrchestratorTenant):
 
 @dataclass(kw_only=True)
 class PMTenant(OrchestratorTenant):
+    db_name : str = ""
+    client_id : str = ""
+    build_job_id : int = 0
     core_files_rendered : bool = False
     measure_files_rendered : bool = False
 
@@ -62,6 +127,8 @@ class PMTenant(OrchestratorTenant):
 @dataclass(kw_only=True)
 class SISAWSConfiguration():
     ami_id : str = "ami-0b08b3ba32be91d3b"
+    base_ami_id = "ami-0b08b3ba32be91d3b"
+    ami_bootstrapped = False
     instance_type = "t3a.xlarge"
     key_name = "mvd-automate"
     iam_profile_instance_arn = "arn:aws:iam::558436896068:instance-profile/SE-Orchestrator"
@@ -70,6 +137,680 @@ class SISAWSConfiguration():
     subnet_id = "subnet-7ca7f215"
     availability_zone = "us-east-1a"
     load_balancer_arn = "arn:aws:elasticloadbalancing:us-east-1:558436896068:loadbalancer/app/orchestrator-alb-poc/3dc37c71547fc207"
+    hosted_zone_id = "Z2TZA0SF7FNEIO"
+    domain_name = "powerschoolsales.com"
+    public_endpoint_ip = "107.21.33.158"
+    listener_port = 443
+    target_group_protocol = "HTTPS"
+    target_group_port = 443
+    health_check_path = "/admin/pw.html"
+    launch_template_name = "sis-orchestrator"
+    # Hibernation needs an encrypted root volume larger than instance memory, so it stays off until the AMI provides one.
+    hibernation_enabled = False
+    data_pump_directory = "DATA_PUMP_DIR"
+    data_pump_parallelism = {
+        "t3a.large": 2,
+        "t3a.xlarge": 4,
+        "t3a.2xlarge": 8,
+        "m5.2xlarge": 8,
+        "r5.2xlarge": 8,
+    }
+
+    def data_pump_degree(self) -> int:
+        return self.data_pump_parallelism.get(self.instance_type, 2)
+
+
+@dataclass(kw_only=True)
+class TenantOperationResult():
+    tenant : OrchestratorTenant
+    operation : str
+    succeeded : bool = False
+    error : str = ""
+    elapsed_seconds : float = 0.0
+
+
+@dataclass(kw_only=True)
+class CommandStepResult():
+    description : str
+    command : str
+    phase : str = ""
+    status : str = "Skipped"
+    exit_code : int | None = None
+    elapsed_seconds : float = 0.0
+    output : str = ""
+    # Exit codes that finish the step as "Warning" instead of failing it.
+    warning_exit_codes : tuple[int, ...] = ()
+    # Stable "<phase>:<index>" label for metrics; descriptions repeat and raw commands are unbounded.
+    key : str = "adhoc"
+
+    @classmethod
+    def from_step(cls, step : dict) -> "CommandStepResult":
+        return cls(description=step["Description"], command=step["Command"], phase=step.get("Phase", ""),
+                   warning_exit_codes=tuple(step.get("WarningExitCodes", ())), key=step.get("Key", "adhoc"))
+
+    @property
+    def completed(self) -> bool:
+        return self.status in ("Success", "Warning")
+
+
+class CommandStepError(Exception):
+
+    def __init__(self, tenant : OrchestratorTenant, results : list[CommandStepResult]):
+        self.results = results
+        failed_step = next(result for result in results if result.status == "Failed")
+        super().__init__(f"{tenant.common_name}: '{failed_step.description}' failed with exit code {failed_step.exit_code}.")
+
+
+@dataclass(kw_only=True)
+class ReadinessResult():
+    instance_id : str
+    ready : bool = False
+    latency_seconds : float = 0.0
+    polls : int = 0
+
+
+# Support Classes
+class SSMReadinessTracker():
+
+
+    def __init__(self, ssm_client, min_delay : float=2.0, max_delay : float=30.0, deadline_seconds : float=1200.0):
+        self.ssm_client = ssm_client
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._registered_at = {}
+        self._delay = min_delay
+        self._poller = None
+
+
+    def _describe_online_instances(self, instance_ids : list[str]) -> set[str]:
+        online = set()
+        paginator = self.ssm_client.get_paginator('describe_instance_information')
+        for i in range(0, len(instance_ids), SSM_MAX_INSTANCE_IDS):
+            chunk = instance_ids[i:i + SSM_MAX_INSTANCE_IDS]
+            for page in paginator.paginate(Filters=[{'Key': 'InstanceIds', 'Values': chunk}]):
+                for information in page['InstanceInformationList']:
+                    if information['PingStatus'] == "Online":
+                        online.add(information['InstanceId'])
+        return online
+
+
+    def _poll(self) -> None:
+        try:
+            self._poll_until_idle()
+        finally:
+            # Whatever ends the loop, the next wait() must be able to start a fresh poller.
+            with self._condition:
+                if self._poller is threading.current_thread():
+                    self._poller = None
+                self._condition.notify_all()
+
+
+    def _poll_until_idle(self) -> None:
+        # One describe_instance_information sweep per cycle covers every instance anyone is waiting on.
+        while True:
+            with self._condition:
+                if not self._pending:
+                    return
+                instance_ids = list(self._pending)
+
+            try:
+                online = self._describe_online_instances(instance_ids)
+                throttled = False
+            except ClientError as error:
+                online = set()
+                throttled = error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+                if not throttled:
+                    print(f"SSM readiness poll failed: {error}")
+            except Exception as error:
+                # Connection resets, endpoint timeouts and malformed responses are worth another sweep, not the poller
+                # thread; the waiters still time out on their own deadlines if the errors never clear.
+                online = set()
+                throttled = False
+                print(f"SSM readiness poll failed: {type(error).__name__}: {error}")
+
+            with self._condition:
+                now = time.monotonic()
+                for instance_id in instance_ids:
+                    if instance_id in self._pending:
+                        self._pending[instance_id].polls += 1
+                for instance_id in online & self._pending.keys():
+                    result = self._pending.pop(instance_id)
+                    result.ready = True
+                    result.latency_seconds = now - self._registered_at.pop(instance_id)
+                if online:
+                    self._condition.notify_all()
+
+                if throttled:
+                    self._delay = self.max_delay
+                elif not online:
+                    self._delay = min(self._delay * 1.5, self.max_delay)
+                # Full jitter keeps concurrent orchestrators from polling in lockstep.
+                self._condition.wait(random.uniform(self.min_delay / 2, self._delay))
+
+
+    def wait(self, instance_id : str, deadline_seconds : float | None=None) -> ReadinessResult:
+        deadline = time.monotonic() + (deadline_seconds or self.deadline_seconds)
+        with self._condition:
+            result = self._pending.get(instance_id)
+            if result is None:
+                result = ReadinessResult(instance_id=instance_id)
+                self._pending[instance_id] = result
+                self._registered_at[instance_id] = time.monotonic()
+            # New work resets the backoff so a fresh instance is seen promptly.
+            self._delay = self.min_delay
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="ssm-readiness", daemon=True)
+                self._poller.start()
+            else:
+                # Wake a poller sleeping out a long backoff so it picks up the new instance now.
+                self._condition.notify_all()
+
+            while not result.ready:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._pending.pop(instance_id, None)
+                    self._registered_at.pop(instance_id, None)
+                    raise TimeoutError(f"Instance {instance_id} did not come online in SSM after {result.polls} polls.")
+                self._condition.wait(remaining)
+        return result
+
+
+class SISTenantInventory():
+
+
+    def __init__(self, ec2_client, ttl_seconds : float=60.0):
+        self.ec2_client = ec2_client
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._by_name = {}
+        self._by_status = {}
+        self._unmanaged_misses = set()
+        self._refreshed_at = None
+
+
+    def _tenant_from_instance(self, instance : dict) -> SISTenant:
+        tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+        try:
+            status = TenantStatus(tags.get('OrchestratorTenantStatus'))
+        except ValueError:
+            # Instances built before status tagging existed are live tenants.
+            status = TenantStatus.ACTIVE
+        return SISTenant(
+            common_name=tags.get('Name', instance['InstanceId']),
+            product=PowerSchoolProduct.SIS,
+            status=status,
+            aws_instance_id=instance['InstanceId'],
+            aws_private_ip=instance.get('PrivateIpAddress', ""),
+            aws_public_ip=instance.get('PublicIpAddress', ""),
+            aws_target_group_arn=tags.get('OrchestratorTargetGroupArn', ""),
+            aws_instance_state=instance.get('State', {}).get('Name', ""),
+            aws_hibernation_configured=instance.get('HibernationOptions', {}).get('Configured', False),
+            aws_scheduled=tags.get('OrchestratorScheduled') == "True",
+        )
+
+
+    def refresh(self) -> None:
+        newest = {}
+        paginator = self.ec2_client.get_paginator('describe_instances')
+        for page in paginator.paginate(
+            Filters=[
+                {'Name': 'tag:OrchestratorManaged', 'Values': ['True']},
+                {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']},
+            ],
+        ):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    tenant = self._tenant_from_instance(instance)
+                    # When a name is reused, the most recently launched instance is the tenant.
+                    if tenant.common_name not in newest or instance['LaunchTime'] > newest[tenant.common_name][0]:
+                        newest[tenant.common_name] = (instance['LaunchTime'], tenant)
+
+        with self._lock:
+            self._by_name = {name: tenant for name, (_, tenant) in newest.items()}
+            self._unmanaged_misses = set()
+            self._reindex()
+            self._refreshed_at = time.monotonic()
+
+
+    def _adopt_by_name(self, common_name : str) -> SISTenant | None:
+        # Instances launched before OrchestratorManaged tagging are invisible to the sweep. Find one by Name, the way
+        # tenants were always looked up, and tag it so every later sweep includes it.
+        newest = None
+        paginator = self.ec2_client.get_paginator('describe_instances')
+        for page in paginator.paginate(
+            Filters=[
+                {'Name': 'tag:Name', 'Values': [common_name]},
+                {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']},
+            ],
+        ):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    if newest is None or instance['LaunchTime'] > newest['LaunchTime']:
+                        newest = instance
+        if newest is None:
+            with self._lock:
+                self._unmanaged_misses.add(common_name)
+            return None
+
+        print(f"{common_name}: Adopting untagged instance {newest['InstanceId']} into the orchestrator inventory.")
+        self.ec2_client.create_tags(
+            Resources=[
+                newest['InstanceId'],
+            ],
+            Tags=[
+                {
+                    'Key': 'OrchestratorManaged',
+                    'Value': 'True'
+                },
+            ]
+        )
+        tenant = self._tenant_from_instance(newest)
+        self.upsert(tenant)
+        return tenant
+
+
+    def _reindex(self) -> None:
+        self._by_status = {}
+        for tenant in self._by_name.values():
+            self._by_status.setdefault(tenant.status, []).append(tenant)
+
+
+    def _ensure_fresh(self) -> None:
+        with self._lock:
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.ttl_seconds:
+                return
+        self.refresh()
+
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._refreshed_at = None
+
+
+    def upsert(self, tenant : SISTenant) -> None:
+        with self._lock:
+            if self._refreshed_at is None:
+                return
+            self._by_name[tenant.common_name] = replace(tenant)
+            self._unmanaged_misses.discard(tenant.common_name)
+            self._reindex()
+
+
+    def discard(self, common_name : str) -> None:
+        with self._lock:
+            if self._by_name.pop(common_name, None) is not None:
+                self._reindex()
+
+
+    def get(self, common_name : str) -> SISTenant | None:
+        self._ensure_fresh()
+        with self._lock:
+            tenant = self._by_name.get(common_name)
+            if tenant is not None:
+                return replace(tenant)
+            # A name already looked up since the last sweep is not looked up again, so bulk builds of new names stay cheap.
+            if common_name in self._unmanaged_misses:
+                return None
+        tenant = self._adopt_by_name(common_name)
+        return replace(tenant) if tenant is not None else None
+
+
+    def by_status(self, status : TenantStatus) -> list[SISTenant]:
+        self._ensure_fresh()
+        with self._lock:
+            return [replace(tenant) for tenant in self._by_status.get(status, [])]
+
+
+    def all(self) -> list[SISTenant]:
+        self._ensure_fresh()
+        with self._lock:
+            return [replace(tenant) for tenant in self._by_name.values()]
+
+
+class Route53ChangeBatcher():
+
+
+    def __init__(self, route53_client, hosted_zone_id : str):
+        self.route53_client = route53_client
+        self.hosted_zone_id = hosted_zone_id
+        self._lock = threading.Lock()
+        self._changes = {}
+
+
+    @staticmethod
+    def _key(record_set : dict) -> tuple[str, str]:
+        return (record_set['Name'].rstrip('.').lower(), record_set['Type'])
+
+
+    def add(self, action : str, record_set : dict) -> None:
+        # Route53 rejects a batch that touches the same record twice, so the latest change per record wins.
+        with self._lock:
+            key = self._key(record_set)
+            self._changes.pop(key, None)
+            self._changes[key] = {'Action': action, 'ResourceRecordSet': record_set}
+
+
+    def upsert(self, name : str, value : str, ttl : int=300, record_type : str='A') -> None:
+        self.add('UPSERT', {'Name': name, 'Type': record_type, 'TTL': ttl, 'ResourceRecords': [{'Value': value}]})
+
+
+    def delete(self, name : str, value : str, ttl : int=300, record_type : str='A') -> None:
+        self.add('DELETE', {'Name': name, 'Type': record_type, 'TTL': ttl, 'ResourceRecords': [{'Value': value}]})
+
+
+    def upsert_alias(self, name : str, dns_name : str, hosted_zone_id : str) -> None:
+        self.add('UPSERT', {'Name': name, 'Type': 'A', 'AliasTarget': {'HostedZoneId': hosted_zone_id, 'DNSName': dns_name, 'EvaluateTargetHealth': False}})
+
+
+    def delete_alias(self, name : str, dns_name : str, hosted_zone_id : str) -> None:
+        self.add('DELETE', {'Name': name, 'Type': 'A', 'AliasTarget': {'HostedZoneId': hosted_zone_id, 'DNSName': dns_name, 'EvaluateTargetHealth': False}})
+
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._changes)
+
+
+    def _split_to_limits(self, changes : list[dict]) -> list[list[dict]]:
+        # UPSERTs count twice against both per-request limits.
+        batches, batch, elements, characters = [], [], 0, 0
+        for change in changes:
+            weight = 2 if change['Action'] == 'UPSERT' else 1
+            records = change['ResourceRecordSet'].get('ResourceRecords', [{'Value': ""}])
+            change_elements = weight * len(records)
+            change_characters = weight * sum(len(record['Value']) for record in records)
+            if batch and (elements + change_elements > ROUTE53_MAX_RECORD_ELEMENTS or characters + change_characters > ROUTE53_MAX_VALUE_CHARACTERS):
+                batches.append(batch)
+                batch, elements, characters = [], 0, 0
+            batch.append(change)
+            elements += change_elements
+            characters += change_characters
+        if batch:
+            batches.append(batch)
+        return batches
+
+
+    def _submit(self, changes : list[dict], comment : str) -> list[str]:
+        try:
+            response = self.route53_client.change_resource_record_sets(
+                HostedZoneId=self.hosted_zone_id,
+                ChangeBatch={
+                    'Comment': comment,
+                    'Changes': changes,
+                }
+            )
+            return [response['ChangeInfo']['Id']]
+        except ClientError as error:
+            if error.response.get('Error', {}).get('Code') != 'InvalidChangeBatch':
+                raise
+            if len(changes) == 1:
+                record_set = changes[0]['ResourceRecordSet']
+                message = error.response['Error'].get('Message', '')
+                if changes[0]['Action'] == 'DELETE' and 'not found' in message:
+                    print(f"Route53: {record_set['Name']} was already removed.")
+                else:
+                    print(f"Route53: Skipping {changes[0]['Action']} {record_set['Name']}. {message}")
+                return []
+            # One bad change rejects the whole batch; bisect to isolate it without losing the rest.
+            middle = len(changes) // 2
+            return self._submit(changes[:middle], comment) + self._submit(changes[middle:], comment)
+
+
+    def _live_record_sets(self, keys : set[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+        # One paged listing of the zone serves every DELETE in a flush, stopping as soon as each record is found.
+        live = {}
+        paginator = self.route53_client.get_paginator('list_resource_record_sets')
+        for page in paginator.paginate(HostedZoneId=self.hosted_zone_id):
+            for record_set in page['ResourceRecordSets']:
+                if self._key(record_set) in keys:
+                    live[self._key(record_set)] = record_set
+            if len(live) == len(keys):
+                break
+        return live
+
+
+    def _drop_queued(self, queued : dict[tuple[str, str], dict], keys) -> None:
+        # A change re-queued for the same record while this one was in flight stays queued.
+        with self._lock:
+            for key in keys:
+                if self._changes.get(key) is queued[key]:
+                    del self._changes[key]
+
+
+    def flush(self, comment : str="Orchestrator DNS update") -> list[str]:
+        # Changes leave the queue only once Route53 has accepted them, so a failed flush can be retried.
+        with self._lock:
+            queued = dict(self._changes)
+
+        # A DELETE must match the live TTL and values exactly, so it is rebuilt from the record set Route53 holds.
+        deletes = {key for key, change in queued.items() if change['Action'] == 'DELETE'}
+        live = self._live_record_sets(deletes) if deletes else {}
+        changes = []
+        for key, change in queued.items():
+            if change['Action'] != 'DELETE':
+                changes.append(change)
+            elif key in live:
+                changes.append({'Action': 'DELETE', 'ResourceRecordSet': live[key]})
+            else:
+                print(f"Route53: {change['ResourceRecordSet']['Name']} was already removed.")
+                self._drop_queued(queued, [key])
+
+        change_ids = []
+        for batch in self._split_to_limits(changes):
+            change_ids += self._submit(batch, comment)
+            self._drop_queued(queued, [self._key(change['ResourceRecordSet']) for change in batch])
+        return change_ids
+
+
+    def wait_until_insync(self, change_ids : list[str], delay : float=5.0, timeout_seconds : float=600.0) -> bool:
+        pending = set(change_ids)
+        deadline = time.monotonic() + timeout_seconds
+        while pending:
+            for change_id in list(pending):
+                if self.route53_client.get_change(Id=change_id)['ChangeInfo']['Status'] == 'INSYNC':
+                    pending.discard(change_id)
+            if not pending:
+                break
+            if time.monotonic() > deadline:
+                print(f"Route53: {len(pending)} change batch(es) still PENDING after {timeout_seconds:0.0f} seconds.")
+                return False
+            time.sleep(delay)
+        return True
+
+
+class ALBHostRouter():
+    # Host-header routing on the shared ALB: one target group and one listener rule per tenant hostname.
+
+
+    def __init__(self, elb_client, aws_config : SISAWSConfiguration):
+        self.elb_client = elb_client
+        self.aws_config = aws_config
+        self._lock = threading.Lock()
+        self._load_balancer = None
+        self._listener_arn = None
+        self._pending_routes = {}
+        self._pending_target_group_deletes = set()
+
+
+    def load_balancer(self) -> dict:
+        if self._load_balancer is None:
+            self._load_balancer = self.elb_client.describe_load_balancers(LoadBalancerArns=[self.aws_config.load_balancer_arn])['LoadBalancers'][0]
+        return self._load_balancer
+
+
+    def listener_arn(self) -> str:
+        if self._listener_arn is None:
+            listeners = self.elb_client.describe_listeners(LoadBalancerArn=self.aws_config.load_balancer_arn)['Listeners']
+            self._listener_arn = next(listener['ListenerArn'] for listener in listeners if listener['Port'] == self.aws_config.listener_port)
+        return self._listener_arn
+
+
+    @staticmethod
+    def target_group_name(common_name : str) -> str:
+        # Target group names are at most 32 alphanumerics or hyphens and cannot end in a hyphen.
+        return re.sub(r"[^A-Za-z0-9-]", "-", f"sis-{common_name}")[:32].rstrip("-")
+
+
+    def ensure_target_group(self, common_name : str) -> str:
+        # create_target_group returns the existing group when the name and settings already match.
+        response = self.elb_client.create_target_group(
+            Name=self.target_group_name(common_name),
+            Protocol=self.aws_config.target_group_protocol,
+            Port=self.aws_config.target_group_port,
+            VpcId=self.aws_config.vpc_id,
+            TargetType='instance',
+            HealthCheckProtocol=self.aws_config.target_group_protocol,
+            HealthCheckPath=self.aws_config.health_check_path,
+            HealthCheckIntervalSeconds=10,
+            HealthyThresholdCount=2,
+            Matcher={'HttpCode': '200-399'},
+            Tags=[
+                {
+                    'Key': 'Name',
+                    'Value': f"{common_name}"
+                },
+                {
+                    'Key': 'OrchestratorManaged',
+                    'Value': 'True'
+                },
+            ],
+        )
+        return response['TargetGroups'][0]['TargetGroupArn']
+
+
+    def register(self, target_group_arn : str, instance_id : str) -> None:
+        # A rebuilt tenant reuses its target group, so the instance it replaced is deregistered before the new one takes traffic.
+        descriptions = self.elb_client.describe_target_health(TargetGroupArn=target_group_arn)['TargetHealthDescriptions']
+        stale_targets = [description['Target'] for description in descriptions if description['Target']['Id'] != instance_id]
+        if stale_targets:
+            self.elb_client.deregister_targets(TargetGroupArn=target_group_arn, Targets=stale_targets)
+        self.elb_client.register_targets(TargetGroupArn=target_group_arn, Targets=[{'Id': instance_id}])
+
+
+    def route(self, hostname : str, target_group_arn : str) -> None:
+        with self._lock:
+            self._pending_routes[hostname.lower()] = target_group_arn
+
+
+    def unroute(self, hostname : str, target_group_arn : str="") -> None:
+        with self._lock:
+            self._pending_routes[hostname.lower()] = None
+            if target_group_arn:
+                self._pending_target_group_deletes.add(target_group_arn)
+
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending_routes) + len(self._pending_target_group_deletes)
+
+
+    def _host_rules(self) -> dict[str, dict]:
+        rules = {}
+        arguments = {'ListenerArn': self.listener_arn(), 'PageSize': 400}
+        while True:
+            response = self.elb_client.describe_rules(**arguments)
+            for rule in response['Rules']:
+                if rule['IsDefault']:
+                    continue
+                target_group_arn = next((action.get('TargetGroupArn', "") for action in rule['Actions'] if action['Type'] == 'forward'), "")
+                for condition in rule['Conditions']:
+                    if condition['Field'] == 'host-header':
+                        for host in condition.get('HostHeaderConfig', {}).get('Values', condition.get('Values', [])):
+                            rules[host.lower()] = {'RuleArn': rule['RuleArn'], 'Priority': int(rule['Priority']), 'TargetGroupArn': target_group_arn}
+            if not response.get('NextMarker'):
+                return rules
+            arguments['Marker'] = response['NextMarker']
+
+
+    def _create_rule(self, host : str, actions : list[dict], free_priorities) -> None:
+        # Another orchestrator can take a gap between the describe_rules sweep and this call, so PriorityInUse moves on to the next one.
+        for priority in free_priorities:
+            try:
+                self.elb_client.create_rule(
+                    ListenerArn=self.listener_arn(),
+                    Priority=priority,
+                    Conditions=[{'Field': 'host-header', 'HostHeaderConfig': {'Values': [host]}}],
+                    Actions=actions,
+                )
+                return
+            except ClientError as error:
+                if error.response.get('Error', {}).get('Code') != 'PriorityInUse':
+                    raise
+        raise RuntimeError(f"ALB: No free rule priority for {host}; every priority up to {ALB_MAX_RULE_PRIORITY} is in use on the listener.")
+
+
+    def apply(self) -> None:
+        # One describe_rules sweep serves every queued change, and priorities are handed out from the gaps it finds.
+        with self._lock:
+            routes = self._pending_routes
+            target_group_deletes = self._pending_target_group_deletes
+            self._pending_routes = {}
+            self._pending_target_group_deletes = set()
+        if not routes and not target_group_deletes:
+            return
+
+        unapplied_routes = dict(routes)
+        try:
+            rules = self._host_rules()
+            used_priorities = {rule['Priority'] for rule in rules.values()}
+            free_priorities = (priority for priority in range(1, ALB_MAX_RULE_PRIORITY + 1) if priority not in used_priorities)
+
+            for host, target_group_arn in routes.items():
+                rule = rules.get(host)
+                if target_group_arn is None:
+                    if rule is not None:
+                        self.elb_client.delete_rule(RuleArn=rule['RuleArn'])
+                else:
+                    actions = [{'Type': 'forward', 'TargetGroupArn': target_group_arn}]
+                    if rule is None:
+                        self._create_rule(host, actions, free_priorities)
+                    elif rule['TargetGroupArn'] != target_group_arn:
+                        self.elb_client.modify_rule(RuleArn=rule['RuleArn'], Actions=actions)
+                unapplied_routes.pop(host)
+        except Exception:
+            # Whatever was not applied goes back on the queue for the next flush, unless the same host has been queued again since.
+            with self._lock:
+                for host, target_group_arn in unapplied_routes.items():
+                    self._pending_routes.setdefault(host, target_group_arn)
+                self._pending_target_group_deletes |= target_group_deletes
+            raise
+
+        for target_group_arn in target_group_deletes:
+            try:
+                self.elb_client.delete_target_group(TargetGroupArn=target_group_arn)
+            except ClientError as error:
+                print(f"ALB: Could not delete target group {target_group_arn}. {error}")
+        print(f"ALB: Applied {len(routes)} routing change(s).")
+
+
+    def wait_until_healthy(self, targets : dict[str, str], delay : float=5.0, timeout_seconds : float=900.0) -> dict[str, float]:
+        # targets maps instance ID to target group ARN; every pending target is checked concurrently each round.
+        healthy = {}
+        pending = dict(targets)
+        tic = time.monotonic()
+
+        def target_state(item : tuple[str, str]) -> str:
+            instance_id, target_group_arn = item
+            descriptions = self.elb_client.describe_target_health(TargetGroupArn=target_group_arn, Targets=[{'Id': instance_id}])['TargetHealthDescriptions']
+            return descriptions[0]['TargetHealth']['State'] if descriptions else 'unused'
+
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(pending))), thread_name_prefix="target-health") as executor:
+            while pending:
+                items = list(pending.items())
+                for (instance_id, _), state in zip(items, executor.map(target_state, items)):
+                    if state == 'healthy':
+                        healthy[instance_id] = time.monotonic() - tic
+                        pending.pop(instance_id)
+                if not pending:
+                    break
+                if time.monotonic() - tic > timeout_seconds:
+                    print(f"ALB: {len(pending)} target(s) still unhealthy after {timeout_seconds:0.0f} seconds.")
+                    break
+                time.sleep(delay)
+        return healthy
 
 
 # Orchestrators
@@ -86,48 +827,219 @@ class Orchestrator(ABC):
         pass
 
 
+    @abstractmethod
+    def list_tenants(self) -> list[OrchestratorTenant]:
+        pass
+
+
 class SISOrchestrator(Orchestrator):
 
 
-    def __init__(self):
-        self.ec2_resource = boto3.resource("ec2")
-        self.ec2_client = boto3.client("ec2")
-        self.route53_client = boto3.client("route53")
-        self.elb_client = boto3.client('elbv2')
-        self.ssm_client = boto3.client('ssm', region_name="us-east-1")
+    def __init__(self, state_store_path : str=DEFAULT_STATE_STORE_PATH, session_factory=boto3.session.Session):
+        # session_factory is swapped for a simulated backend when benchmarking.
+        self.session_factory = session_factory
+        session = session_factory()
+        self.ec2_resource = session.resource("ec2")
+        self.ec2_client = session.client("ec2")
+        self.route53_client = session.client("route53")
+        self.elb_client = session.client('elbv2')
+        self.ssm_client = session.client('ssm', region_name="us-east-1")
+        self.rate_limiter = AWSRateLimiter()
+        for client in (self.ec2_resource.meta.client, self.ec2_client, self.route53_client, self.elb_client, self.ssm_client):
+            self.rate_limiter.attach(client)
         self.aws_config = SISAWSConfiguration()
+        self.batch_ssm_commands = True
+        self.stock_restore_mode = StockRestoreMode.SERIAL
+        # When set, every successful build or rebuild ends with a fresh baseline snapshot for REPLACE_ROOT_FROM_SNAPSHOT recycles.
+        self.capture_baselines = False
+        self.restore_timings = {}
+        self.metrics = PhaseMetrics()
+        self.state_store = OrchestratorStateStore(state_store_path)
+        self.readiness_tracker = SSMReadinessTracker(self.ssm_client)
+        self.readiness_metrics = {}
+        self.reserve_pool = None
+        self.inventory = SISTenantInventory(self.ec2_client)
+        self.dns_batcher = Route53ChangeBatcher(self.route53_client, self.aws_config.hosted_zone_id)
+        self.alb_routing = False
+        self.alb_router = ALBHostRouter(self.elb_client, self.aws_config)
+        # Holds the open deferred_dns_changes batch for the current call path; workers inherit it through _run_concurrently.
+        self._dns_deferral = contextvars.ContextVar(f"dns_deferral_{id(self)}", default=None)
+        self._launch_template_lock = threading.Lock()
+        self._launch_template_ready = False
+        # boto3 resources are not thread safe, so each worker thread gets its own.
+        self._thread_state = threading.local()
+        self._thread_state.ec2_resource = self.ec2_resource
 
 
-    def _await_ssm_availability(self, tenant : SISTenant):
-        print(f"{tenant.common_name}: Awaiting SSM Availability.")
-        if tenant.ssm_available == False:
-            for i in range(1, 1000):
-                response = self.ssm_client.describe_instance_information(Filters=[{'Key': 'InstanceIds', 'Values': [tenant.aws_instance_id]}])
-                if len(response["InstanceInformationList"]) > 0 and \
-                        response["InstanceInformationList"][0]["PingStatus"] == "Online" and \
-                        response["InstanceInformationList"][0]["InstanceId"] == tenant.aws_instance_id:
-                    tenant.ssm_available = True
-                    break
-                time.sleep(1)
+    def _thread_ec2_resource(self):
+        if not hasattr(self._thread_state, "ec2_resource"):
+            self._thread_state.ec2_resource = self.session_factory().resource("ec2")
+            self.rate_limiter.attach(self._thread_state.ec2_resource.meta.client)
+        return self._thread_state.ec2_resource
 
 
-    def _run_powershell_command(self, tenant : SISTenant, powershell_command : str):
-        
+    def _await_ssm_availability(self, tenant : SISTenant) -> ReadinessResult:
+        print(f"{tenant.common_name}: Awaiting SSM Availability.")
         if tenant.ssm_available:
-            response = self.ssm_client.send_command( InstanceIds=[tenant.aws_instance_id], DocumentName="AWS-RunPowerShellScript", Parameters={'commands':[powershell_command]},)
+            return ReadinessResult(instance_id=tenant.aws_instance_id, ready=True)
+
+        with self.metrics.phase(tenant.common_name, "await_ssm_availability"):
+            result = self.readiness_tracker.wait(tenant.aws_instance_id)
+        tenant.ssm_available = True
+        self.readiness_metrics[tenant.common_name] = result
+        print(f"{tenant.common_name}: SSM Available after {result.latency_seconds:0.1f} seconds ({result.polls} polls).")
+        return result
+
+
+    def _run_powershell_command(self, tenant : SISTenant, powershell_command : str, description : str="Running PowerShell Command.") -> CommandStepResult:
+        return self._run_powershell_steps(tenant, [{"Description": description, "Command": powershell_command}])[0]
+
+
+    @staticmethod
+    def _keyed_steps(phase : str, command_steps : list[dict]) -> list[dict]:
+        return [{**step, "Key": f"{phase}:{index}"} for index, step in enumerate(command_steps)]
+
+
+    @staticmethod
+    def _build_batched_script(command_steps : list[dict], first_index : int=0) -> list[str]:
+        # Every step reports its own exit code and duration, and the chain stops at the first failure: a cmdlet error or a
+        # native exit code that is neither 0 nor one of the step's WarningExitCodes. Each step is written to exit 0 when it
+        # did its job (see "Starting Oracle TNS Listener."), so only the Data Pump imports need warning codes.
+        script = ["$ErrorActionPreference = 'Stop'"]
+        for index, step in enumerate(command_steps, start=first_index):
+            warning_exit_codes = ", ".join(str(code) for code in step.get("WarningExitCodes", ()))
+            failed = f"$stepExitCode -ne 0 -and @({warning_exit_codes}) -notcontains $stepExitCode" if warning_exit_codes else "$stepExitCode -ne 0"
+            script += [
+                "$global:LASTEXITCODE = 0",
+                "$stepTimer = [Diagnostics.Stopwatch]::StartNew()",
+                "try {",
+                f"    $stepOutput = & {{ {step['Command']} }} | Out-String",
+                "    $stepExitCode = [int]$LASTEXITCODE",
+                "} catch {",
+                "    $stepOutput = $_ | Out-String",
+                "    $stepExitCode = 1",
+                "}",
+                f"Write-Output ('ORCHESTRATOR_STEP|{index}|' + $stepExitCode + '|' + [int]$stepTimer.Elapsed.TotalMilliseconds)",
+                f"if ({failed}) {{",
+                "    Write-Output $stepOutput.Substring([Math]::Max(0, $stepOutput.Length - 1000))",
+                "    exit $stepExitCode",
+                "}",
+            ]
+        # A warning exit code from the last step must not fail the invocation.
+        script.append("$global:LASTEXITCODE = 0")
+        return script
+
+
+    def _group_command_steps(self, command_steps : list[dict]) -> list[list[int]]:
+        # Consecutive chainable steps share one SSM invocation; "Chainable": False steps run on their own.
+        groups = []
+        for index, step in enumerate(command_steps):
+            if self.batch_ssm_commands and groups and step.get("Chainable", True) and command_steps[index - 1].get("Chainable", True):
+                groups[-1].append(index)
+            else:
+                groups.append([index])
+        return groups
+
+
+    @staticmethod
+    def _apply_step_markers(results : list[CommandStepResult], output : str) -> None:
+        for match in STEP_MARKER_PATTERN.finditer(output or ""):
+            index, exit_code, milliseconds = (int(value) for value in match.groups())
+            if index < len(results):
+                results[index].exit_code = exit_code
+                results[index].elapsed_seconds = milliseconds / 1000
+                if exit_code == 0:
+                    results[index].status = "Success"
+                elif exit_code in results[index].warning_exit_codes:
+                    results[index].status = "Warning"
+                else:
+                    results[index].status = "Failed"
+
+
+    def _run_powershell_steps(self, tenant : SISTenant, command_steps : list[dict]) -> list[CommandStepResult]:
+        results = [CommandStepResult.from_step(step) for step in command_steps]
+
+        if not tenant.ssm_available:
+            print(f"Instance {tenant.aws_instance_id} not listed as instance managed by AWS SSM")
+            return results
+
+        for group in self._group_command_steps(command_steps):
+            script = self._build_batched_script([command_steps[index] for index in group], first_index=group[0])
+            response = self.ssm_client.send_command(
+                InstanceIds=[tenant.aws_instance_id],
+                DocumentName="AWS-RunPowerShellScript",
+                Parameters={
+                    'commands': script,
+                    'executionTimeout': [str(min(SSM_MAX_EXECUTION_TIMEOUT, 3600 * len(group)))],
+                },
+            )
             command_id = response['Command']['CommandId']
             waiter = self.ssm_client.get_waiter('command_executed')
-            waiter.wait(
-                CommandId=command_id,
-                InstanceId=tenant.aws_instance_id,
-                WaiterConfig={
-                    'Delay': 2,
-                    'MaxAttempts': 30000
-                }
-            )
-            
-        else:
-            print(f"Instance {tenant.aws_instance_id} not listed as instance managed by AWS SSM")
+            try:
+                waiter.wait(
+                    CommandId=command_id,
+                    InstanceId=tenant.aws_instance_id,
+                    WaiterConfig={
+                        'Delay': 2,
+                        'MaxAttempts': 30000
+                    }
+                )
+            except WaiterError:
+                # A failed step fails the whole invocation; the markers below say which one.
+                pass
+
+            invocation = self.ssm_client.get_command_invocation(CommandId=command_id, InstanceId=tenant.aws_instance_id)
+            self._apply_step_markers(results, invocation.get('StandardOutputContent', ""))
+
+            for index in group:
+                if results[index].status == "Skipped" and invocation.get('Status') != "Success":
+                    # The invocation died before this step reported back (timeout, cancellation, agent restart).
+                    results[index].status = "Failed"
+                    results[index].exit_code = invocation.get('ResponseCode')
+                    results[index].output = invocation.get('StandardErrorContent', "")
+                    break
+
+            for index in group:
+                result = results[index]
+                if result.status != "Skipped":
+                    print(f"{tenant.common_name}: {result.description} ({result.status}, {result.elapsed_seconds:0.1f}s)")
+                    self._record_step_metrics(tenant, [result])
+                if result.status == "Warning":
+                    print(f"{tenant.common_name}: {result.description} finished with warnings (exit code {result.exit_code}).")
+                if result.status == "Failed":
+                    result.output = result.output or invocation.get('StandardOutputContent', "")
+                    raise CommandStepError(tenant, results)
+
+        return results
+
+
+    def _run_checkpointed_steps(self, tenant : SISTenant, phase : str, command_steps : list[dict]) -> list[CommandStepResult]:
+        # Steps already recorded for this tenant are skipped, so an interrupted build resumes where it stopped.
+        completed = self.state_store.completed_steps(tenant.common_name)
+        keyed_steps = [(f"{step['Key']}:{step['Description']}", step) for step in self._keyed_steps(phase, command_steps)]
+        pending_steps = [(key, step) for key, step in keyed_steps if key not in completed or not step.get("Checkpointed", True)]
+        if len(pending_steps) < len(keyed_steps):
+            print(f"{tenant.common_name}: Resuming {phase} after {len(keyed_steps) - len(pending_steps)} completed step(s).")
+
+        try:
+            results = self._run_powershell_steps(tenant, [step for _, step in pending_steps])
+        except CommandStepError as error:
+            self._checkpoint_steps(tenant, pending_steps, error.results)
+            raise
+        self._checkpoint_steps(tenant, pending_steps, results)
+        return results
+
+
+    def _checkpoint_steps(self, tenant : SISTenant, steps : list[tuple[str, dict]], results : list[CommandStepResult]) -> None:
+        for (key, step), result in zip(steps, results):
+            if result.completed and step.get("Checkpointed", True):
+                self.state_store.complete_step(tenant.common_name, key)
+
+
+    def _record_step_metrics(self, tenant : SISTenant, results : list[CommandStepResult]) -> None:
+        for result in results:
+            if result.status != "Skipped":
+                self.metrics.record(tenant.common_name, f"powershell: {result.key}", result.elapsed_seconds, succeeded=result.completed)
 
 
     def _load_active_tenant_from_common_name(self, common_name : str) -> SISTenant:
@@ -138,53 +1050,140 @@ class SISOrchestrator(Orchestrator):
             ssm_available=True,
         )
         
-        response = self.ec2_client.describe_instances(
-            Filters=[
-                {
-                    'Name': 'tag:Name',
-                    'Values': [
-                        f'{tenant.common_name}',
-                    ]
-                },
-            ],
-        )
-
-        try:
-            tenant.aws_instance_id = response['Reservations'][0]['Instances'][0].get('InstanceId')
-        except IndexError:
+        cached_tenant = self.inventory.get(common_name)
+        if cached_tenant is None:
             print(f"{common_name}: No Instance with Name: {common_name}.")
             tenant.status = TenantStatus.NEW
+        else:
+            tenant.aws_instance_id = cached_tenant.aws_instance_id
+            tenant.aws_private_ip = cached_tenant.aws_private_ip
+            tenant.aws_public_ip = cached_tenant.aws_public_ip
+            tenant.aws_target_group_arn = cached_tenant.aws_target_group_arn
 
         return tenant
 
 
-    def _add_route53_record(self, tenant : SISTenant ) -> None:
-        print(f"{tenant.common_name}: Updating Route53 DNS.")
+    def _tenant_hostname(self, tenant : SISTenant) -> str:
+        return f"{tenant.common_name}.{self.aws_config.domain_name}"
+
+
+    @property
+    def _dns_deferred(self) -> bool:
+        return self._dns_deferral.get() is not None
+
+
+    @contextmanager
+    def deferred_dns_changes(self):
+        # DNS changes queued inside this block are published as one change set when the outermost block exits.
+        # Results added to the yielded list are failed, rather than lost, when that publish fails.
+        batch_results = self._dns_deferral.get()
+        if batch_results is not None:
+            yield batch_results
+            return
+
+        batch_results = []
+        token = self._dns_deferral.set(batch_results)
         try:
-            self.route53_client.change_resource_record_sets(
-                HostedZoneId = 'Z2TZA0SF7FNEIO',
-                ChangeBatch= {
-                    'Comment': 'Add new instance to Route53',
-                    'Changes': [
-                        {
-                            'Action': 'CREATE',
-                            'ResourceRecordSet': {
-                                'Name': f'{tenant.common_name}.powerschoolsales.com',
-                                'Type': 'A',
-                                'TTL': 300,
-                                'ResourceRecords': [
-                                {
-                                    'Value': '107.21.33.158'
-                                },
-                                ],
-                            }
-                        },
-                    ]
-                }
-            )
-            print(f"{tenant.common_name}: Route53 Succssfully Updated!")              
-        except:
-            print("Something went wrong attempting to update Route53. Record Likely Already Exists.")
+            yield batch_results
+        finally:
+            self._dns_deferral.reset(token)
+            try:
+                self._flush_dns_changes()
+            except (ClientError, BotoCoreError, RuntimeError) as error:
+                print(f"Route53: Publishing deferred DNS changes failed. {error}")
+                for result in batch_results:
+                    if result.succeeded:
+                        result.succeeded = False
+                        result.error = f"DNS publish failed. {type(error).__name__}: {error}"
+
+
+    def _flush_dns_changes(self) -> None:
+        if self._dns_deferred:
+            return
+        # Route53 is still published when the ALB rules fail, and the first failure is raised once both have run.
+        errors = []
+        if self.alb_router.pending():
+            try:
+                with self.metrics.phase("fleet", "alb_rules"):
+                    self.alb_router.apply()
+            except (ClientError, BotoCoreError, RuntimeError) as error:
+                errors.append(error)
+        if self.dns_batcher.pending():
+            print(f"Route53: Publishing {self.dns_batcher.pending()} DNS change(s).")
+            try:
+                with self.metrics.phase("fleet", "dns_update"):
+                    change_ids = self.dns_batcher.flush()
+                    if change_ids and self.dns_batcher.wait_until_insync(change_ids):
+                        print(f"Route53: {len(change_ids)} change batch(es) INSYNC.")
+            except (ClientError, BotoCoreError) as error:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+
+    def _add_route53_record(self, tenant : SISTenant ) -> None:
+        if self.alb_routing:
+            self._add_alb_route(tenant)
+        else:
+            print(f"{tenant.common_name}: Updating Route53 DNS.")
+            self.dns_batcher.upsert(self._tenant_hostname(tenant), self.aws_config.public_endpoint_ip)
+        self._flush_dns_changes()
+
+
+    def _remove_route53_record(self, tenant : SISTenant) -> None:
+        # A tenant that was routed through the ALB keeps its rule and target group until they are removed here, whatever the current mode.
+        if self.alb_routing or tenant.aws_target_group_arn:
+            self._remove_alb_route(tenant)
+        else:
+            print(f"{tenant.common_name}: Removing Route53 DNS.")
+            self.dns_batcher.delete(self._tenant_hostname(tenant), self.aws_config.public_endpoint_ip)
+        self._flush_dns_changes()
+
+
+    def _add_alb_route(self, tenant : SISTenant) -> None:
+        # The hostname aliases the ALB once; after that, recycles only change the target group behind its rule.
+        print(f"{tenant.common_name}: Routing {self._tenant_hostname(tenant)} through the ALB.")
+        tenant.aws_target_group_arn = self.alb_router.ensure_target_group(tenant.common_name)
+        self.alb_router.register(tenant.aws_target_group_arn, tenant.aws_instance_id)
+        self.ec2_client.create_tags(
+            Resources=[
+                tenant.aws_instance_id,
+            ],
+            Tags=[
+                {
+                    'Key': 'OrchestratorTargetGroupArn',
+                    'Value': tenant.aws_target_group_arn
+                },
+            ]
+        )
+        self.inventory.upsert(tenant)
+        self.alb_router.route(self._tenant_hostname(tenant), tenant.aws_target_group_arn)
+        load_balancer = self.alb_router.load_balancer()
+        self.dns_batcher.upsert_alias(self._tenant_hostname(tenant), load_balancer['DNSName'], load_balancer['CanonicalHostedZoneId'])
+
+
+    def _remove_alb_route(self, tenant : SISTenant) -> None:
+        print(f"{tenant.common_name}: Removing ALB route for {self._tenant_hostname(tenant)}.")
+        target_group_arn = tenant.aws_target_group_arn
+        if not target_group_arn:
+            cached_tenant = self.inventory.get(tenant.common_name)
+            target_group_arn = cached_tenant.aws_target_group_arn if cached_tenant else ""
+        self.alb_router.unroute(self._tenant_hostname(tenant), target_group_arn)
+        load_balancer = self.alb_router.load_balancer()
+        self.dns_batcher.delete_alias(self._tenant_hostname(tenant), load_balancer['DNSName'], load_balancer['CanonicalHostedZoneId'])
+
+
+    def await_tenants_healthy(self, tenants : list[SISTenant]) -> dict[str, float]:
+        targets = {tenant.aws_instance_id: tenant.aws_target_group_arn for tenant in tenants if tenant.aws_target_group_arn}
+        if not targets:
+            return {}
+        print(f"ALB: Awaiting {len(targets)} healthy target(s).")
+        with self.metrics.phase("fleet", "await_target_health"):
+            healthy = self.alb_router.wait_until_healthy(targets)
+        for tenant in tenants:
+            if tenant.aws_instance_id in healthy:
+                print(f"{tenant.common_name}: Serving traffic after {healthy[tenant.aws_instance_id]:0.1f} seconds.")
+        return healthy
 
 
     def _update_orchestrator_status(self, tenant : SISTenant) -> None:
@@ -199,14 +1198,58 @@ class SISOrchestrator(Orchestrator):
                 },
             ]
         )
+        self.inventory.upsert(tenant)
+        self.state_store.save_tenant(tenant.common_name, tenant.product.value, tenant.status.value, tenant.aws_instance_id, tenant.aws_private_ip)
 
 
-    def _create_instance(self, tenant : SISTenant) -> None:
-        print(f"{tenant.common_name}: Creating EC2 Instance for {tenant.common_name}.")
+    @staticmethod
+    def _instance_identity_tags(common_name : str, aws_config : SISAWSConfiguration) -> list[dict]:
+        return [
+            {
+                'Key': 'Name',
+                'Value': f"{common_name}"
+            },
+            {
+                'Key': 'Domain',
+                'Value': f"https://{common_name}.{aws_config.domain_name}"
+            },
+        ]
 
-        instance = self.ec2_resource.create_instances(
-                ImageId=self.aws_config.ami_id,
-                MinCount=1,
+
+    @staticmethod
+    def _managed_instance_tags(status : TenantStatus) -> list[dict]:
+        return [
+            {
+                'Key': 'Owner',
+                'Value': "Solution Engineering"
+            },
+            {
+                'Key': 'OrchestratorManaged',
+                'Value': "True"
+            },
+            {
+                'Key': 'OrchestratorTenantStatus',
+                'Value': f"{status.value}"
+            },
+            {
+                'Key': 'EffectiveDate',
+                'Value': f"{date.today()}"
+            },
+        ]
+
+
+    def _create_instance(self, tenant : SISTenant, image_id : str | None=None, user_data : str | None=None) -> None:
+        print(f"{tenant.common_name}: Creating EC2 Instance for {tenant.common_name}.")
+        if user_data is None:
+            user_data = BOOTSTRAP_USER_DATA if self.aws_config.ami_bootstrapped else ""
+        launch_arguments = {'UserData': user_data} if user_data else {}
+        if self.aws_config.hibernation_enabled:
+            launch_arguments['HibernationOptions'] = {'Configured': True}
+
+        tic = time.perf_counter()
+        instance = self._thread_ec2_resource().create_instances(
+                ImageId=image_id or self.aws_config.ami_id,
+                MinCount=1,
                 MaxCount=1,
                 InstanceType=self.aws_config.instance_type,
                 KeyName=self.aws_config.key_name,
@@ -216,98 +1259,89 @@ class SISOrchestrator(Orchestrator):
                 TagSpecifications=[
                     {
                         "ResourceType": "instance",
-                        "Tags": [
-                            {
-                                "Key": "Name",
-                                "Value": f"{tenant.common_name}"
-                            },
-                            {
-                                "Key": "Owner",
-                                "Value": "Solution Engineering"
-                            },
-                            {
-                                "Key": "Domain",
-                                "Value": f"https://{tenant.common_name}.powerschoolsales.com"
-                            },
-                            {
-                                "Key": "OrchestratorManaged",
-                                "Value": "True"
-                            },
-                            {
-                                "Key": "OrchestratorTenantStatus",
-                                "Value": f"{tenant.status.value}"
-                            },
-                            {
-                                "Key": "EffectiveDate",
-                                "Value": f"{date.today()}"
-                            },
-                        ]
+                        "Tags": self._instance_identity_tags(tenant.common_name, self.aws_config) + self._managed_instance_tags(tenant.status)
                     },
                 ],
                 SecurityGroupIds=[self.aws_config.security_group_id],
-                SubnetId=self.aws_config.subnet_id
+                SubnetId=self.aws_config.subnet_id,
+                **launch_arguments
             )[0]
-        
-        instance.wait_until_running()
+        self.metrics.record(tenant.common_name, "create_instance", time.perf_counter() - tic)
+
+        with self.metrics.phase(tenant.common_name, "wait_until_running"):
+            instance.wait_until_running()
         tenant.aws_instance_id = instance.id
         tenant.aws_private_ip = instance.private_ip_address
+        tenant.aws_instance_state = "running"
+        tenant.aws_hibernation_configured = self.aws_config.hibernation_enabled
         tenant.status = TenantStatus.INSTANTIATED
         self._update_orchestrator_status(tenant)
+        self.state_store.complete_step(tenant.common_name, "create_instance")
 
 
-    def _execute_post_instantiation_commands(self, tenant : SISTenant):
-        command_steps = [
+    @staticmethod
+    def _post_instantiation_command_steps(private_ip : str) -> list[dict]:
+        # private_ip is either a literal address or a PowerShell expression such as $privateIp.
+        # Start steps are never checkpointed, so a resume re-runs them against whatever is already up: _resume_tenant only starts
+        # the instance, and an interrupted build leaves it running. Each one must succeed whether or not its service is running.
+        return [
             {
             "Description" : "Updating ORACLE_HOSTNAME Variable.",
-            "Command" : f"setx /M ORACLE_HOSTNAME {tenant.aws_private_ip}"
+            "Command" : f"setx /M ORACLE_HOSTNAME {private_ip}"
             },
             {
             "Description" : "Updating ORACLE_HOSTNAME Variable.",
-            "Command" : f"set ORACLE_HOSTNAME= {tenant.aws_private_ip}"
+            "Command" : f"set ORACLE_HOSTNAME= {private_ip}"
             },
             {
             "Description" : "Updating Private IP in Oracle tsnames.ora.",
-            "Command" : f"((Get-Content -path $Env:ORACLE_HOME\\network\\admin\\tnsnames.ora -Raw) -replace 'POWERSCHOOLSISPRIVATEIP','{tenant.aws_private_ip}') | Set-Content -Path $Env:ORACLE_HOME\\network\\admin\\tnsnames.ora"
+            "Command" : f"((Get-Content -path $Env:ORACLE_HOME\\network\\admin\\tnsnames.ora -Raw) -replace 'POWERSCHOOLSISPRIVATEIP',\"{private_ip}\") | Set-Content -Path $Env:ORACLE_HOME\\network\\admin\\tnsnames.ora"
             },
             {
             "Description" : "Updating Private IP in Oracle listener.ora.",
-            "Command" : f"((Get-Content -path $Env:ORACLE_HOME\\network\\admin\\listener.ora -Raw) -replace 'POWERSCHOOLSISPRIVATEIP','{tenant.aws_private_ip}') | Set-Content -Path $Env:ORACLE_HOME\\network\\admin\\listener.ora"
+            "Command" : f"((Get-Content -path $Env:ORACLE_HOME\\network\\admin\\listener.ora -Raw) -replace 'POWERSCHOOLSISPRIVATEIP',\"{private_ip}\") | Set-Content -Path $Env:ORACLE_HOME\\network\\admin\\listener.ora"
             },
             {
             "Description" : "Updating Private IP in PowerSchool service.properties.",
-            "Command" : f"((Get-Content -path \"C:\\Program Files\\PowerSchool\\configuration\\services\\oracle\\service.properties\" -Raw) -replace 'POWERSCHOOLSISPRIVATEIP','{tenant.aws_private_ip}') | Set-Content -Path \"C:\\Program Files\\PowerSchool\\configuration\\services\\oracle\\service.properties\""
+            "Command" : f"((Get-Content -path \"C:\\Program Files\\PowerSchool\\configuration\\services\\oracle\\service.properties\" -Raw) -replace 'POWERSCHOOLSISPRIVATEIP',\"{private_ip}\") | Set-Content -Path \"C:\\Program Files\\PowerSchool\\configuration\\services\\oracle\\service.properties\""
             },
             {
             "Description"  : "Updating Private IP in PowerSchool deployment.properties.",
-            "Command" : f"((Get-Content -path \"C:\\Program Files\\PowerSchool\\configuration\\deployment.properties\" -Raw) -replace 'POWERSCHOOLSISPRIVATEIP','{tenant.aws_private_ip}') | Set-Content -Path \"C:\\Program Files\\PowerSchool\\configuration\\deployment.properties\""
+            "Command" : f"((Get-Content -path \"C:\\Program Files\\PowerSchool\\configuration\\deployment.properties\" -Raw) -replace 'POWERSCHOOLSISPRIVATEIP',\"{private_ip}\") | Set-Content -Path \"C:\\Program Files\\PowerSchool\\configuration\\deployment.properties\""
             },
             {
             "Description" : "Updating Private IP in Orchestrator oracle_listener_update.sql.",
-            "Command" : f"((Get-Content -path $Env:ORCHESTRATOR_HOME\\oracle_listener_update.sql -Raw) -replace 'POWERSCHOOLSISPRIVATEIP','{tenant.aws_private_ip}') | Set-Content -Path $Env:ORCHESTRATOR_HOME\\oracle_listener_update.sql"
+            "Command" : f"((Get-Content -path $Env:ORCHESTRATOR_HOME\\oracle_listener_update.sql -Raw) -replace 'POWERSCHOOLSISPRIVATEIP',\"{private_ip}\") | Set-Content -Path $Env:ORCHESTRATOR_HOME\\oracle_listener_update.sql"
             },
             {
             "Description" : "Starting Oracle TNS Listener.",
-            "Command" : f"lsnrctl start"
+            # lsnrctl start exits non-zero (TNS-01106) when the listener is already up.
+            "Command" : f"lsnrctl status | Out-Null ; if ($LASTEXITCODE -ne 0) {{ lsnrctl start }}",
+            "Checkpointed" : False
             },
             {
             "Description": "Starting OracleService (This Takes Some Time.)",
-            "Command" : f"Start-Service -Name \"OracleServicePSPRODDB\""
+            "Command" : f"Start-Service -Name \"OracleServicePSPRODDB\"",
+            "Checkpointed" : False
             },
             {
             "Description": "Starting OracleVssWriter.",
-            "Command" : f"Start-Service -Name \"OracleVssWriterPSPRODDB\""
+            "Command" : f"Start-Service -Name \"OracleVssWriterPSPRODDB\"",
+            "Checkpointed" : False
             },
             {
             "Description": "Starting OracleJobScheduler.",
-            "Command" : f"Start-Service -Name \"OracleJobSchedulerPSPRODDB\""
+            "Command" : f"Start-Service -Name \"OracleJobSchedulerPSPRODDB\"",
+            "Checkpointed" : False
             },
             {
             "Description" : "Starting PowerSchool Installer Service",
-            "Command" : f"Start-Service -Name \"PearsonPowerSchoolInstaller\""
+            "Command" : f"Start-Service -Name \"PearsonPowerSchoolInstaller\"",
+            "Checkpointed" : False
             },
             {
             "Description" : "Executing Orchestrator oracle_listener_update.sql.",
-            "Command" : f"sqlplus / as sysdba '@%ORCHESTRATOR_HOME%\oracle_listener_update.sql'"
+            "Command" : r"sqlplus / as sysdba '@%ORCHESTRATOR_HOME%\oracle_listener_update.sql'"
             },
             {
             "Description" : "Setting OracleTNSListener Service to Automatic.",
@@ -330,91 +1364,1458 @@ class SISOrchestrator(Orchestrator):
             "Command" : f"Set-Service -Name \"PearsonPowerSchoolInstaller\" -StartupType Automatic"
             },
         ]
-    
+
+
+    @staticmethod
+    def _bootstrap_check_command_steps() -> list[dict]:
+        return [
+            {
+            "Description" : "Awaiting Boot-Time Bootstrap.",
+            "Command" : f"$deadline = (Get-Date).AddMinutes(20) ; "
+                        f"while (-not (Test-Path \"{BOOTSTRAP_MARKER_PATH}\") -and (Get-Date) -lt $deadline) {{ Start-Sleep -Seconds 5 }} ; "
+                        f"if (-not (Test-Path \"{BOOTSTRAP_MARKER_PATH}\")) {{ throw 'Bootstrap did not finish within 20 minutes.' }} ; "
+                        f"$bootstrapStatus = Get-Content -Path \"{BOOTSTRAP_MARKER_PATH}\" -Raw ; "
+                        "if (-not $bootstrapStatus.StartsWith('0|')) { throw \"Bootstrap failed: $bootstrapStatus\" }"
+            },
+        ]
+
+
+    def _execute_post_instantiation_commands(self, tenant : SISTenant) -> list[CommandStepResult]:
+        if self.aws_config.ami_bootstrapped:
+            # Everything but the IP edits is in the image, and user data made those on boot.
+            command_steps = self._bootstrap_check_command_steps()
+        else:
+            command_steps = self._post_instantiation_command_steps(tenant.aws_private_ip)
         print(f"{tenant.common_name}: Executing PowerShell Commands")
-        for step in command_steps:
-            self._run_powershell_command(tenant, step["Command"])
+        results = self._run_checkpointed_steps(tenant, "post_instantiation", command_steps)
         print(f"{tenant.common_name}: PowerShell Commands Executed Successfully")
+        return results
 
 
-    def _restore_stock_database(self, tenant : SISTenant):
-        command_steps = [
+    @staticmethod
+    def _restore_stock_database_command_steps(stock_restore_mode : StockRestoreMode, aws_config : SISAWSConfiguration) -> list[dict]:
+        if stock_restore_mode == StockRestoreMode.SERIAL:
+            return [
+                    {
+                    "Description" : "Dropping PSPRODDB Schema",
+                    "Command": f"cd c:\\oracle\\scripts ; c:\\oracle\\scripts\\dropschema psproddb",
+                    "Phase" : "drop"
+                    },
+                    {
+                    "Description" : "Importing Stock Data Pump",
+                    "Command" : f"cd c:\\oracle\\scripts ; c:\\oracle\\scripts\\import psproddb stock.dmp y full",
+                    # The wrapper runs impdp, which exits 5 (EX_SUCC_ERR) when the import finished with ORA- errors.
+                    "WarningExitCodes" : (5,),
+                    "Phase" : "import"
+                    }
+            ]
+
+        parallelism = aws_config.data_pump_degree()
+        if stock_restore_mode == StockRestoreMode.PARALLEL:
+            command_steps = [
                 {
                 "Description" : "Dropping PSPRODDB Schema",
-                "Command": f"cd c:\\oracle\\scripts ; c:\\oracle\\scripts\\dropschema psproddb"
-                },
+                "Command": f"cd c:\\oracle\\scripts ; c:\\oracle\\scripts\\dropschema psproddb",
+                "Phase" : "drop"
+                }
+            ]
+            import_options = ""
+        else:
+            command_steps = [
                 {
-                "Description" : "Importing Stock Data Pump",
-                "Command" : f"cd c:\\oracle\\scripts ; c:\\oracle\\scripts\\import psproddb stock.dmp y full"
+                "Description" : "Dropping PSPRODDB Objects",
+                "Command" : DROP_PSPRODDB_OBJECTS_COMMAND,
+                "Phase" : "drop"
                 }
+            ]
+            # The user is still there; recreating it would only add an ORA-31684 to the log.
+            import_options = " exclude=user"
+
+        command_steps += [
+            {
+            "Description" : f"Importing Stock Data Pump ({parallelism} Parallel Workers)",
+            "Command" : f"cd c:\\oracle\\scripts ; impdp \"'/ as sysdba'\" directory={aws_config.data_pump_directory} dumpfile=stock.dmp "
+                        f"logfile=stock_impdp.log schemas=PSPRODDB parallel={parallelism}{import_options}",
+            # impdp exits 5 (EX_SUCC_ERR) when the import finished with ORA- errors, which stock_impdp.log lists.
+            "WarningExitCodes" : (5,),
+            "Phase" : "import"
+            },
+            {
+            "Description" : "Recompiling Invalid PSPRODDB Objects",
+            "Command" : f"\"exec utl_recomp.recomp_parallel({parallelism}, 'PSPRODDB');\" | sqlplus -s / as sysdba",
+            "Phase" : "post-import"
+            },
         ]
+        return command_steps
+
+
+    def _report_restore_timing(self, tenant : SISTenant, results : list[CommandStepResult]) -> dict[str, float]:
+        timing = {}
+        for result in results:
+            if result.phase:
+                timing[result.phase] = timing.get(result.phase, 0.0) + result.elapsed_seconds
+        self.restore_timings[tenant.common_name] = timing
+        summary = ", ".join(f"{phase} {seconds:0.1f}s" for phase, seconds in timing.items())
+        print(f"{tenant.common_name}: Stock Restore ({self.stock_restore_mode.value}) {summary}")
+        return timing
+
+
+    def _restore_stock_database(self, tenant : SISTenant) -> list[CommandStepResult]:
+        command_steps = self._restore_stock_database_command_steps(self.stock_restore_mode, self.aws_config)
         print(f"{tenant.common_name}: Executing PowerShell Commands")
-        for step in command_steps:
-            self._run_powershell_command(tenant, step["Command"])
+        with self.metrics.phase(tenant.common_name, "restore_stock_database"):
+            results = self._run_checkpointed_steps(tenant, "restore_stock_database", command_steps)
         print(f"{tenant.common_name}: PowerShell Commands Executed Successfully")
+        self._report_restore_timing(tenant, results)
+        return results
+
+
+    def _fleet_command_steps(self, restore_stock_schema : bool) -> list[dict]:
+        if self.aws_config.ami_bootstrapped:
+            command_steps = self._bootstrap_check_command_steps()
+        else:
+            # Fleet documents are identical for every instance, so each instance looks up its own private IP.
+            # The lookup rides along in every step that uses it, since unbatched steps run as separate SSM invocations.
+            command_steps = [
+                {**step, "Command": f"{IMDS_PRIVATE_IP_COMMAND} ; {step['Command']}"} if "$privateIp" in step["Command"] else step
+                for step in self._post_instantiation_command_steps("$privateIp")
+            ]
+        if restore_stock_schema:
+            command_steps += self._restore_stock_database_command_steps(self.stock_restore_mode, self.aws_config)
+        return command_steps
+
+
+    def _await_fleet_command(self, command_id : str) -> list[dict]:
+        delay = 5
+        while True:
+            time.sleep(delay)
+            command = self.ssm_client.list_commands(CommandId=command_id)['Commands'][0]
+            if command['Status'] in SSM_TERMINAL_COMMAND_STATUSES:
+                break
+            delay = min(delay * 1.5, 30)
+
+        invocations = []
+        paginator = self.ssm_client.get_paginator('list_command_invocations')
+        for page in paginator.paginate(CommandId=command_id, Details=True):
+            invocations += page['CommandInvocations']
+        return invocations
 
 
-    def provision_tenant(self, tenant : SISTenant, restore_stock_schema : bool=False, stop_after_provisioning : bool=True) -> None:
+    def _run_fleet_powershell_steps(self, tenants : list[SISTenant], command_steps : list[dict]) -> dict[str, list[CommandStepResult]]:
+        fleet_results = {
+            tenant.aws_instance_id: [CommandStepResult.from_step(step) for step in command_steps]
+            for tenant in tenants
+        }
+        pending_tenants = [tenant for tenant in tenants if tenant.ssm_available]
+        for tenant in tenants:
+            if not tenant.ssm_available:
+                print(f"Instance {tenant.aws_instance_id} not listed as instance managed by AWS SSM")
+
+        for group in self._group_command_steps(command_steps):
+            if not pending_tenants:
+                break
+            script = self._build_batched_script([command_steps[index] for index in group], first_index=group[0])
+            parameters = {
+                'commands': script,
+                'executionTimeout': [str(min(SSM_MAX_EXECUTION_TIMEOUT, 3600 * len(group)))],
+            }
+
+            # Targeting by instance ID keeps other batches and leftover INSTANTIATED instances out of the command.
+            instance_ids = [tenant.aws_instance_id for tenant in pending_tenants]
+            target_arguments = [{'InstanceIds': instance_ids[i:i + SSM_MAX_INSTANCE_IDS]} for i in range(0, len(instance_ids), SSM_MAX_INSTANCE_IDS)]
+
+            print(f"Fleet: Sending {len(group)} PowerShell step(s) to {len(pending_tenants)} instance(s).")
+            command_ids = []
+            for target in target_arguments:
+                response = self.ssm_client.send_command(
+                    DocumentName="AWS-RunPowerShellScript",
+                    Parameters=parameters,
+                    MaxConcurrency='100%',
+                    MaxErrors='100%',
+                    **target,
+                )
+                command_ids.append(response['Command']['CommandId'])
+
+            invocations = {}
+            for command_id in command_ids:
+                for invocation in self._await_fleet_command(command_id):
+                    invocations[invocation['InstanceId']] = invocation
+
+            for tenant in list(pending_tenants):
+                results = fleet_results[tenant.aws_instance_id]
+                invocation = invocations.get(tenant.aws_instance_id)
+                if invocation is None:
+                    results[group[0]].status = "Failed"
+                    results[group[0]].output = "Instance was not targeted by the fleet command."
+                else:
+                    plugin_output = "".join(plugin.get('Output', "") for plugin in invocation.get('CommandPlugins', []))
+                    self._apply_step_markers(results, plugin_output)
+                    for index in group:
+                        if results[index].status == "Skipped" and invocation['Status'] != "Success":
+                            results[index].status = "Failed"
+                            results[index].output = invocation.get('StatusDetails', "")
+                            break
+                self._record_step_metrics(tenant, [results[index] for index in group])
+                for index in group:
+                    result = results[index]
+                    if result.status == "Warning":
+                        print(f"{tenant.common_name}: {result.description} finished with warnings (exit code {result.exit_code}).")
+                    if result.status == "Failed":
+                        print(f"{tenant.common_name}: {result.description} (Failed, exit code {result.exit_code})")
+                        pending_tenants.remove(tenant)
+                        break
+
+        return fleet_results
+
+
+    def _ensure_launch_template(self) -> None:
+        # The template follows SISAWSConfiguration, so a new AMI or instance type becomes a new default version.
+        with self._launch_template_lock:
+            if self._launch_template_ready:
+                return
+            template_data = {
+                'ImageId': self.aws_config.ami_id,
+                'InstanceType': self.aws_config.instance_type,
+                'KeyName': self.aws_config.key_name,
+                'IamInstanceProfile': {
+                    'Arn': self.aws_config.iam_profile_instance_arn
+                },
+                'SecurityGroupIds': [self.aws_config.security_group_id],
+            }
+            if self.aws_config.ami_bootstrapped:
+                template_data['UserData'] = base64.b64encode(BOOTSTRAP_USER_DATA.encode()).decode()
+            if self.aws_config.hibernation_enabled:
+                template_data['HibernationOptions'] = {'Configured': True}
+            try:
+                current = self.ec2_client.describe_launch_template_versions(
+                    LaunchTemplateName=self.aws_config.launch_template_name,
+                    Versions=['$Default'],
+                )['LaunchTemplateVersions'][0]['LaunchTemplateData']
+            except ClientError as error:
+                if error.response.get('Error', {}).get('Code') != 'InvalidLaunchTemplateName.NotFoundException':
+                    raise
+                print(f"Fleet: Creating launch template {self.aws_config.launch_template_name}.")
+                self.ec2_client.create_launch_template(LaunchTemplateName=self.aws_config.launch_template_name, LaunchTemplateData=template_data)
+                current = template_data
+
+            if any(current.get(key) != template_data.get(key) for key in template_data.keys() | {'UserData', 'HibernationOptions'}):
+                print(f"Fleet: Updating launch template {self.aws_config.launch_template_name} to {self.aws_config.ami_id}.")
+                version = self.ec2_client.create_launch_template_version(
+                    LaunchTemplateName=self.aws_config.launch_template_name,
+                    LaunchTemplateData=template_data,
+                )['LaunchTemplateVersion']['VersionNumber']
+                self.ec2_client.modify_launch_template(LaunchTemplateName=self.aws_config.launch_template_name, DefaultVersion=str(version))
+            self._launch_template_ready = True
+
+
+    def _launch_from_template(self, count : int) -> list:
+        return self._thread_ec2_resource().create_instances(
+                LaunchTemplate={
+                    'LaunchTemplateName': self.aws_config.launch_template_name,
+                    'Version': '$Default'
+                },
+                # MinCount=1 keeps whatever capacity EC2 can give; tenants left without an instance fail in _launch_tenants.
+                MinCount=1,
+                MaxCount=count,
+                SubnetId=self.aws_config.subnet_id,
+                TagSpecifications=[
+                    {
+                        "ResourceType": "instance",
+                        "Tags": self._managed_instance_tags(TenantStatus.NEW)
+                    },
+                ],
+            )
+
+
+    def _launch_tenants(self, tenants : list[SISTenant], max_concurrency : int) -> list[TenantOperationResult]:
+        # Bulk spin-up: one create_instances for every tenant, then one waiter for the lot.
+        tic = time.perf_counter()
+        results = [TenantOperationResult(tenant=tenant, operation="provision") for tenant in tenants]
+        for tenant in tenants:
+            self.state_store.reset_checkpoints(tenant.common_name)
+
+        print(f"Fleet: Launching {len(tenants)} instance(s) from {self.aws_config.launch_template_name}.")
+        try:
+            self._ensure_launch_template()
+            with self.metrics.phase("fleet", "create_instances"):
+                instances = self._launch_from_template(len(tenants))
+        except (ClientError, BotoCoreError) as error:
+            # Nothing was launched (MinCount=1 means EC2 either starts some instances or refuses the call), so every tenant fails.
+            for result in results:
+                result.error = f"{type(error).__name__}: {error}"
+                result.elapsed_seconds = time.perf_counter() - tic
+                print(f"{result.tenant.common_name}: Launch failed. {result.error}")
+            return results
+
+        launched = list(zip(results, instances))
+        for result in results[len(instances):]:
+            result.error = f"EC2 launched {len(instances)} of {len(tenants)} requested instances."
+        for result, instance in launched:
+            result.tenant.aws_instance_id = instance.id
+            result.tenant.aws_private_ip = instance.private_ip_address
+            result.tenant.aws_hibernation_configured = self.aws_config.hibernation_enabled
+
+        # create_tags applies the same tags to every resource, so the per-tenant Name and Domain go out concurrently.
+        def tag_tenant(tenant : SISTenant) -> None:
+            self.ec2_client.create_tags(
+                Resources=[
+                    tenant.aws_instance_id,
+                ],
+                Tags=self._instance_identity_tags(tenant.common_name, self.aws_config)
+            )
 
-        self._create_instance(tenant)
+        # A tenant that fails a step below keeps its error and drops out; the rest of the batch carries on without it.
+        failed = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="tag") as executor:
+            futures = {executor.submit(tag_tenant, result.tenant): result for result, _ in launched}
+            for future, result in futures.items():
+                try:
+                    future.result()
+                except (ClientError, BotoCoreError) as error:
+                    failed[result.tenant.aws_instance_id] = f"{type(error).__name__}: {error}"
+
+        instance_ids = [result.tenant.aws_instance_id for result, _ in launched if result.tenant.aws_instance_id not in failed]
+        with self.metrics.phase("fleet", "wait_until_running"):
+            for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+                chunk = instance_ids[i:i + EC2_MAX_BATCH_IDS]
+                try:
+                    self.ec2_client.get_waiter('instance_running').wait(
+                        InstanceIds=chunk,
+                        WaiterConfig={
+                            'Delay': 5,
+                            'MaxAttempts': 120
+                        }
+                    )
+                except WaiterError as error:
+                    print(f"Fleet: Not every instance reached running. {error}")
+                    for instance_id in self._instances_not_in_state(chunk, 'running'):
+                        failed[instance_id] = f"WaiterError: Instance {instance_id} did not reach running. {error}"
+
+        instance_ids = [instance_id for instance_id in instance_ids if instance_id not in failed]
+        for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+            chunk = instance_ids[i:i + EC2_MAX_BATCH_IDS]
+            try:
+                self.ec2_client.create_tags(
+                    Resources=chunk,
+                    Tags=[
+                        {
+                            'Key': 'OrchestratorTenantStatus',
+                            'Value': f"{TenantStatus.INSTANTIATED.value}"
+                        },
+                    ]
+                )
+            except (ClientError, BotoCoreError) as error:
+                for instance_id in chunk:
+                    failed[instance_id] = f"{type(error).__name__}: {error}"
+
+        for result, _ in launched:
+            tenant = result.tenant
+            if tenant.aws_instance_id in failed:
+                result.error = failed[tenant.aws_instance_id]
+                print(f"{tenant.common_name}: Launch failed. {result.error}")
+                continue
+            tenant.status = TenantStatus.INSTANTIATED
+            tenant.aws_instance_state = "running"
+            self.inventory.upsert(tenant)
+            self.state_store.save_tenant(tenant.common_name, tenant.product.value, tenant.status.value, tenant.aws_instance_id, tenant.aws_private_ip)
+            self.state_store.complete_step(tenant.common_name, "create_instance")
+            result.succeeded = True
+
+        for result in results:
+            result.elapsed_seconds = time.perf_counter() - tic
+        print(f"Fleet: {sum(1 for result in results if result.succeeded)} of {len(tenants)} instance(s) running.")
+        return results
+
+
+    def _instantiate_tenant(self, tenant : SISTenant, instance_launched : bool=False) -> None:
+        # instance_launched: _launch_tenants already created and recorded the instance.
+        if not instance_launched:
+            self._create_instance(tenant)
         self._await_ssm_availability(tenant)
-        self._execute_post_instantiation_commands(tenant)        
 
-        if restore_stock_schema:
-            self._restore_stock_database(tenant)
-            
+
+    def _finalize_tenant(self, tenant : SISTenant) -> None:
         tenant.status = TenantStatus.PENDING_APPLICATION_INSTALLATION
         self._update_orchestrator_status(tenant)
 
-        if stop_after_provisioning:
+
+    def _stop_tenants(self, tenants : list[SISTenant], hibernate : bool=False) -> None:
+        if not tenants:
+            return
+        hibernating = [tenant for tenant in tenants if hibernate and tenant.aws_hibernation_configured]
+        stopping = [tenant for tenant in tenants if tenant not in hibernating]
+        for i in range(0, len(hibernating), EC2_MAX_BATCH_IDS):
+            batch = hibernating[i:i + EC2_MAX_BATCH_IDS]
+            for tenant in batch:
+                print(f"{tenant.common_name}: Hibernating Instance")
+            try:
+                self.ec2_client.stop_instances(InstanceIds=[tenant.aws_instance_id for tenant in batch], Hibernate=True)
+            except ClientError as error:
+                # One instance that cannot hibernate fails the whole call, so the batch falls back to a plain stop.
+                if error.response.get('Error', {}).get('Code') not in HIBERNATION_UNSUPPORTED_ERROR_CODES:
+                    raise
+                print(f"Fleet: Hibernation refused ({error.response['Error']['Code']}); stopping {len(batch)} instance(s) instead.")
+                stopping.extend(batch)
+
+        for tenant in stopping:
             print(f"{tenant.common_name}: Stopping Instance")
+        for i in range(0, len(stopping), EC2_MAX_BATCH_IDS):
             self.ec2_client.stop_instances(
-                InstanceIds=[tenant.aws_instance_id]
+                InstanceIds=[tenant.aws_instance_id for tenant in stopping[i:i + EC2_MAX_BATCH_IDS]]
+            )
+        for tenant in tenants:
+            tenant.aws_instance_state = "stopping"
+            self.inventory.upsert(tenant)
+
+
+    def _update_orchestrator_statuses(self, tenants : list[SISTenant], status : TenantStatus) -> None:
+        # Batched form of _update_orchestrator_status for tenants moving to the same status.
+        instance_ids = [tenant.aws_instance_id for tenant in tenants]
+        for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+            self.ec2_client.create_tags(
+                Resources=instance_ids[i:i + EC2_MAX_BATCH_IDS],
+                Tags=[
+                    {
+                        'Key': 'OrchestratorTenantStatus',
+                        'Value': f"{status.value}"
+                    },
+                ]
+            )
+        for tenant in tenants:
+            tenant.status = status
+            self.inventory.upsert(tenant)
+            self.state_store.save_tenant(tenant.common_name, tenant.product.value, tenant.status.value, tenant.aws_instance_id, tenant.aws_private_ip)
+
+
+    def provision_tenant(self, tenant : SISTenant, restore_stock_schema : bool=False, stop_after_provisioning : bool=True, update_dns : bool=True,
+                         capture_baseline : bool=False, instance_launched : bool=False) -> None:
+        with self.metrics.phase(tenant.common_name, "provision_tenant"):
+            self._provision_tenant(tenant, restore_stock_schema, stop_after_provisioning, update_dns, capture_baseline, instance_launched)
+        if self.alb_routing and update_dns and not stop_after_provisioning and not self._dns_deferred:
+            self.await_tenants_healthy([tenant])
+
+
+    def _provision_tenant(self, tenant : SISTenant, restore_stock_schema : bool, stop_after_provisioning : bool, update_dns : bool,
+                          capture_baseline : bool, instance_launched : bool) -> None:
+        if instance_launched:
+            self._instantiate_tenant(tenant, instance_launched=True)
+        elif not self._resume_tenant(tenant):
+            self.state_store.reset_checkpoints(tenant.common_name)
+            self._instantiate_tenant(tenant)
+        self._execute_post_instantiation_commands(tenant)
+
+        if restore_stock_schema:
+            self._restore_stock_database(tenant)
+
+        self._finalize_tenant(tenant)
+
+        if update_dns:
+            self._add_route53_record(tenant)
+
+        if stop_after_provisioning:
+            self._stop_tenants([tenant])
+
+        if capture_baseline or self.capture_baselines:
+            self.capture_baseline_snapshot(tenant)
+
+        self.state_store.reset_checkpoints(tenant.common_name)
+
+
+    def _resume_tenant(self, tenant : SISTenant) -> bool:
+        record = self.state_store.tenant(tenant.common_name)
+        if record is None or "create_instance" not in self.state_store.completed_steps(tenant.common_name):
+            return False
+
+        # Only resume onto the instance the checkpoints were recorded against, and only if it still exists.
+        current_tenant = self.inventory.get(tenant.common_name)
+        if current_tenant is None or current_tenant.aws_instance_id != record["aws_instance_id"]:
+            return False
+
+        print(f"{tenant.common_name}: Resuming provisioning on {record['aws_instance_id']}.")
+        tenant.aws_instance_id = record["aws_instance_id"]
+        tenant.aws_private_ip = record["aws_private_ip"]
+        tenant.status = TenantStatus(record["status"])
+        self.ec2_client.start_instances(InstanceIds=[tenant.aws_instance_id])
+        self.ec2_client.get_waiter('instance_running').wait(InstanceIds=[tenant.aws_instance_id])
+        self._await_ssm_availability(tenant)
+        return True
+
+
+    def tenant_status(self, common_name : str) -> TenantStatus | None:
+        record = self.state_store.tenant(common_name)
+        return TenantStatus(record["status"]) if record else None
+
+
+    def stored_tenants(self, status : TenantStatus | None=None) -> list[SISTenant]:
+        return [
+            SISTenant(
+                common_name=record["common_name"],
+                product=PowerSchoolProduct.SIS,
+                status=TenantStatus(record["status"]),
+                aws_instance_id=record["aws_instance_id"],
+                aws_private_ip=record["aws_private_ip"],
             )
+            for record in self.state_store.tenants(status.value if status else None)
+            if record["product"] == PowerSchoolProduct.SIS.value
+        ]
+
+
+    def capture_baseline_snapshot(self, tenant : SISTenant) -> str:
+        # Snapshot the root volume of a freshly provisioned tenant so later recycles can revert to it in place.
+        # A running Oracle would give a crash-consistent image at best, so the instance is stopped for the snapshot.
+        instance = self.ec2_client.describe_instances(InstanceIds=[tenant.aws_instance_id])['Reservations'][0]['Instances'][0]
+        was_running = instance['State']['Name'] in ('pending', 'running')
+        if was_running:
+            self._stop_tenants([tenant])
+        self.ec2_client.get_waiter('instance_stopped').wait(InstanceIds=[tenant.aws_instance_id])
+        root_volume_id = next(
+            mapping['Ebs']['VolumeId'] for mapping in instance['BlockDeviceMappings'] if mapping['DeviceName'] == instance['RootDeviceName']
+        )
+
+        print(f"{tenant.common_name}: Capturing Baseline Snapshot of {root_volume_id}.")
+        snapshot = self.ec2_client.create_snapshot(
+            VolumeId=root_volume_id,
+            Description=f"Orchestrator baseline for {tenant.common_name}",
+            TagSpecifications=[
+                {
+                    "ResourceType": "snapshot",
+                    "Tags": [
+                        {
+                            "Key": "Name",
+                            "Value": f"{tenant.common_name}-baseline"
+                        },
+                        {
+                            "Key": "OrchestratorManaged",
+                            "Value": "True"
+                        },
+                    ]
+                },
+            ],
+        )
+        if was_running:
+            # The snapshot's point in time is fixed once it is created, so the tenant can come back while it copies.
+            self.ec2_client.start_instances(InstanceIds=[tenant.aws_instance_id])
+            tenant.aws_instance_state = "pending"
+            self.inventory.upsert(tenant)
+        self.ec2_client.get_waiter('snapshot_completed').wait(
+            SnapshotIds=[snapshot['SnapshotId']],
+            WaiterConfig={
+                'Delay': 15,
+                'MaxAttempts': 240
+            }
+        )
+        self.ec2_client.create_tags(
+            Resources=[
+                tenant.aws_instance_id,
+            ],
+            Tags=[
+                {
+                    'Key': 'OrchestratorBaselineSnapshot',
+                    'Value': snapshot['SnapshotId']
+                },
+            ]
+        )
+        print(f"{tenant.common_name}: Baseline Snapshot {snapshot['SnapshotId']} Captured.")
+        return snapshot['SnapshotId']
+
+
+    def _ensure_baseline_snapshot(self, tenant : SISTenant) -> str:
+        # A reserve built while capture_baselines was on already has one; it is the same stock build.
+        try:
+            return self._baseline_snapshot_id(tenant)
+        except LookupError:
+            return self.capture_baseline_snapshot(tenant)
+
+
+    def _baseline_snapshot_id(self, tenant : SISTenant) -> str:
+        response = self.ec2_client.describe_tags(
+            Filters=[
+                {'Name': 'resource-id', 'Values': [tenant.aws_instance_id]},
+                {'Name': 'key', 'Values': ['OrchestratorBaselineSnapshot']},
+            ],
+        )
+        if not response['Tags']:
+            raise LookupError(f"{tenant.common_name}: No baseline snapshot recorded for {tenant.aws_instance_id}.")
+        return response['Tags'][0]['Value']
+
+
+    def _replace_root_volume(self, tenant : SISTenant, snapshot_id : str="", image_id : str="") -> None:
+        # Root volume replacement needs a running instance and keeps its ID, private IP and network interfaces.
+        self.ec2_client.start_instances(InstanceIds=[tenant.aws_instance_id])
+        self.ec2_client.get_waiter('instance_running').wait(InstanceIds=[tenant.aws_instance_id])
+
+        source = {'SnapshotId': snapshot_id} if snapshot_id else {'ImageId': image_id}
+        print(f"{tenant.common_name}: Replacing Root Volume from {snapshot_id or image_id}.")
+        task_id = self.ec2_client.create_replace_root_volume_task(
+            InstanceId=tenant.aws_instance_id,
+            DeleteReplacedRootVolume=True,
+            **source,
+        )['ReplaceRootVolumeTask']['ReplaceRootVolumeTaskId']
+
+        delay = 10
+        while True:
+            time.sleep(delay)
+            task = self.ec2_client.describe_replace_root_volume_tasks(ReplaceRootVolumeTaskIds=[task_id])['ReplaceRootVolumeTasks'][0]
+            if task['TaskState'] == 'succeeded':
+                break
+            if task['TaskState'] in ('failed', 'failed-detached'):
+                raise RuntimeError(f"{tenant.common_name}: Root volume replacement {task_id} ended in state {task['TaskState']}.")
+            delay = min(delay * 1.5, 30)
+        print(f"{tenant.common_name}: Root Volume Replaced.")
+
+
+    def _recycle_in_place(self, tenant : SISTenant, strategy : RecycleStrategy, stop_after_provisioning : bool) -> SISTenant:
+        current_tenant = self._load_active_tenant_from_common_name(tenant.common_name)
+        if current_tenant.status == TenantStatus.NEW:
+            raise LookupError(f"{tenant.common_name}: No instance to recycle in place.")
+
+        if strategy == RecycleStrategy.REPLACE_ROOT_FROM_SNAPSHOT:
+            self._replace_root_volume(current_tenant, snapshot_id=self._baseline_snapshot_id(current_tenant))
+        else:
+            self._replace_root_volume(current_tenant, image_id=self.aws_config.ami_id)
+
+        current_tenant.ssm_available = False
+        self._await_ssm_availability(current_tenant)
+        if strategy == RecycleStrategy.REPLACE_ROOT_FROM_AMI:
+            # A fresh AMI root still carries the private IP placeholders.
+            self.state_store.reset_checkpoints(current_tenant.common_name)
+            self._execute_post_instantiation_commands(current_tenant)
+            self.state_store.reset_checkpoints(current_tenant.common_name)
+
+        self._finalize_tenant(current_tenant)
+        if stop_after_provisioning:
+            self._stop_tenants([current_tenant])
+        # A root restored from the baseline is the baseline; one rebuilt from the AMI gets a new one.
+        if strategy == RecycleStrategy.REPLACE_ROOT_FROM_AMI and self.capture_baselines:
+            self.capture_baseline_snapshot(current_tenant)
+        return current_tenant
 
 
     def decommission_tenant(self, tenant : SISTenant) -> None:
-        
-        if tenant.status == TenantStatus.PENDING_RECYCLE:
+
+        # A recycled tenant keeps its hostname; only a real decommission removes the record.
+        remove_dns = tenant.status == TenantStatus.PENDING_DECOMMISSION
+        if tenant.status in (TenantStatus.PENDING_RECYCLE, TenantStatus.PENDING_DECOMMISSION):
             tenant = self._load_active_tenant_from_common_name(tenant.common_name)
 
         if tenant.status == TenantStatus.ACTIVE:
             print(f"{tenant.common_name}: Terminating Instance {tenant.aws_instance_id}")
-            try:        
+            try:
                 response = self.ec2_client.terminate_instances(
                     InstanceIds=[
                         tenant.aws_instance_id,
                     ]
                 )
-            except:
-                print("Something went wrong attempting to terminate the instance.")
+            except ClientError as error:
+                # Throttling was already retried by botocore under the rate limiter; anything else leaves the tenant in place.
+                if error.response.get('Error', {}).get('Code') != 'InvalidInstanceID.NotFound':
+                    print(f"{tenant.common_name}: Terminating Instance {tenant.aws_instance_id} failed. {error}")
+                    raise
 
+            self.inventory.discard(tenant.common_name)
+            self.state_store.forget_tenant(tenant.common_name)
             print(f"{tenant.common_name}: Terminated")
 
+            if remove_dns:
+                self._remove_route53_record(tenant)
+
+
+    def recycle_tenant(self, tenant : SISTenant, strategy : RecycleStrategy=RecycleStrategy.REBUILD, stop_after_provisioning : bool=True) -> SISTenant:
+        if tenant.status == TenantStatus.PENDING_RECYCLE and strategy != RecycleStrategy.REBUILD:
+            try:
+                return self._recycle_in_place(tenant, strategy, stop_after_provisioning)
+            except (ClientError, WaiterError, CommandStepError, LookupError, RuntimeError, TimeoutError) as error:
+                print(f"{tenant.common_name}: {strategy.value} recycle failed, falling back to a rebuild. {error}")
 
-    def recycle_tenant(self, tenant : SISTenant) -> None:
         if tenant.status == TenantStatus.PENDING_RECYCLE:
             replacement_tenant = SISTenant(common_name=tenant.common_name, product=tenant.product)
             self.decommission_tenant(tenant)
-            self.provision_tenant(replacement_tenant)
+            if self.reserve_pool is not None:
+                claimed_tenant = self.reserve_pool.claim(tenant.common_name, start=not stop_after_provisioning)
+                if claimed_tenant is not None:
+                    # Only a reserve started to register its ALB target needs stopping again.
+                    if stop_after_provisioning and claimed_tenant.aws_instance_state != "stopped":
+                        self._stop_tenants([claimed_tenant])
+                    if self.capture_baselines:
+                        self._ensure_baseline_snapshot(claimed_tenant)
+                    return claimed_tenant
+            self.provision_tenant(replacement_tenant, stop_after_provisioning=stop_after_provisioning)
+            return replacement_tenant
+        return tenant
 
 
-class PMOrchestrator(Orchestrator):
+    def _run_concurrently(self, operation : str, action, tenants : list[SISTenant], max_concurrency : int, **kwargs) -> list[TenantOperationResult]:
+        results = [TenantOperationResult(tenant=tenant, operation=operation) for tenant in tenants]
 
+        def run(result : TenantOperationResult) -> None:
+            tic = time.perf_counter()
+            try:
+                returned_tenant = action(result.tenant, **kwargs)
+                if isinstance(returned_tenant, OrchestratorTenant):
+                    result.tenant = returned_tenant
+                result.succeeded = True
+            except Exception as error:
+                # One tenant failing must not abort the rest of the batch.
+                result.error = f"{type(error).__name__}: {error}"
+                print(f"{result.tenant.common_name}: {operation} failed. {result.error}")
+            result.elapsed_seconds = time.perf_counter() - tic
 
-    def provision_tenant(self, tenant : PMTenant) -> None:
-        print("Directions to Provision PM Tenant HERE")
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="orchestrator") as executor:
+            # Each worker runs in a copy of the caller's context so it joins the caller's deferred DNS batch.
+            futures = [executor.submit(contextvars.copy_context().run, run, result) for result in results]
+            for future in futures:
+                future.result()
 
+        succeeded = sum(1 for result in results if result.succeeded)
+        print(f"{operation}: {succeeded} of {len(results)} tenants succeeded.")
+        return results
 
-    def decommission_tenant(self, tenant : PMTenant) -> None:
-        print("Directions to Decommission PM Tenant HERE")
-    
 
-# Actions 
+    def provision_tenants(self, tenants : list[SISTenant], max_concurrency : int=4, restore_stock_schema : bool=False, stop_after_provisioning : bool=True,
+                          update_dns : bool=True, fleet_commands : bool=False, bulk_launch : bool=False) -> list[TenantOperationResult]:
+        with self.deferred_dns_changes() as batch_results:
+            launch_results = []
+            if bulk_launch:
+                launch_results = self._launch_tenants(tenants, max_concurrency)
+                tenants = [result.tenant for result in launch_results if result.succeeded]
+            if not fleet_commands:
+                results = self._run_concurrently("provision", self.provision_tenant, tenants, max_concurrency,
+                                                 restore_stock_schema=restore_stock_schema,
+                                                 stop_after_provisioning=stop_after_provisioning,
+                                                 update_dns=update_dns,
+                                                 instance_launched=bulk_launch)
+            else:
+                results = self._provision_fleet(tenants, max_concurrency, restore_stock_schema, stop_after_provisioning, update_dns, bulk_launch)
+            # Each tenant's time includes the shared launch it waited on.
+            launch_seconds = {result.tenant.common_name: result.elapsed_seconds for result in launch_results}
+            for result in results:
+                result.elapsed_seconds += launch_seconds.get(result.tenant.common_name, 0.0)
+            results += [result for result in launch_results if not result.succeeded]
+            batch_results += results
+        # Rules are live once the deferred block publishes them, so every new target is awaited together.
+        if self.alb_routing and update_dns and not stop_after_provisioning:
+            self.await_tenants_healthy([result.tenant for result in results if result.succeeded])
+        return results
+
+
+    def _provision_fleet(self, tenants : list[SISTenant], max_concurrency : int, restore_stock_schema : bool, stop_after_provisioning : bool,
+                         update_dns : bool, instance_launched : bool) -> list[TenantOperationResult]:
+        # Fleet mode: build instances in parallel, then drive every instance with the same SSM documents.
+        tic = time.perf_counter()
+        results = self._run_concurrently("instantiate", self._instantiate_tenant, tenants, max_concurrency, instance_launched=instance_launched)
+        for result in results:
+            result.operation = "provision"
+
+        ready_results = [result for result in results if result.succeeded]
+        fleet_results = self._run_fleet_powershell_steps(
+            [result.tenant for result in ready_results],
+            self._keyed_steps("fleet", self._fleet_command_steps(restore_stock_schema)),
+        )
+
+        provisioned_tenants = []
+        for result in ready_results:
+            step_results = fleet_results[result.tenant.aws_instance_id]
+            failed_step = next((step for step in step_results if step.status == "Failed"), None)
+            if failed_step is not None or not result.tenant.ssm_available:
+                result.succeeded = False
+                result.error = f"'{failed_step.description}' failed with exit code {failed_step.exit_code}." if failed_step else "SSM unavailable."
+                continue
+            if restore_stock_schema:
+                timing = self._report_restore_timing(result.tenant, [step for step in step_results if step.phase])
+                self.metrics.record(result.tenant.common_name, "restore_stock_database", sum(timing.values()))
+            self._finalize_tenant(result.tenant)
+            if update_dns:
+                self._add_route53_record(result.tenant)
+            provisioned_tenants.append(result.tenant)
+
+        if stop_after_provisioning:
+            self._stop_tenants(provisioned_tenants)
+
+        if self.capture_baselines and provisioned_tenants:
+            baseline_results = {
+                result.tenant.common_name: result
+                for result in self._run_concurrently("capture_baseline", self.capture_baseline_snapshot, provisioned_tenants, max_concurrency)
+            }
+            for result in ready_results:
+                baseline_result = baseline_results.get(result.tenant.common_name)
+                if baseline_result is not None and not baseline_result.succeeded:
+                    result.succeeded = False
+                    result.error = baseline_result.error
+
+        # As in _provision_tenant, a finished build leaves no checkpoints for a later provision_tenant to resume onto.
+        for tenant in provisioned_tenants:
+            self.state_store.reset_checkpoints(tenant.common_name)
+
+        for result in results:
+            result.elapsed_seconds = time.perf_counter() - tic
+        succeeded = sum(1 for result in results if result.succeeded)
+        print(f"provision: {succeeded} of {len(results)} tenants succeeded.")
+        return results
+
+
+    def decommission_tenants(self, tenants : list[SISTenant], max_concurrency : int=4) -> list[TenantOperationResult]:
+        # One inventory sweep up front serves every per-tenant lookup in the batch.
+        self.inventory.refresh()
+        with self.deferred_dns_changes() as batch_results:
+            results = self._run_concurrently("decommission", self.decommission_tenant, tenants, max_concurrency)
+            batch_results += results
+        return results
+
+
+    def decommission_pending_tenants(self, max_concurrency : int=8) -> list[TenantOperationResult]:
+        # Fleet teardown: every PENDING_DECOMMISSION tenant in the inventory goes through the same few batched calls.
+        tic = time.perf_counter()
+        self.inventory.refresh()
+        tenants = self.inventory.by_status(TenantStatus.PENDING_DECOMMISSION)
+        results = {tenant.aws_instance_id: TenantOperationResult(tenant=tenant, operation="decommission") for tenant in tenants}
+        if not results:
+            print("decommission: No tenants pending decommission.")
+            return []
+        instance_ids = list(results)
+        print(f"Fleet: Decommissioning {len(instance_ids)} tenant(s).")
+
+        self._release_elastic_ips(instance_ids, max_concurrency)
+        self._deregister_targets(tenants)
+
+        terminating_ids = []
+        for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+            chunk = instance_ids[i:i + EC2_MAX_BATCH_IDS]
+            try:
+                response = self.ec2_client.terminate_instances(InstanceIds=chunk)
+                terminating_ids += [instance['InstanceId'] for instance in response['TerminatingInstances']]
+            except ClientError as error:
+                print(f"Fleet: Terminating {len(chunk)} instance(s) failed. {error}")
+                for instance_id in chunk:
+                    results[instance_id].error = f"ClientError: {error}"
+
+        unterminated_ids = set()
+        with self.metrics.phase("fleet", "wait_until_terminated"):
+            for i in range(0, len(terminating_ids), EC2_MAX_BATCH_IDS):
+                chunk = terminating_ids[i:i + EC2_MAX_BATCH_IDS]
+                try:
+                    self.ec2_client.get_waiter('instance_terminated').wait(
+                        InstanceIds=chunk,
+                        WaiterConfig={
+                            'Delay': 15,
+                            'MaxAttempts': 80
+                        }
+                    )
+                except WaiterError as error:
+                    print(f"Fleet: Not every instance reached terminated. {error}")
+                    for instance_id in self._instances_not_in_state(chunk, 'terminated'):
+                        unterminated_ids.add(instance_id)
+                        results[instance_id].error = f"WaiterError: Instance {instance_id} did not reach terminated. {error}"
+
+        # An instance still running keeps its DNS, inventory entry and saved state, so a retry finds it as it was.
+        terminated_ids = [instance_id for instance_id in terminating_ids if instance_id not in unterminated_ids]
+        with self.deferred_dns_changes() as batch_results:
+            for instance_id in terminated_ids:
+                result = results[instance_id]
+                batch_results.append(result)
+                self.inventory.discard(result.tenant.common_name)
+                self.state_store.forget_tenant(result.tenant.common_name)
+                self._remove_route53_record(result.tenant)
+                result.succeeded = True
+
+        for result in results.values():
+            result.elapsed_seconds = time.perf_counter() - tic
+        succeeded = sum(1 for result in results.values() if result.succeeded)
+        print(f"decommission: {succeeded} of {len(results)} tenants succeeded.")
+        return list(results.values())
+
+
+    def _instances_not_in_state(self, instance_ids : list[str], state : str) -> list[str]:
+        try:
+            response = self.ec2_client.describe_instances(InstanceIds=instance_ids)
+        except ClientError as error:
+            print(f"Fleet: Could not confirm instance states. {error}")
+            return list(instance_ids)
+        return [
+            instance['InstanceId']
+            for reservation in response['Reservations']
+            for instance in reservation['Instances']
+            if instance['State']['Name'] != state
+        ]
+
+
+    def _release_elastic_ips(self, instance_ids : list[str], max_concurrency : int) -> None:
+        addresses = []
+        for i in range(0, len(instance_ids), EC2_MAX_FILTER_VALUES):
+            addresses += self.ec2_client.describe_addresses(
+                Filters=[{'Name': 'instance-id', 'Values': instance_ids[i:i + EC2_MAX_FILTER_VALUES]}],
+            )['Addresses']
+        if not addresses:
+            return
+
+        def disassociate(address : dict) -> None:
+            try:
+                self.ec2_client.disassociate_address(AssociationId=address['AssociationId'])
+            except ClientError as error:
+                # Termination disassociates the address anyway; only the retag below is lost.
+                print(f"Fleet: Disassociating {address['PublicIp']} failed. {error}")
+
+        # There is no batch disassociate call, so those run concurrently; the retag is one call for every allocation.
+        print(f"Fleet: Releasing {len(addresses)} Elastic IP(s).")
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="eip") as executor:
+            list(executor.map(disassociate, addresses))
+        allocation_ids = [address['AllocationId'] for address in addresses]
+        for i in range(0, len(allocation_ids), EC2_MAX_BATCH_IDS):
+            self.ec2_client.create_tags(
+                Resources=allocation_ids[i:i + EC2_MAX_BATCH_IDS],
+                Tags=[
+                    {
+                        'Key': 'Name',
+                        'Value': 'AVAILABLE'
+                    },
+                    {
+                        "Key": "OrchestratorManaged",
+                        "Value": "True"
+                    },
+                ]
+            )
+
+
+    def _deregister_targets(self, tenants : list[SISTenant]) -> None:
+        # One deregister_targets per target group, taken from each tenant's OrchestratorTargetGroupArn tag.
+        targets_by_group = {}
+        for tenant in tenants:
+            if tenant.aws_target_group_arn:
+                targets_by_group.setdefault(tenant.aws_target_group_arn, []).append({'Id': tenant.aws_instance_id})
+        for target_group_arn, targets in targets_by_group.items():
+            try:
+                self.elb_client.deregister_targets(TargetGroupArn=target_group_arn, Targets=targets)
+            except ClientError as error:
+                # Termination deregisters the targets anyway; this only starts connection draining sooner.
+                print(f"Fleet: Deregistering {len(targets)} target(s) from {target_group_arn} failed. {error}")
+
+
+    def recycle_tenants(self, tenants : list[SISTenant], max_concurrency : int=4, fleet_commands : bool=False,
+                        strategy : RecycleStrategy=RecycleStrategy.REBUILD, stop_after_provisioning : bool=True) -> list[TenantOperationResult]:
+        # In-place strategies keep each instance, so only rebuilds can use fleet commands.
+        if not fleet_commands or strategy != RecycleStrategy.REBUILD:
+            self.inventory.refresh()
+            with self.deferred_dns_changes() as batch_results:
+                results = self._run_concurrently("recycle", self.recycle_tenant, tenants, max_concurrency, strategy=strategy,
+                                                 stop_after_provisioning=stop_after_provisioning)
+                batch_results += results
+            return results
+
+        recycle_list = [tenant for tenant in tenants if tenant.status == TenantStatus.PENDING_RECYCLE]
+        decommission_results = self.decommission_tenants(recycle_list, max_concurrency=max_concurrency)
+        results = self.provision_tenants(
+            [SISTenant(common_name=result.tenant.common_name, product=result.tenant.product) for result in decommission_results if result.succeeded],
+            max_concurrency=max_concurrency,
+            stop_after_provisioning=stop_after_provisioning,
+            fleet_commands=True,
+        )
+        for result in results:
+            result.operation = "recycle"
+        return results
+
+
+    def list_tenants(self) -> list[SISTenant]:
+        return self.inventory.all()
+
+
+class SISReservePool():
+
+
+    def __init__(self, orchestrator : SISOrchestrator, target_size : int=2, max_concurrency : int=4):
+        self.orchestrator = orchestrator
+        self.target_size = target_size
+        self.max_concurrency = max_concurrency
+        self._claim_lock = threading.Lock()
+        self._fill_lock = threading.Lock()
+        self._claimed_instance_ids = set()
+        self._refill_thread = None
+
+
+    def reserve_tenants(self, instance_states : tuple[str, ...]=('stopped',)) -> list[SISTenant]:
+        tenants = []
+        paginator = self.orchestrator.ec2_client.get_paginator('describe_instances')
+        for page in paginator.paginate(
+            Filters=[
+                {'Name': 'tag:OrchestratorManaged', 'Values': ['True']},
+                {'Name': 'tag:OrchestratorTenantStatus', 'Values': [TenantStatus.RESERVE.value]},
+                {'Name': 'instance-state-name', 'Values': list(instance_states)},
+            ],
+        ):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    if instance['InstanceId'] in self._claimed_instance_ids:
+                        continue
+                    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                    tenants.append(SISTenant(
+                        common_name=tags.get('Name', instance['InstanceId']),
+                        product=PowerSchoolProduct.SIS,
+                        status=TenantStatus.RESERVE,
+                        aws_instance_id=instance['InstanceId'],
+                        aws_private_ip=instance.get('PrivateIpAddress', ""),
+                        aws_instance_state=instance['State']['Name'],
+                    ))
+        return tenants
+
+
+    def fill(self) -> list[TenantOperationResult]:
+        with self._fill_lock:
+            # Reserves still booting or stopping count toward the target, or every fill would overbuild.
+            missing = self.target_size - len(self.reserve_tenants(('pending', 'running', 'stopping', 'stopped')))
+            if missing <= 0:
+                return []
+
+            print(f"Reserve Pool: Building {missing} reserve instance(s).")
+            tenants = [SISTenant(common_name=f"reserve-{uuid.uuid4().hex[:8]}", product=PowerSchoolProduct.SIS) for _ in range(missing)]
+            results = self.orchestrator.provision_tenants(tenants, max_concurrency=self.max_concurrency, stop_after_provisioning=True, update_dns=False)
+            for result in results:
+                if result.succeeded:
+                    result.tenant.status = TenantStatus.RESERVE
+                    self.orchestrator._update_orchestrator_status(result.tenant)
+            return results
+
+
+    def refill_in_background(self) -> None:
+        if self._refill_thread is not None and self._refill_thread.is_alive():
+            return
+        self._refill_thread = threading.Thread(target=self.fill, name="reserve-pool-refill", daemon=True)
+        self._refill_thread.start()
+
+
+    def claim(self, common_name : str, start : bool=True) -> SISTenant | None:
+        with self._claim_lock:
+            candidates = self.reserve_tenants()
+            if not candidates:
+                print(f"{common_name}: Reserve pool is empty.")
+                self.refill_in_background()
+                return None
+            tenant = candidates[0]
+            self._claimed_instance_ids.add(tenant.aws_instance_id)
+
+        reserve_name = tenant.common_name
+        print(f"{common_name}: Claiming reserve instance {tenant.aws_instance_id}.")
+        routed = False
+        try:
+            self._activate(tenant, common_name, start)
+            routed = True
+            if self.orchestrator.alb_routing and not self.orchestrator._dns_deferred:
+                self.orchestrator.await_tenants_healthy([tenant])
+        except (ClientError, WaiterError, RuntimeError, TimeoutError) as error:
+            print(f"{common_name}: Claiming reserve instance {tenant.aws_instance_id} failed, returning it to the pool. {error}")
+            self._release(tenant, reserve_name, routed)
+            return None
+        finally:
+            # Once tagged, the status tag is the durable claim; the in-memory set only covers the gap before it.
+            with self._claim_lock:
+                self._claimed_instance_ids.discard(tenant.aws_instance_id)
+
+        # The instance now carries the tenant's identity; drop the reserve record it was built under.
+        self.orchestrator.inventory.discard(reserve_name)
+        self.orchestrator.inventory.upsert(tenant)
+        self.orchestrator.state_store.forget_tenant(reserve_name)
+        self.orchestrator.state_store.save_tenant(tenant.common_name, tenant.product.value, tenant.status.value, tenant.aws_instance_id, tenant.aws_private_ip)
+        print(f"{common_name}: Reserve instance {tenant.aws_instance_id} claimed.")
+        self.refill_in_background()
+        return tenant
+
+
+    def _activate(self, tenant : SISTenant, common_name : str, start : bool) -> None:
+        tenant.common_name = common_name
+        tenant.status = TenantStatus.PENDING_APPLICATION_INSTALLATION
+        self.orchestrator.ec2_client.create_tags(
+            Resources=[
+                tenant.aws_instance_id,
+            ],
+            Tags=SISOrchestrator._instance_identity_tags(tenant.common_name, self.orchestrator.aws_config) + SISOrchestrator._managed_instance_tags(tenant.status)
+        )
+        # The ALB only registers running targets; a plain DNS record can point at a stopped reserve.
+        if start or self.orchestrator.alb_routing:
+            self.orchestrator.ec2_client.start_instances(InstanceIds=[tenant.aws_instance_id])
+            self.orchestrator.ec2_client.get_waiter('instance_running').wait(InstanceIds=[tenant.aws_instance_id])
+            tenant.aws_instance_state = "running"
+        self.orchestrator._add_route53_record(tenant)
+
+
+    def _release(self, tenant : SISTenant, reserve_name : str, routed : bool) -> None:
+        # Put the instance back the way fill() left it so the next claim can take it.
+        try:
+            if routed:
+                self.orchestrator._remove_route53_record(tenant)
+            self.orchestrator.ec2_client.create_tags(
+                Resources=[tenant.aws_instance_id],
+                Tags=[
+                    {'Key': 'Name', 'Value': reserve_name},
+                    {'Key': 'OrchestratorTenantStatus', 'Value': TenantStatus.RESERVE.value},
+                ],
+            )
+            self.orchestrator.ec2_client.delete_tags(Resources=[tenant.aws_instance_id], Tags=[{'Key': 'Domain'}])
+            if tenant.aws_instance_state != "stopped":
+                self.orchestrator._stop_tenants([tenant])
+        except (ClientError, WaiterError) as error:
+            print(f"{reserve_name}: Returning reserve instance {tenant.aws_instance_id} to the pool failed. {error}")
+        tenant.common_name = reserve_name
+        tenant.status = TenantStatus.RESERVE
+
+
+class SISTenantScheduler():
+    # Stops enrolled tenants outside their booked demo slots, then starts and warms them ahead of the next one.
+    # Only tenants tagged OrchestratorScheduled=True are ever stopped; booking a tenant enrolls it.
+    # The stop is a plain stop unless SISAWSConfiguration.hibernation_enabled is on (it defaults off) and the instance supports it.
+
+
+    def __init__(self, orchestrator : SISOrchestrator, prewarm_lead : timedelta=timedelta(minutes=30), idle_grace : timedelta=timedelta(minutes=60),
+                 max_concurrency : int=8, prewarm_requests : int=3, prewarm_timeout_seconds : float=1200.0):
+        self.orchestrator = orchestrator
+        self.prewarm_lead = prewarm_lead
+        self.idle_grace = idle_grace
+        self.max_concurrency = max_concurrency
+        self.prewarm_requests = prewarm_requests
+        self.prewarm_timeout_seconds = prewarm_timeout_seconds
+
+
+    def book(self, common_name : str, starts_at : datetime, ends_at : datetime) -> None:
+        print(f"{common_name}: Booked from {starts_at.isoformat()} to {ends_at.isoformat()}.")
+        self.orchestrator.state_store.save_booking(common_name, starts_at, ends_at)
+        tenant = self.orchestrator.inventory.get(common_name)
+        if tenant is not None and not tenant.aws_scheduled:
+            self.enroll([tenant])
+
+
+    def enroll(self, tenants : list[SISTenant]) -> None:
+        instance_ids = [tenant.aws_instance_id for tenant in tenants]
+        for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+            self.orchestrator.ec2_client.create_tags(
+                Resources=instance_ids[i:i + EC2_MAX_BATCH_IDS],
+                Tags=[
+                    {
+                        'Key': 'OrchestratorScheduled',
+                        'Value': 'True'
+                    },
+                ]
+            )
+        for tenant in tenants:
+            print(f"{tenant.common_name}: Enrolled in scheduled shutdown.")
+            tenant.aws_scheduled = True
+            self.orchestrator.inventory.upsert(tenant)
+
+
+    def _booked_names(self, now : datetime) -> set[str]:
+        # A tenant stays up from prewarm_lead before a booking until idle_grace after it.
+        return {booking["common_name"] for booking in self.orchestrator.state_store.bookings(now - self.idle_grace, now + self.prewarm_lead)}
+
+
+    def shutdown_idle(self, now : datetime | None=None) -> list[TenantOperationResult]:
+        now = now or datetime.now(timezone.utc)
+        booked = self._booked_names(now)
+        inventory = self.orchestrator.inventory
+        inventory.refresh()
+        candidates = [tenant for tenant in inventory.by_status(TenantStatus.ACTIVE) if tenant.aws_scheduled and tenant.common_name not in booked]
+        candidates += inventory.by_status(TenantStatus.PENDING_SHUTDOWN)
+        tenants = [tenant for tenant in candidates if tenant.aws_instance_state in ("pending", "running")]
+        if not tenants:
+            print("shutdown: No idle tenants.")
+            return []
+
+        tic = time.perf_counter()
+        results = [TenantOperationResult(tenant=tenant, operation="shutdown") for tenant in tenants]
+        print(f"Fleet: Shutting down {len(tenants)} idle tenant(s).")
+        self.orchestrator._update_orchestrator_statuses(tenants, TenantStatus.PENDING_SHUTDOWN)
+        with self.orchestrator.metrics.phase("fleet", "hibernate"):
+            self.orchestrator._stop_tenants(tenants, hibernate=True)
+            instance_ids = [tenant.aws_instance_id for tenant in tenants]
+            try:
+                for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+                    self.orchestrator.ec2_client.get_waiter('instance_stopped').wait(
+                        InstanceIds=instance_ids[i:i + EC2_MAX_BATCH_IDS],
+                        WaiterConfig={
+                            'Delay': 15,
+                            'MaxAttempts': 80
+                        }
+                    )
+            except WaiterError as error:
+                # Tenants left in PENDING_SHUTDOWN are picked up again on the next run.
+                print(f"Fleet: Not every instance reached stopped. {error}")
+                for result in results:
+                    result.error = f"WaiterError: {error}"
+                return results
+
+        self.orchestrator._update_orchestrator_statuses(tenants, TenantStatus.RETAIN)
+        for result in results:
+            result.tenant.aws_instance_state = "stopped"
+            self.orchestrator.inventory.upsert(result.tenant)
+            result.succeeded = True
+            result.elapsed_seconds = time.perf_counter() - tic
+        print(f"shutdown: {len(results)} tenant(s) retained.")
+        return results
+
+
+    def _prewarm(self, tenant : SISTenant) -> float:
+        # Loads the login page the way a demo starts, so Tomcat compiles its JSPs and opens its Oracle pool before anyone is watching.
+        url = f"https://{self.orchestrator._tenant_hostname(tenant)}{self.orchestrator.aws_config.health_check_path}"
+        tic = time.perf_counter()
+        served = 0
+        while served < self.prewarm_requests:
+            try:
+                with urllib.request.urlopen(url, timeout=60) as response:
+                    response.read()
+                served += 1
+                continue
+            except OSError as error:
+                if time.perf_counter() - tic >= self.prewarm_timeout_seconds:
+                    raise TimeoutError(f"{url} did not serve the login page within {self.prewarm_timeout_seconds:0.0f} seconds.") from error
+            time.sleep(5)
+        elapsed = time.perf_counter() - tic
+        print(f"{tenant.common_name}: Login page warm after {elapsed:0.1f} seconds.")
+        return elapsed
+
+
+    def prewarm_booked(self, now : datetime | None=None) -> list[TenantOperationResult]:
+        now = now or datetime.now(timezone.utc)
+        due = {booking["common_name"] for booking in self.orchestrator.state_store.bookings(now, now + self.prewarm_lead)}
+        inventory = self.orchestrator.inventory
+        inventory.refresh()
+        tenants = [
+            tenant for tenant in inventory.all()
+            if tenant.common_name in due and tenant.status in (TenantStatus.RETAIN, TenantStatus.ACTIVE) and tenant.aws_instance_state == "stopped"
+        ]
+        if not tenants:
+            return []
+
+        tic = time.perf_counter()
+        print(f"Fleet: Starting {len(tenants)} booked tenant(s).")
+        # A tenant that fails to start keeps its error; the rest are still started and warmed.
+        failed = {}
+        instance_ids = [tenant.aws_instance_id for tenant in tenants]
+        with self.orchestrator.metrics.phase("fleet", "start_booked"):
+            starting_ids = []
+            for i in range(0, len(instance_ids), EC2_MAX_BATCH_IDS):
+                chunk = instance_ids[i:i + EC2_MAX_BATCH_IDS]
+                try:
+                    self.orchestrator.ec2_client.start_instances(InstanceIds=chunk)
+                    starting_ids += chunk
+                except (ClientError, BotoCoreError) as error:
+                    for instance_id in chunk:
+                        failed[instance_id] = f"{type(error).__name__}: {error}"
+            for i in range(0, len(starting_ids), EC2_MAX_BATCH_IDS):
+                chunk = starting_ids[i:i + EC2_MAX_BATCH_IDS]
+                try:
+                    self.orchestrator.ec2_client.get_waiter('instance_running').wait(
+                        InstanceIds=chunk,
+                        WaiterConfig={
+                            'Delay': 5,
+                            'MaxAttempts': 120
+                        }
+                    )
+                except WaiterError as error:
+                    print(f"Fleet: Not every booked instance reached running. {error}")
+                    for instance_id in self.orchestrator._instances_not_in_state(chunk, 'running'):
+                        failed[instance_id] = f"WaiterError: Instance {instance_id} did not reach running. {error}"
+
+        started = [tenant for tenant in tenants if tenant.aws_instance_id not in failed]
+        for tenant in started:
+            tenant.aws_instance_state = "running"
+        try:
+            self.orchestrator._update_orchestrator_statuses(started, TenantStatus.ACTIVE)
+        except (ClientError, BotoCoreError) as error:
+            # The tenants are up either way; the tags catch up on the next start.
+            print(f"Fleet: Marking {len(started)} booked tenant(s) ACTIVE failed. {error}")
+        started_seconds = time.perf_counter() - tic
+
+        results = self.orchestrator._run_concurrently("prewarm", self._prewarm, started, self.max_concurrency)
+        for result in results:
+            result.elapsed_seconds += started_seconds
+        for tenant in tenants:
+            if tenant.aws_instance_id in failed:
+                print(f"{tenant.common_name}: Start failed. {failed[tenant.aws_instance_id]}")
+                results.append(TenantOperationResult(tenant=tenant, operation="prewarm", error=failed[tenant.aws_instance_id],
+                                                     elapsed_seconds=started_seconds))
+        return results
+
+
+    def run_once(self, now : datetime | None=None) -> list[TenantOperationResult]:
+        # Starting comes first so a tenant booked back to back is never stopped between slots.
+        now = now or datetime.now(timezone.utc)
+        results = self.prewarm_booked(now)
+        results += self.shutdown_idle(now)
+        self.orchestrator.state_store.forget_bookings(now - self.idle_grace)
+        return results
+
+
+    def run_forever(self, interval_seconds : float=300.0) -> None:
+        while True:
+            try:
+                self.run_once()
+            except Exception as error:
+                # One failed pass must not stop the scheduler; the next pass picks up whatever this one left.
+                print(f"scheduler: Run failed. {type(error).__name__}: {error}")
+                traceback.print_exc()
+            time.sleep(interval_seconds)
+
+
+class SISImageBuilder():
+    # Bakes the boot-invariant post-instantiation work into an AMI and leaves only the IP edits to a boot-time script.
+
+
+    def __init__(self, orchestrator : SISOrchestrator):
+        self.orchestrator = orchestrator
+        self.aws_config = orchestrator.aws_config
+
+
+    @staticmethod
+    def bootstrap_script() -> str:
+        # The IP placeholders stay in the image; this fills them in on each new instance before Oracle's listener comes up.
+        return "\n".join([
+            "$ErrorActionPreference = 'Stop'",
+            f"$marker = \"{BOOTSTRAP_MARKER_PATH}\"",
+            "Remove-Item -Path $marker -ErrorAction SilentlyContinue",
+            "try {",
+            "    $imdsToken = Invoke-RestMethod -Method Put -Uri http://169.254.169.254/latest/api/token -Headers @{'X-aws-ec2-metadata-token-ttl-seconds'='300'}",
+            "    $privateIp = Invoke-RestMethod -Uri http://169.254.169.254/latest/meta-data/local-ipv4 -Headers @{'X-aws-ec2-metadata-token'=$imdsToken}",
+            "    setx /M ORACLE_HOSTNAME $privateIp | Out-Null",
+            "    $Env:ORACLE_HOSTNAME = $privateIp",
+            "    $paths = @(",
+            "        \"$Env:ORACLE_HOME\\network\\admin\\tnsnames.ora\",",
+            "        \"$Env:ORACLE_HOME\\network\\admin\\listener.ora\",",
+            "        \"C:\\Program Files\\PowerSchool\\configuration\\services\\oracle\\service.properties\",",
+            "        \"C:\\Program Files\\PowerSchool\\configuration\\deployment.properties\",",
+            "        \"$Env:ORCHESTRATOR_HOME\\oracle_listener_update.sql\"",
+            "    )",
+            "    foreach ($path in $paths) {",
+            "        ((Get-Content -Path $path -Raw) -replace 'POWERSCHOOLSISPRIVATEIP', $privateIp) | Set-Content -Path $path",
+            "    }",
+            "    # The listener fails at boot while listener.ora still holds the placeholder.",
+            "    lsnrctl stop | Out-Null",
+            "    lsnrctl start | Out-Null",
+            "    Start-Service -Name \"OracleServicePSPRODDB\"",
+            "    Start-Service -Name \"OracleVssWriterPSPRODDB\"",
+            "    Start-Service -Name \"OracleJobSchedulerPSPRODDB\"",
+            "    sqlplus / as sysdba \"@$Env:ORCHESTRATOR_HOME\\oracle_listener_update.sql\" | Out-Null",
+            "    Restart-Service -Name \"PearsonPowerSchoolInstaller\"",
+            "    Set-Content -Path $marker -Value \"0|$privateIp\"",
+            "} catch {",
+            "    Set-Content -Path $marker -Value \"1|$($_ | Out-String)\"",
+            "}",
+        ])
+
+
+    def bake_command_steps(self) -> list[dict]:
+        return [
+            {
+            "Description" : "Setting OracleTNSListener Service to Automatic.",
+            "Command" : f"Set-Service -Name \"OracleOH19000TNSListener\" -StartupType Automatic"
+            },
+            {
+            "Description" : "Setting OracleService to Automatic.",
+            "Command" : f"Set-Service -Name \"OracleServicePSPRODDB\" -StartupType Automatic"
+            },
+            {
+            "Description" : "Setting TNS OracleJobScheduler Service to Automatic.",
+            "Command" : f"Set-Service -Name \"OracleJobSchedulerPSPRODDB\" -StartupType Automatic"
+            },
+            {
+            "Description": "Setting OracleVssWriter Service to Automatic.",
+            "Command" : f"Set-Service -Name \"OracleVssWriterPSPRODDB\" -StartupType Automatic"
+            },
+            {
+            "Description" : "Setting PowerSchool Installer Service to Automatic.",
+            "Command" : f"Set-Service -Name \"PearsonPowerSchoolInstaller\" -StartupType Automatic"
+            },
+            {
+            "Description" : "Writing Boot-Time Bootstrap Script.",
+            # The closing '@ of a here-string has to start its own line.
+            "Command" : f"Set-Content -Path \"{BOOTSTRAP_SCRIPT_PATH}\" -Value @'\n{self.bootstrap_script()}\n'@\n"
+            },
+            {
+            "Description" : "Resetting EC2Launch So User Data Runs on First Boot.",
+            "Command" : f"& \"$Env:ProgramFiles\\Amazon\\EC2Launch\\EC2Launch.exe\" reset --clean"
+            },
+        ]
+
+
+    def bake(self, activate : bool=True) -> str:
+        # Always bake from the untouched base image; a builder launched from a baked one would run the bootstrap and keep its IP.
+        orchestrator = self.orchestrator
+        builder = SISTenant(common_name=f"ami-builder-{uuid.uuid4().hex[:8]}", product=PowerSchoolProduct.SIS)
+        orchestrator._create_instance(builder, image_id=self.aws_config.base_ami_id, user_data="")
+        try:
+            orchestrator._await_ssm_availability(builder)
+            print(f"{builder.common_name}: Baking Post-Instantiation Steps")
+            orchestrator._run_powershell_steps(builder, orchestrator._keyed_steps("bake", self.bake_command_steps()))
+
+            orchestrator.ec2_client.stop_instances(InstanceIds=[builder.aws_instance_id])
+            orchestrator.ec2_client.get_waiter('instance_stopped').wait(InstanceIds=[builder.aws_instance_id])
+
+            image_name = f"sis-orchestrator-{date.today()}-{uuid.uuid4().hex[:8]}"
+            print(f"{builder.common_name}: Creating Image {image_name}.")
+            with orchestrator.metrics.phase(builder.common_name, "create_image"):
+                image_id = orchestrator.ec2_client.create_image(
+                    InstanceId=builder.aws_instance_id,
+                    Name=image_name,
+                    Description=f"SIS tenant image baked from {self.aws_config.base_ami_id} with a boot-time bootstrap",
+                    TagSpecifications=[
+                        {
+                            "ResourceType": "image",
+                            "Tags": [
+                                {
+                                    "Key": "Name",
+                                    "Value": image_name
+                                },
+                                {
+                                    "Key": "OrchestratorManaged",
+                                    "Value": "True"
+                                },
+                                {
+                                    "Key": "SourceImageId",
+                                    "Value": self.aws_config.base_ami_id
+                                },
+                            ]
+                        },
+                    ],
+                )['ImageId']
+                orchestrator.ec2_client.get_waiter('image_available').wait(
+                    ImageIds=[image_id],
+                    WaiterConfig={
+                        'Delay': 15,
+                        'MaxAttempts': 240
+                    }
+                )
+        finally:
+            print(f"{builder.common_name}: Terminating Image Builder {builder.aws_instance_id}")
+            orchestrator.ec2_client.terminate_instances(InstanceIds=[builder.aws_instance_id])
+            orchestrator.inventory.discard(builder.common_name)
+            orchestrator.state_store.forget_tenant(builder.common_name)
+
+        print(f"Image Builder: {image_id} is available. Set SISAWSConfiguration.ami_id = \"{image_id}\" and ami_bootstrapped = True to keep it.")
+        if activate:
+            self.aws_config.ami_id = image_id
+            self.aws_config.ami_bootstrapped = True
+            with orchestrator._launch_template_lock:
+                orchestrator._launch_template_ready = False
+        return image_id
+
+
+def __getattr__(name : str):
+    # The PM orchestrator moved to orchestrator_pm, which needs mysql-connector; it is only imported when someone asks for it here.
+    if name in ("PMOrchestrator", "refresh_fleet"):
+        import orchestrator_pm
+        return getattr(orchestrator_pm, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Actions
 def main():
     orchestrator = SISOrchestrator()
-    subdomain = "pssb2"
-    orchestrator.recycle_tenant(SISTenant(common_name=subdomain, product=PowerSchoolProduct.SIS, status=TenantStatus.PENDING_RECYCLE))
+    subdomains = ["pssb2"]
+    results = orchestrator.recycle_tenants(
+        [SISTenant(common_name=subdomain, product=PowerSchoolProduct.SIS, status=TenantStatus.PENDING_RECYCLE) for subdomain in subdomains],
+        max_concurrency=4,
+    )
+    for result in results:
+        outcome = "OK" if result.succeeded else f"FAILED ({result.error})"
+        print(f"{result.tenant.common_name}: {result.operation} {outcome} in {result.elapsed_seconds:0.1f} seconds.")
+
+    orchestrator.metrics.print_summary()
+    orchestrator.rate_limiter.print_summary()
+    orchestrator.metrics.write_json_lines("orchestrator_metrics.jsonl")
+    orchestrator.metrics.write_prometheus("orchestrator_metrics.prom")
     
 
 if __name__ == '__main__':
@@ -0,0 +1,223 @@
+import argparse
+import csv
+import json
+import sqlite3
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+
+from orchestrator_metrics import percentile
+from pm_support_builds import JOB_FINISHED_COLUMN, JOB_QUEUE_ID_COLUMN, JOB_STARTED_COLUMN, SUPPORT_SITE_SE_TENANTS, read_tenants_file
+
+
+# Data Classes
+@dataclass(kw_only=True)
+class BuildRecord():
+    job_id : int
+    client_id : str
+    db_name : str
+    status : str
+    scheduled_at : datetime
+    started_at : datetime | None
+    finished_at : datetime | None
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.finished_at - self.started_at).total_seconds()
+
+    @property
+    def queue_wait_seconds(self) -> float:
+        return (self.started_at - self.scheduled_at).total_seconds()
+
+
+@dataclass(kw_only=True)
+class BuildRegression():
+    job_id : int
+    client_id : str
+    db_name : str
+    finished_at : str
+    duration_seconds : float
+    baseline_seconds : float
+    slowdown : float
+
+
+@dataclass(kw_only=True)
+class TenantBuildSummary():
+    client_id : str
+    db_name : str
+    builds : int
+    errors : int
+    p50_seconds : float
+    p95_seconds : float
+    p50_queue_wait_seconds : float
+    p95_queue_wait_seconds : float
+    latest_seconds : float
+    baseline_seconds : float
+    regressed : bool
+
+
+# Support Functions
+def _timestamp(value) -> datetime | None:
+    # MySQL hands back datetimes; SQLite hands back the text it stored.
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def open_sqlite(path : str) -> sqlite3.Connection:
+    # The fixture lives under a pmi_build schema so the report's queries run unchanged; a .sql path is loaded into memory.
+    conn = sqlite3.connect(":memory:")
+    conn.execute("attach database ? as pmi_build", (":memory:" if path.endswith(".sql") else path,))
+    if path.endswith(".sql"):
+        with open(path, encoding="utf-8") as fixture:
+            conn.executescript(fixture.read())
+    return conn
+
+
+def fetch_builds(conn, client_ids : list[str], days : int, placeholder : str="%s") -> list[BuildRecord]:
+    client_ids = list(dict.fromkeys(str(client_id) for client_id in client_ids))
+    if not client_ids:
+        return []
+    placeholders = ", ".join([placeholder] * len(client_ids))
+    cursor = conn.cursor()
+    # job_queue timestamps are in the database's own clock (server local time for MySQL), so the window is measured from it too.
+    cursor.execute("select current_timestamp;")
+    since = _timestamp(cursor.fetchone()[0]) - timedelta(days=days)
+    cursor.execute(
+        f"""select {JOB_QUEUE_ID_COLUMN}, client_id, db_name, status, scheduled_start_timestamp, {JOB_STARTED_COLUMN}, {JOB_FINISHED_COLUMN}
+        from pmi_build.job_queue
+        where client_id in ({placeholders})
+        and status in ('Done', 'Error')
+        and build_group < 10
+        and scheduled_start_timestamp >= {placeholder}
+        order by scheduled_start_timestamp;""",
+        (*client_ids, since.strftime("%Y-%m-%d %H:%M:%S"))
+    )
+    return [
+        BuildRecord(job_id=int(job_id), client_id=str(client_id), db_name=db_name, status=status,
+                    scheduled_at=_timestamp(scheduled_at), started_at=_timestamp(started_at), finished_at=_timestamp(finished_at))
+        for job_id, client_id, db_name, status, scheduled_at, started_at, finished_at in cursor.fetchall()
+    ]
+
+
+def _completed_by_client(builds : list[BuildRecord]) -> dict[str, list[BuildRecord]]:
+    by_client = {}
+    for build in builds:
+        if build.status == "Done" and build.started_at and build.finished_at:
+            by_client.setdefault(build.client_id, []).append(build)
+    return by_client
+
+
+def find_regressions(builds : list[BuildRecord], baseline_builds : int=10, min_baseline : int=3, threshold : float=0.25) -> list[BuildRegression]:
+    # Each build is held against the median of the same tenant's previous builds, so a tenant is only ever compared with itself.
+    regressions = []
+    for client_id, completed in _completed_by_client(builds).items():
+        for index, build in enumerate(completed):
+            window = completed[max(0, index - baseline_builds):index]
+            if len(window) < min_baseline:
+                continue
+            baseline = percentile([previous.duration_seconds for previous in window], 0.50)
+            if baseline > 0 and build.duration_seconds > baseline * (1 + threshold):
+                regressions.append(BuildRegression(
+                    job_id=build.job_id,
+                    client_id=client_id,
+                    db_name=build.db_name,
+                    finished_at=build.finished_at.isoformat(sep=" "),
+                    duration_seconds=build.duration_seconds,
+                    baseline_seconds=baseline,
+                    slowdown=build.duration_seconds / baseline,
+                ))
+    return regressions
+
+
+def summarize(builds : list[BuildRecord], regressions : list[BuildRegression], baseline_builds : int=10) -> list[TenantBuildSummary]:
+    completed_by_client = _completed_by_client(builds)
+    regressed_job_ids = {regression.job_id for regression in regressions}
+    summaries = []
+    for client_id in dict.fromkeys(build.client_id for build in builds):
+        completed = completed_by_client.get(client_id, [])
+        durations = [build.duration_seconds for build in completed]
+        waits = [build.queue_wait_seconds for build in completed]
+        window = completed[-baseline_builds - 1:-1]
+        summaries.append(TenantBuildSummary(
+            client_id=client_id,
+            db_name=next(build.db_name for build in builds if build.client_id == client_id),
+            builds=len(completed),
+            errors=sum(1 for build in builds if build.client_id == client_id and build.status == "Error"),
+            p50_seconds=percentile(durations, 0.50),
+            p95_seconds=percentile(durations, 0.95),
+            p50_queue_wait_seconds=percentile(waits, 0.50),
+            p95_queue_wait_seconds=percentile(waits, 0.95),
+            latest_seconds=durations[-1] if durations else 0.0,
+            baseline_seconds=percentile([build.duration_seconds for build in window], 0.50),
+            regressed=bool(completed) and completed[-1].job_id in regressed_job_ids,
+        ))
+    return summaries
+
+
+def write_csv(path : str, summaries : list[TenantBuildSummary]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=[field.name for field in fields(TenantBuildSummary)])
+        writer.writeheader()
+        for summary in summaries:
+            writer.writerow(asdict(summary))
+
+
+def write_json(path : str, summaries : list[TenantBuildSummary], regressions : list[BuildRegression]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"tenants": [asdict(summary) for summary in summaries], "regressions": [asdict(regression) for regression in regressions]}, file, indent=2)
+
+
+def print_summary(summaries : list[TenantBuildSummary], regressions : list[BuildRegression]) -> None:
+    for summary in summaries:
+        flag = " REGRESSED" if summary.regressed else ""
+        print(
+            f"{summary.db_name}: {summary.builds} builds, {summary.errors} errors, "
+            f"p50={summary.p50_seconds / 60:0.1f}m p95={summary.p95_seconds / 60:0.1f}m, "
+            f"wait p50={summary.p50_queue_wait_seconds / 60:0.1f}m p95={summary.p95_queue_wait_seconds / 60:0.1f}m, "
+            f"latest={summary.latest_seconds / 60:0.1f}m vs baseline {summary.baseline_seconds / 60:0.1f}m{flag}"
+        )
+    for regression in regressions:
+        print(f"    REGRESSION: {regression.db_name} build {regression.job_id} at {regression.finished_at} took {regression.duration_seconds / 60:0.1f}m, {regression.slowdown:0.2f}x its baseline")
+
+
+# Actions
+def main():
+    parser = argparse.ArgumentParser(description="Report Performance Matters build durations and regressions from pmi_build.job_queue.")
+    parser.add_argument("--tenants-file", help="CSV with a client_id column (and optionally db_name).")
+    parser.add_argument("--client-id", action="append", default=[], help="Client to report on; may be repeated.")
+    parser.add_argument("--days", type=int, default=90, help="How far back to read build history.")
+    parser.add_argument("--sqlite", help="Read from a SQLite database or .sql fixture instead of the ops database.")
+    parser.add_argument("--baseline-builds", type=int, default=10, help="Previous builds each build is compared against.")
+    parser.add_argument("--min-baseline", type=int, default=3, help="Builds a tenant needs before it can regress.")
+    parser.add_argument("--regression-threshold", type=float, default=0.25)
+    parser.add_argument("--output", help="Write the report here; .json includes each regression, anything else is written as CSV.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    arguments = parser.parse_args()
+
+    se_tenants = read_tenants_file(arguments.tenants_file) if arguments.tenants_file else []
+    se_tenants += [{"db_name": "", "client_id": client_id} for client_id in arguments.client_id]
+    client_ids = [se_tenant["client_id"] for se_tenant in se_tenants or SUPPORT_SITE_SE_TENANTS]
+
+    if arguments.sqlite:
+        builds = fetch_builds(open_sqlite(arguments.sqlite), client_ids, arguments.days, placeholder="?")
+    else:
+        # Imported here so --sqlite runs without the MySQL driver installed.
+        import ops_db
+        with ops_db.shared_pool().connection() as conn:
+            builds = fetch_builds(conn, client_ids, arguments.days)
+
+    regressions = find_regressions(builds, arguments.baseline_builds, arguments.min_baseline, arguments.regression_threshold)
+    summaries = summarize(builds, regressions, arguments.baseline_builds)
+    print_summary(summaries, regressions)
+    if arguments.output and arguments.output.endswith(".json"):
+        write_json(arguments.output, summaries, regressions)
+    elif arguments.output:
+        write_csv(arguments.output, summaries)
+
+    # Only a tenant's latest build fails the run; older regressions stay in the report as history.
+    if arguments.fail_on_regression and any(summary.regressed for summary in summaries):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
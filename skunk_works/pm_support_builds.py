@@ -1,101 +1,427 @@
-import getpass
+import argparse
+import csv
 import time
+from dataclasses import dataclass
 
-import mysql.connector
 
+JOB_QUEUE_ID_COLUMN = "job_queue_id"
+JOB_STARTED_COLUMN = "start_timestamp"
+JOB_FINISHED_COLUMN = "end_timestamp"
+BUILD_TERMINAL_STATUSES = {"Done", "Error"}
 
-# Actions
-def main():
-    host = "opsdb-01.p2.pmstudent.powerschool.host"
-    username = input("Username: ")
-    password = getpass.getpass()
+SUPPORT_SITE_SE_TENANTS = [
+    {
+        "db_name": "tx_applegrove",
+        "client_id": "31009987"
+    },
+    {
+        "db_name": "us_apple",
+        "client_id": "3100683"
+    },
+    {
+        "db_name": "us_apple2",
+        "client_id": "3100860"
+    },
+    {
+        "db_name": "us_pssb",
+        "client_id": "31009660"
+    },
+]
 
-    try:
-        conn = mysql.connector.connect(
-            host=host,
-            user=username,
-            password=password
+
+# Data Classes
+@dataclass(kw_only=True)
+class BuildOutcome():
+    job_id : int
+    db_name : str
+    status : str
+    elapsed_seconds : float
+    client_id : str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == "Done"
+
+
+@dataclass(kw_only=True)
+class QueuedBuild():
+    job_id : int
+    client_id : str
+    db_name : str
+
+
+@dataclass(kw_only=True)
+class PlannedBuild():
+    client_id : str
+    db_name : str
+    build_group : int
+    expected_seconds : float
+
+
+# Support Classes
+class BuildWatcher():
+    # Polls only the queue rows of jobs still running, by primary key, and backs off while nothing changes.
+
+
+    def __init__(self, cursor, min_delay : float=2.0, max_delay : float=60.0, backoff_factor : float=1.5):
+        self.cursor = cursor
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+
+
+    def progress(self, job_ids : list[int]) -> dict[int, tuple[str, float]]:
+        # Each job's status and its build time by the database clock: from the row's own start to its end, or to now while it runs.
+        placeholders = ", ".join(["%s"] * len(job_ids))
+        self.cursor.execute(
+            f"""select {JOB_QUEUE_ID_COLUMN}, status, timestampdiff(second, {JOB_STARTED_COLUMN}, coalesce({JOB_FINISHED_COLUMN}, now()))
+            from pmi_build.job_queue
+            where {JOB_QUEUE_ID_COLUMN} in ({placeholders});""",
+            tuple(job_ids)
         )
-    except mysql.connector.errors.ProgrammingError:
-        print("Invalid Password, Try Again")
-        return
+        # A job no processing server has started yet has no build time.
+        return {int(job_id): (status, float(build_seconds or 0)) for job_id, status, build_seconds in self.cursor.fetchall()}
 
-    conn.autocommit = True
-    cursor = conn.cursor()
 
-    support_site_se_tenants = [
-        {
-            "db_name": "tx_applegrove",
-            "client_id": "31009987"
-        },
-        {
-            "db_name": "us_apple",
-            "client_id": "3100683"
-        },
-        {
-            "db_name": "us_apple2",
-            "client_id": "3100860"
-        },
-        {
-            "db_name": "us_pssb",
-            "client_id": "31009660"
-        },
-    ]
+    def statuses(self, job_ids : list[int]) -> dict[int, str]:
+        return {job_id: status for job_id, (status, _) in self.progress(job_ids).items()}
+
+
+    def watch(self, jobs : dict[int, str], timeout_seconds : float=14400.0):
+        # Yields each job's outcome, timed from its own queue row, as soon as it finishes; jobs still running at the timeout
+        # are yielded with their last status.
+        tic = time.perf_counter()
+        pending = dict(jobs)
+        last_statuses = {}
+        delay = self.min_delay
+        while pending:
+            progress = self.progress(list(pending))
+            statuses = {job_id: status for job_id, (status, _) in progress.items()}
+            for job_id, db_name in list(pending.items()):
+                # A row that vanished was cancelled out of the queue before it built anything.
+                status, build_seconds = progress.get(job_id, ("Cancelled", 0.0))
+                if status in BUILD_TERMINAL_STATUSES or job_id not in progress:
+                    del pending[job_id]
+                    yield BuildOutcome(job_id=job_id, db_name=db_name, status=status, elapsed_seconds=build_seconds)
+
+            if not pending:
+                break
+            if time.perf_counter() - tic >= timeout_seconds:
+                for job_id, db_name in pending.items():
+                    status, build_seconds = progress.get(job_id, ("", 0.0))
+                    yield BuildOutcome(job_id=job_id, db_name=db_name, status=status, elapsed_seconds=build_seconds)
+                break
+
+            changed = statuses != last_statuses
+            last_statuses = statuses
+            delay = self.min_delay if changed else min(self.max_delay, delay * self.backoff_factor)
+            time.sleep(delay)
+
+
+class BuildScheduler():
+    # Releases builds in waves sized to the free processing-server slots of each build group, longest expected build first.
+
+
+    def __init__(self, conn, slots_per_server : int=1, history_days : int=30, min_delay : float=5.0, max_delay : float=60.0, backoff_factor : float=1.5):
+        self.conn = conn
+        self.slots_per_server = slots_per_server
+        self.history_days = history_days
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.unscheduled = []
+        self.unreleased = []
+
+
+    def _free_slots(self, cursor, servers : dict[int, set[int]], build_groups : set[int]) -> dict[int, int]:
+        # Idle server slots in each group, less the READY jobs (ours or anyone's) already waiting for one.
+        depth = queue_depth(cursor)
+        free = {}
+        for build_group in build_groups:
+            in_flight = depth.get(build_group, {})
+            group_servers = servers.get(build_group, set()) | {server for server in in_flight if server != 0}
+            if group_servers:
+                capacity = sum(max(0, self.slots_per_server - in_flight.get(server, 0)) for server in group_servers)
+            else:
+                capacity = self.slots_per_server
+            free[build_group] = capacity - in_flight.get(0, 0)
+        return free
+
+
+    def run(self, client_ids : list[str], timeout_seconds : float=14400.0, on_release=None):
+        # Yields each build's outcome as it finishes, timed from its own release, and hands each wave to on_release as it is queued.
+        # Clients without a schedule end up in unscheduled, and builds still held back at the timeout in unreleased.
+        tic = time.perf_counter()
+        cursor = self.conn.cursor()
+        remaining = plan_builds(cursor, client_ids, self.history_days)
+        planned_client_ids = {build.client_id for build in remaining}
+        self.unscheduled = [str(client_id) for client_id in client_ids if str(client_id) not in planned_client_ids]
+        self.unreleased = []
+        servers = processing_servers(cursor, self.history_days)
+        watcher = BuildWatcher(cursor)
+        released = {}
+        starved = set()
+        delay = self.min_delay
+        while remaining or released:
+            changed = False
+            if released:
+                statuses = watcher.statuses(list(released))
+                for job_id, (build, released_at) in list(released.items()):
+                    status = statuses.get(job_id, "Cancelled")
+                    if status in BUILD_TERMINAL_STATUSES or job_id not in statuses:
+                        del released[job_id]
+                        changed = True
+                        yield BuildOutcome(job_id=job_id, db_name=build.db_name, client_id=build.client_id, status=status,
+                                           elapsed_seconds=time.perf_counter() - released_at)
 
-    status_query_condition = ""
+            if remaining:
+                free = self._free_slots(cursor, servers, {build.build_group for build in remaining})
+                wave = []
+                for build in remaining:
+                    if free[build.build_group] > 0:
+                        free[build.build_group] -= 1
+                        wave.append(build)
+                if wave:
+                    remaining = [build for build in remaining if build not in wave]
+                    print(f"Releasing a wave of {len(wave)} build(s); {len(remaining)} still held back.")
+                    released_at = time.perf_counter()
+                    queued = queue_builds(self.conn, [build.client_id for build in wave])
+                    for build in queued:
+                        released[build.job_id] = (build, released_at)
+                    if on_release is not None:
+                        on_release(queued)
+                    changed = True
 
-    for se_tenant in support_site_se_tenants:
+                # Reported once each time a group runs out of room, not on every poll while it stays full.
+                held_back = {}
+                for build in remaining:
+                    held_back[build.build_group] = held_back.get(build.build_group, 0) + 1
+                for build_group in sorted(set(held_back) - starved):
+                    print(f"Build group {build_group} has no free processing server slot; holding back {held_back[build_group]} build(s).")
+                starved = set(held_back)
 
-        print(f"Kicking off build for {se_tenant['db_name']}.")
+            if not remaining and not released:
+                break
+            if time.perf_counter() - tic >= timeout_seconds:
+                for job_id, (build, released_at) in released.items():
+                    yield BuildOutcome(job_id=job_id, db_name=build.db_name, client_id=build.client_id, status="", elapsed_seconds=time.perf_counter() - released_at)
+                self.unreleased = remaining
+                break
 
-        if status_query_condition:
-            status_query_condition += ", "
+            delay = self.min_delay if changed else min(self.max_delay, delay * self.backoff_factor)
+            time.sleep(delay)
 
-        cursor.execute(f"""
-        insert into
-        pmi_build.job_queue(db_name, build_group, client_id, status, processing_server_id, scheduled_start_timestamp) 
-        select
-            db,
-            build_group,
-            client_id,
-            'READY',
-            0,
-            now() 
-        from
-            pmi_build.job_schedule 
-        where
-            client_id = {se_tenant['client_id']} 
-            and proc_name = 'etl_imp' limit 1 ;"""
-                       )
 
-        status_query_condition += f"'{se_tenant['db_name']}'"
+# Support Functions
+def plan_builds(cursor, client_ids : list[str], history_days : int=30) -> list[PlannedBuild]:
+    # Longest-expected-first keeps the slowest builds off the tail of the make-span.
+    client_ids = list(dict.fromkeys(str(client_id) for client_id in client_ids))
+    if not client_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(client_ids))
+    cursor.execute(
+        f"""select client_id, any_value(db), any_value(build_group)
+        from pmi_build.job_schedule
+        where client_id in ({placeholders})
+        and proc_name = 'etl_imp'
+        group by client_id;""",
+        tuple(client_ids)
+    )
+    scheduled = {str(client_id): (db_name, int(build_group)) for client_id, db_name, build_group in cursor.fetchall()}
+    if not scheduled:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(scheduled))
+    cursor.execute(
+        f"""select client_id, avg(timestampdiff(second, {JOB_STARTED_COLUMN}, {JOB_FINISHED_COLUMN}))
+        from pmi_build.job_queue
+        where client_id in ({placeholders})
+        and status = 'Done'
+        and build_group < 10
+        and {JOB_FINISHED_COLUMN} >= now() - interval %s day
+        group by client_id;""",
+        (*scheduled, history_days)
+    )
+    history = {str(client_id): float(seconds) for client_id, seconds in cursor.fetchall() if seconds is not None}
+    # Clients with no recent build are assumed to take as long as the average one that has.
+    default_seconds = sum(history.values()) / len(history) if history else 0.0
+    plan = [
+        PlannedBuild(client_id=client_id, db_name=db_name, build_group=build_group, expected_seconds=history.get(client_id, default_seconds))
+        for client_id, (db_name, build_group) in scheduled.items()
+    ]
+    return sorted(plan, key=lambda build: build.expected_seconds, reverse=True)
+
+
+def queue_depth(cursor) -> dict[int, dict[int, int]]:
+    # Unfinished jobs per build group and processing server; server 0 holds READY jobs no server has taken yet.
+    cursor.execute(
+        """select build_group, processing_server_id, count(*)
+        from pmi_build.job_queue
+        where status not in ('Done', 'Error')
+        and db_name not like '%pend'
+        and build_group < 10
+        group by build_group, processing_server_id;"""
+    )
+    depth = {}
+    for build_group, processing_server_id, jobs in cursor.fetchall():
+        depth.setdefault(int(build_group), {})[int(processing_server_id)] = int(jobs)
+    return depth
+
 
+def processing_servers(cursor, history_days : int=30) -> dict[int, set[int]]:
+    # The servers that have taken each build group's jobs recently stand in for its pool of workers.
     cursor.execute(
-        f"""select count(*) as pending from pmi_build.job_queue 
-        where status <> 'Done' 
-        and db_name not like '%pend' 
-        and build_group < 10 
-        and db_name in ({status_query_condition});
-        """)
-    result_set = cursor.fetchone()
-    pending_builds = result_set[0]
-    while True:
-        if pending_builds == 0:
-            break
-
-        print(f"Pending Builds: {pending_builds}", end="\r")
-        time.sleep(3)
+        """select distinct build_group, processing_server_id
+        from pmi_build.job_queue
+        where processing_server_id <> 0
+        and build_group < 10
+        and scheduled_start_timestamp >= now() - interval %s day;""",
+        (history_days,)
+    )
+    servers = {}
+    for build_group, processing_server_id in cursor.fetchall():
+        servers.setdefault(int(build_group), set()).add(int(processing_server_id))
+    return servers
+
+
+def queue_builds(conn, client_ids : list[str]) -> list[QueuedBuild]:
+    # One transaction keeps a failed batch from half-queueing. Each client gets its own insert, so each job id is that
+    # insert's lastrowid; a multi-row insert's ids can interleave with other sessions' under innodb_autoinc_lock_mode=2.
+    client_ids = list(dict.fromkeys(str(client_id) for client_id in client_ids))
+    if not client_ids:
+        return []
+    cursor = conn.cursor()
+    conn.start_transaction()
+    try:
+        job_ids = []
+        for client_id in client_ids:
+            cursor.execute(
+                """insert into
+                pmi_build.job_queue(db_name, build_group, client_id, status, processing_server_id, scheduled_start_timestamp)
+                select
+                    any_value(db),
+                    any_value(build_group),
+                    client_id,
+                    'READY',
+                    0,
+                    now()
+                from
+                    pmi_build.job_schedule
+                where
+                    client_id = %s
+                    and proc_name = 'etl_imp'
+                group by client_id;""",
+                (client_id,)
+            )
+            if cursor.rowcount:
+                job_ids.append(cursor.lastrowid)
+        queued = []
+        if job_ids:
+            placeholders = ", ".join(["%s"] * len(job_ids))
+            cursor.execute(
+                f"""select {JOB_QUEUE_ID_COLUMN}, client_id, db_name
+                from pmi_build.job_queue
+                where {JOB_QUEUE_ID_COLUMN} in ({placeholders});""",
+                tuple(job_ids)
+            )
+            queued = [QueuedBuild(job_id=int(job_id), client_id=str(client_id), db_name=db_name) for job_id, client_id, db_name in cursor.fetchall()]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return queued
+
+
+def read_tenants_file(path : str) -> list[dict]:
+    # A CSV with a client_id column and, optionally, db_name, like SUPPORT_SITE_SE_TENANTS.
+    with open(path, newline="") as tenants_file:
+        return [
+            {"db_name": (row.get("db_name") or "").strip(), "client_id": row["client_id"].strip()}
+            for row in csv.DictReader(tenants_file)
+            if (row.get("client_id") or "").strip()
+        ]
+
+
+def cancel_queued_builds(conn, job_ids : list[int]) -> set[int]:
+    # Only builds no processing server has picked up yet can be withdrawn; returns the job ids that were.
+    job_ids = list(dict.fromkeys(int(job_id) for job_id in job_ids))
+    if not job_ids:
+        return set()
+    placeholders = ", ".join(["%s"] * len(job_ids))
+    cursor = conn.cursor()
+    conn.start_transaction()
+    try:
         cursor.execute(
-            f"""select count(*) as pending from pmi_build.job_queue 
-            where status not in ('Done', 'Error') 
-            and db_name not like '%pend' 
-            and build_group < 10 
-            and db_name in ({status_query_condition});
-            """)
-        result_set = cursor.fetchone()
-        pending_builds = result_set[0]
-
-    print(f"No further pending builds for {status_query_condition} tenants. Done!")
+            f"""select {JOB_QUEUE_ID_COLUMN}
+            from pmi_build.job_queue
+            where {JOB_QUEUE_ID_COLUMN} in ({placeholders})
+            and status = 'READY'
+            for update;""",
+            tuple(job_ids)
+        )
+        cancelled = {int(job_id) for job_id, in cursor.fetchall()}
+        if cancelled:
+            placeholders = ", ".join(["%s"] * len(cancelled))
+            cursor.execute(
+                f"""delete from pmi_build.job_queue
+                where {JOB_QUEUE_ID_COLUMN} in ({placeholders});""",
+                tuple(cancelled)
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cancelled
+
+
+# Actions
+def main():
+    parser = argparse.ArgumentParser(description="Queue Performance Matters builds and follow them to completion.")
+    parser.add_argument("--tenants-file", help="CSV with a client_id column (and optionally db_name).")
+    parser.add_argument("--client-id", action="append", default=[], help="Client to rebuild; may be repeated.")
+    parser.add_argument("--slots-per-server", type=int, default=1, help="Builds each processing server runs at once.")
+    parser.add_argument("--all-at-once", action="store_true", help="Queue every build immediately instead of in waves.")
+    args = parser.parse_args()
+
+    se_tenants = read_tenants_file(args.tenants_file) if args.tenants_file else []
+    se_tenants += [{"db_name": "", "client_id": client_id} for client_id in args.client_id]
+    if not se_tenants:
+        se_tenants = SUPPORT_SITE_SE_TENANTS
+
+    # Imported here so the build helpers above load without the MySQL driver, e.g. for pm_build_report --sqlite.
+    import mysql.connector
+    import ops_db
+    try:
+        pool = ops_db.shared_pool()
+    except mysql.connector.errors.ProgrammingError:
+        print("Invalid Password, Try Again")
+        return
+
+    print(f"Kicking off builds for {len(se_tenants)} tenant(s).")
+    with pool.connection() as conn:
+        if args.all_at_once:
+            queued = queue_builds(conn, [se_tenant['client_id'] for se_tenant in se_tenants])
+            queued_client_ids = {build.client_id for build in queued}
+            unscheduled = [se_tenant['client_id'] for se_tenant in se_tenants if se_tenant['client_id'] not in queued_client_ids]
+            outcomes = BuildWatcher(conn.cursor()).watch({build.job_id: build.db_name for build in queued})
+        else:
+            scheduler = BuildScheduler(conn, slots_per_server=args.slots_per_server)
+            outcomes = scheduler.run([se_tenant['client_id'] for se_tenant in se_tenants])
+
+        finished = 0
+        for outcome in outcomes:
+            finished += 1
+            print(f"{outcome.db_name}: Build {outcome.job_id} {outcome.status} after {outcome.elapsed_seconds:0.0f} seconds. {finished} build(s) finished.")
+        unreleased = []
+        if not args.all_at_once:
+            unscheduled = scheduler.unscheduled
+            unreleased = scheduler.unreleased
+
+    for client_id in unscheduled:
+        print(f"{client_id}: No etl_imp schedule for client {client_id}.")
+    for build in unreleased:
+        print(f"{build.db_name}: Never released; build group {build.build_group} had no free processing server slot before the timeout.")
+    print(f"No further pending builds for {finished} tenant(s). Done!")
 
 
 if __name__ == '__main__':
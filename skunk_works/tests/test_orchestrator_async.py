@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("aiobotocore")
+
+from botocore.exceptions import ClientError
+
+from orchestrator_async import AsyncSISOrchestrator, run_benchmark
+from orchestrator_benchmark import SimulatedAWS, SimulatedAWSProfile
+from orchestrator_v2 import PowerSchoolProduct, SISTenant, StockRestoreMode, TenantStatus
+
+FAST_PROFILE = SimulatedAWSProfile(call_latency=0.001, boot_seconds=0.05, ssm_seconds=0.05, step_seconds=0.01, dns_insync_seconds=0.05)
+
+
+def _provision(backend : SimulatedAWS, common_names : list[str], stock_restore_mode : StockRestoreMode=StockRestoreMode.SERIAL, **kwargs) -> list:
+    async def run():
+        async with AsyncSISOrchestrator(session=backend, poll_delay=0.02, max_poll_delay=0.05) as orchestrator:
+            orchestrator.stock_restore_mode = stock_restore_mode
+            return await orchestrator.provision_tenants([SISTenant(common_name=name, product=PowerSchoolProduct.SIS) for name in common_names], **kwargs)
+    return asyncio.run(run())
+
+
+def test_provision_tenants_against_simulator_publishes_dns():
+    backend = SimulatedAWS(FAST_PROFILE)
+    results = _provision(backend, ["async0", "async1", "async2"])
+
+    assert all(result.succeeded for result in results), [result.error for result in results]
+    assert {result.tenant.status for result in results} == {TenantStatus.PENDING_APPLICATION_INSTALLATION}
+    assert {name for name, _ in backend.record_sets} >= {"async0.powerschoolsales.com", "async1.powerschoolsales.com", "async2.powerschoolsales.com"}
+    assert backend.calls["route53:get_change"] >= 1
+
+
+def test_failed_dns_batch_fails_its_tenants():
+    def unavailable(**kwargs):
+        raise RuntimeError("Route53 is down")
+
+    backend = SimulatedAWS(FAST_PROFILE)
+    backend._route53_change_resource_record_sets = unavailable
+    results = _provision(backend, ["async0", "async1"])
+
+    assert not any(result.succeeded for result in results)
+    assert all(result.error.startswith("DNS publish failed.") for result in results)
+
+
+def test_rejected_dns_batch_is_bisected_down_to_the_bad_record():
+    backend = SimulatedAWS(FAST_PROFILE)
+    change_resource_record_sets = backend._route53_change_resource_record_sets
+
+    def reject_bad_records(HostedZoneId : str, ChangeBatch : dict, **kwargs):
+        if any(change['ResourceRecordSet']['Name'].startswith("bad") for change in ChangeBatch['Changes']):
+            raise ClientError({'Error': {'Code': 'InvalidChangeBatch', 'Message': "RRSet with DNS name bad is not permitted"}}, 'ChangeResourceRecordSets')
+        return change_resource_record_sets(HostedZoneId=HostedZoneId, ChangeBatch=ChangeBatch, **kwargs)
+
+    backend._route53_change_resource_record_sets = reject_bad_records
+    results = _provision(backend, ["async0", "async1", "bad2", "async3"])
+
+    assert [result.succeeded for result in results] == [True, True, False, True]
+    assert results[2].error.startswith("DNS publish failed. ClientError")
+    assert {name for name, _ in backend.record_sets} >= {"async0.powerschoolsales.com", "async1.powerschoolsales.com", "async3.powerschoolsales.com"}
+
+
+def test_stock_restore_follows_the_restore_mode():
+    backend = SimulatedAWS(FAST_PROFILE)
+    commands = []
+    backend.command_handler = lambda instance_id, command: commands.append(command) or 0
+    results = _provision(backend, ["async0"], restore_stock_schema=True, stock_restore_mode=StockRestoreMode.PARALLEL)
+
+    assert results[0].succeeded, results[0].error
+    assert any("impdp" in command and "parallel=" in command for command in commands)
+    assert not any("import psproddb stock.dmp" in command for command in commands)
+
+
+def test_decommission_skips_reserve_and_unmanaged_instances():
+    backend = SimulatedAWS(FAST_PROFILE)
+    active_id = backend.seed_tenant("shared")
+    reserve_id = backend.seed_tenant("shared", status=TenantStatus.RESERVE)
+    unmanaged_id = backend.seed_tenant("shared")
+    backend.instances[unmanaged_id]['Tags'] = [tag for tag in backend.instances[unmanaged_id]['Tags'] if tag['Key'] != 'OrchestratorManaged']
+
+    async def run():
+        async with AsyncSISOrchestrator(session=backend, poll_delay=0.02) as orchestrator:
+            await orchestrator.decommission_tenant(SISTenant(common_name="shared", product=PowerSchoolProduct.SIS))
+    asyncio.run(run())
+
+    assert backend.instances[active_id]['State']['Name'] == 'shutting-down'
+    assert backend.instances[reserve_id]['State']['Name'] == 'running'
+    assert backend.instances[unmanaged_id]['State']['Name'] == 'running'
+
+
+def test_benchmark_harness_against_moto_server(monkeypatch):
+    moto_server = pytest.importorskip("moto.server")
+    from aiobotocore.session import get_session
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        # The second run finds the fixtures the first one seeded.
+        reports = [asyncio.run(run_benchmark(concurrency, get_session(), f"http://{host}:{port}", poll_delay=0.02)) for concurrency in (2, 3)]
+    finally:
+        server.stop()
+
+    assert [report["succeeded"] for report in reports] == [2, 3]
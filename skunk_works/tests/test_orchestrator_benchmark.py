@@ -0,0 +1,57 @@
+import json
+from dataclasses import asdict, replace
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("botocore")
+
+from orchestrator_benchmark import BenchmarkReport, SimulatedAWSProfile, find_regressions, run_scenario
+from orchestrator_v2 import RecycleStrategy
+
+FAST_PROFILE = SimulatedAWSProfile(call_latency=0.001, boot_seconds=0.05, ssm_seconds=0.05, stop_seconds=0.05, step_seconds=0.01,
+                                   snapshot_seconds=0.05, replace_root_seconds=0.05, dns_insync_seconds=0.05, health_check_seconds=0.05)
+
+
+def _report(**overrides) -> BenchmarkReport:
+    report = BenchmarkReport(scenario="provision", strategy="REBUILD", tenants=10, concurrency=5, profile=asdict(FAST_PROFILE),
+                             tenants_per_hour=1000.0, p50_seconds=30.0, p95_seconds=40.0, api_calls_per_tenant=15.0)
+    return replace(report, **overrides)
+
+
+def _write_history(path, *reports : BenchmarkReport) -> str:
+    with open(path, "w", encoding="utf-8") as file:
+        for report in reports:
+            file.write(json.dumps(asdict(report)) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("scenario", ["provision", "decommission"])
+def test_run_scenario_against_simulator(scenario):
+    report = run_scenario(scenario, 2, 2, RecycleStrategy.REBUILD, FAST_PROFILE)
+
+    assert report.succeeded == 2
+    assert report.tenants_per_hour > 0
+    assert report.api_calls_per_tenant > 0
+    assert report.api_calls
+
+
+def test_find_regressions_without_history(tmp_path):
+    assert find_regressions(_report(), str(tmp_path / "missing.jsonl"), 0.10) == []
+
+
+def test_find_regressions_flags_slower_run(tmp_path):
+    history = _write_history(tmp_path / "history.jsonl", _report())
+    regressions = find_regressions(_report(tenants_per_hour=800.0, p95_seconds=50.0), history, 0.10)
+
+    assert regressions == ["tenants/hour 1000 -> 800", "p95_seconds 40.0 -> 50.0"]
+
+
+def test_find_regressions_uses_latest_comparable_run(tmp_path):
+    history = _write_history(tmp_path / "history.jsonl",
+                             _report(p50_seconds=10.0),
+                             _report(p50_seconds=32.0),
+                             _report(concurrency=50, p50_seconds=100.0))
+
+    assert find_regressions(_report(p50_seconds=33.0), history, 0.10) == []
+    assert find_regressions(_report(p50_seconds=33.0, alb_routing=True), history, 0.10) == []
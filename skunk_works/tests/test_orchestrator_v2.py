@@ -0,0 +1,225 @@
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("botocore")
+
+from botocore.exceptions import ClientError
+
+from orchestrator_benchmark import SimulatedAWS, SimulatedAWSProfile
+from orchestrator_v2 import CommandStepError, PowerSchoolProduct, Route53ChangeBatcher, SISOrchestrator, SISReservePool, SISTenant, SSMReadinessTracker, TenantStatus
+
+# Waiters poll at AWS's own delays, so every simulated transition finishes before the first check.
+INSTANT_PROFILE = SimulatedAWSProfile(call_latency=0.0, boot_seconds=0.0, ssm_seconds=0.0, stop_seconds=0.0, step_seconds=0.0,
+                                      snapshot_seconds=0.0, replace_root_seconds=0.0, dns_insync_seconds=0.0, health_check_seconds=0.0)
+
+
+def _orchestrator(backend : SimulatedAWS, tmp_path) -> SISOrchestrator:
+    orchestrator = SISOrchestrator(state_store_path=str(tmp_path / "orchestrator_state.db"), session_factory=backend.session)
+    orchestrator.readiness_tracker.min_delay = 0.01
+    orchestrator.readiness_tracker.max_delay = 0.05
+    return orchestrator
+
+
+class SimulatedOracleHost():
+    # Stands in for the instance side of each step: the listener stays up once started, and a step can be made to fail once.
+
+
+    def __init__(self, fail_once : str=""):
+        self.listening = set()
+        self.fail_once = fail_once
+        self.commands = []
+
+
+    def __call__(self, instance_id : str, command : str) -> int:
+        self.commands.append(command)
+        if self.fail_once and self.fail_once in command:
+            self.fail_once = ""
+            return 1
+        if "lsnrctl" in command:
+            if instance_id in self.listening:
+                # lsnrctl start on a running listener is TNS-01106; only a status check first gets past it.
+                return 0 if "lsnrctl status" in command else 1
+            self.listening.add(instance_id)
+        return 0
+
+
+def test_resume_reruns_listener_start_against_running_listener(tmp_path):
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    host = SimulatedOracleHost(fail_once="sqlplus / as sysdba")
+    backend.command_handler = host
+    orchestrator = _orchestrator(backend, tmp_path)
+
+    with pytest.raises(CommandStepError):
+        orchestrator.provision_tenant(SISTenant(common_name="resume", product=PowerSchoolProduct.SIS), stop_after_provisioning=False)
+    assert len(host.listening) == 1
+
+    tenant = SISTenant(common_name="resume", product=PowerSchoolProduct.SIS)
+    orchestrator.provision_tenant(tenant, stop_after_provisioning=False)
+
+    assert len(backend.instances) == 1
+    assert tenant.status == TenantStatus.PENDING_APPLICATION_INSTALLATION
+    assert sum(1 for command in host.commands if "lsnrctl" in command) == 2
+    assert sum(1 for command in host.commands if command.startswith("setx")) == 1
+    assert orchestrator.state_store.completed_steps("resume") == set()
+
+
+def test_fleet_provision_leaves_no_checkpoints_to_resume_onto(tmp_path, monkeypatch):
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    orchestrator = _orchestrator(backend, tmp_path)
+    # Fleet commands are polled from a 5s first delay; the instant profile has them finished already.
+    monkeypatch.setattr("orchestrator_v2.time.sleep", lambda seconds: None)
+
+    results = orchestrator.provision_tenants([SISTenant(common_name="fleet0", product=PowerSchoolProduct.SIS)], fleet_commands=True)
+    assert all(result.succeeded for result in results), [result.error for result in results]
+    assert orchestrator.state_store.completed_steps("fleet0") == set()
+
+    # A later single build of the same name starts over on a new instance instead of resuming onto the live one.
+    first_instance_id = results[0].tenant.aws_instance_id
+    tenant = SISTenant(common_name="fleet0", product=PowerSchoolProduct.SIS)
+    orchestrator.provision_tenant(tenant)
+    assert tenant.aws_instance_id != first_instance_id
+
+
+class FlakySSMClient():
+    # describe_instance_information that raises a non-boto error on its first sweep, then reports everything online.
+
+
+    def __init__(self):
+        self.sweeps = 0
+
+
+    def get_paginator(self, operation_name : str):
+        return self
+
+
+    def paginate(self, Filters : list[dict]):
+        self.sweeps += 1
+        if self.sweeps == 1:
+            raise KeyError("InstanceInformationList")
+        return [{'InstanceInformationList': [{'InstanceId': instance_id, 'PingStatus': "Online"} for instance_id in Filters[0]['Values']]}]
+
+
+def test_readiness_poller_survives_unexpected_errors():
+    ssm_client = FlakySSMClient()
+    tracker = SSMReadinessTracker(ssm_client, min_delay=0.01, max_delay=0.05, deadline_seconds=5.0)
+
+    result = tracker.wait("i-0123456789abcdef0")
+
+    assert result.ready
+    assert ssm_client.sweeps == 2
+
+
+def test_recycle_claims_reserve_under_the_tenant_name_without_starting_it(tmp_path, monkeypatch):
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    orchestrator = _orchestrator(backend, tmp_path)
+    orchestrator.reserve_pool = SISReservePool(orchestrator, target_size=1)
+    monkeypatch.setattr(orchestrator.reserve_pool, "refill_in_background", lambda: None)
+
+    [reserve] = [result.tenant for result in orchestrator.reserve_pool.fill()]
+    tenant = SISTenant(common_name="acme", product=PowerSchoolProduct.SIS)
+    orchestrator.provision_tenant(tenant)
+    tenant.status = TenantStatus.PENDING_RECYCLE
+    starts = backend.calls.get("ec2:start_instances", 0)
+
+    claimed_tenant = orchestrator.recycle_tenant(tenant)
+
+    assert claimed_tenant.aws_instance_id == reserve.aws_instance_id
+    assert backend.calls.get("ec2:start_instances", 0) == starts
+    assert backend.instances[reserve.aws_instance_id]['State']['Name'] == "stopped"
+    assert orchestrator.state_store.tenant(reserve.common_name) is None
+    assert orchestrator.state_store.tenant("acme")["aws_instance_id"] == reserve.aws_instance_id
+    assert orchestrator.inventory.get(reserve.common_name) is None
+
+
+def test_inventory_adopts_instances_launched_before_managed_tagging(tmp_path):
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    orchestrator = _orchestrator(backend, tmp_path)
+    ec2_client = backend.session().client("ec2")
+    [instance] = ec2_client.run_instances(MinCount=1, MaxCount=1, TagSpecifications=[
+        {'ResourceType': 'instance', 'Tags': [{'Key': 'Name', 'Value': "legacy"}]},
+    ])['Instances']
+
+    tenant = orchestrator.inventory.get("legacy")
+
+    assert tenant.aws_instance_id == instance['InstanceId']
+    assert tenant.status == TenantStatus.ACTIVE
+    orchestrator.inventory.refresh()
+    assert [tenant.common_name for tenant in orchestrator.list_tenants()] == ["legacy"]
+
+    # An unknown name costs one lookup per sweep, not one per call.
+    describes = backend.calls["ec2:describe_instances"]
+    assert orchestrator.inventory.get("nobody") is None
+    assert orchestrator.inventory.get("nobody") is None
+    assert backend.calls["ec2:describe_instances"] == describes + 1
+
+
+def test_dns_flush_resolves_every_delete_from_one_zone_listing():
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    batcher = Route53ChangeBatcher(backend.session().client("route53"), "Z0000000000000")
+    for i in range(305):
+        batcher.upsert(f"tenant{i:03}.example.com", "10.0.0.1")
+    batcher.flush()
+
+    # Queued with a stale TTL; the DELETE is rebuilt from the live record set or Route53 would reject it.
+    batcher.delete("tenant000.example.com", "10.0.0.1", ttl=60)
+    batcher.delete("tenant304.example.com", "10.0.0.1", ttl=60)
+    batcher.delete("gone.example.com", "10.0.0.1")
+    changes = backend.calls["route53:change_resource_record_sets"]
+    batcher.flush()
+
+    # 305 records is two pages of 300, listed once for all three DELETEs.
+    assert backend.calls["route53:list_resource_record_sets"] == 2
+    assert backend.calls["route53:change_resource_record_sets"] == changes + 1
+    assert len(backend.record_sets) == 303
+    assert ("tenant000.example.com", "A") not in backend.record_sets
+    assert batcher.pending() == 0
+
+
+@pytest.mark.parametrize("fleet_commands", [False, True])
+def test_batch_builds_capture_baselines_when_enabled(tmp_path, monkeypatch, fleet_commands):
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    orchestrator = _orchestrator(backend, tmp_path)
+    orchestrator.capture_baselines = True
+    monkeypatch.setattr("orchestrator_v2.time.sleep", lambda seconds: None)
+
+    tenants = [SISTenant(common_name=f"baseline{i}", product=PowerSchoolProduct.SIS) for i in range(2)]
+    results = orchestrator.provision_tenants(tenants, fleet_commands=fleet_commands)
+
+    assert all(result.succeeded for result in results), [result.error for result in results]
+    snapshot_ids = {orchestrator._baseline_snapshot_id(result.tenant) for result in results}
+    assert snapshot_ids <= backend.snapshots.keys() and len(snapshot_ids) == 2
+
+
+def test_bulk_launch_builds_each_tenant_on_its_launched_instance(tmp_path):
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    orchestrator = _orchestrator(backend, tmp_path)
+
+    tenants = [SISTenant(common_name=f"bulk{i}", product=PowerSchoolProduct.SIS) for i in range(3)]
+    results = orchestrator.provision_tenants(tenants, bulk_launch=True)
+
+    assert all(result.succeeded for result in results), [result.error for result in results]
+    assert len(backend.instances) == 3
+
+
+def test_refused_bulk_launch_fails_every_tenant_instead_of_raising(tmp_path):
+    def insufficient_capacity(**kwargs):
+        raise ClientError({'Error': {'Code': 'InsufficientInstanceCapacity', 'Message': "Insufficient capacity."}}, 'RunInstances')
+
+    backend = SimulatedAWS(INSTANT_PROFILE)
+    backend._ec2_run_instances = insufficient_capacity
+    orchestrator = _orchestrator(backend, tmp_path)
+
+    tenants = [SISTenant(common_name=f"bulk{i}", product=PowerSchoolProduct.SIS) for i in range(3)]
+    results = orchestrator.provision_tenants(tenants, bulk_launch=True)
+
+    assert len(results) == 3
+    assert all(not result.succeeded and "InsufficientInstanceCapacity" in result.error for result in results)
+
+
+def test_pm_orchestrator_is_still_importable_from_orchestrator_v2():
+    pytest.importorskip("mysql.connector")
+    import orchestrator_pm
+    from orchestrator_v2 import PMOrchestrator, refresh_fleet
+
+    assert PMOrchestrator is orchestrator_pm.PMOrchestrator
+    assert refresh_fleet is orchestrator_pm.refresh_fleet
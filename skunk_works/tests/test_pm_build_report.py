@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pm_build_report import BuildRecord, fetch_builds, find_regressions, open_sqlite, summarize
+from pm_support_builds import SUPPORT_SITE_SE_TENANTS
+
+FIXTURE = Path(__file__).resolve().parents[2] / "sql" / "PerformanceMatters" / "job_queue_fixture.sql"
+
+
+def _fixture_builds(days : int=90):
+    client_ids = [se_tenant["client_id"] for se_tenant in SUPPORT_SITE_SE_TENANTS]
+    return fetch_builds(open_sqlite(str(FIXTURE)), client_ids, days, placeholder="?")
+
+
+def test_fixture_flags_us_apple_latest_build():
+    builds = _fixture_builds()
+    regressions = find_regressions(builds)
+    summaries = {summary.db_name: summary for summary in summarize(builds, regressions)}
+
+    assert "us_apple" in {regression.db_name for regression in regressions}
+    assert summaries["us_apple"].regressed
+    assert summaries["us_apple"].latest_seconds > summaries["us_apple"].baseline_seconds
+    assert not any(summary.regressed for name, summary in summaries.items() if name != "us_apple")
+
+
+def test_fixture_counts_errors_without_timing_them():
+    builds = _fixture_builds()
+    summaries = {summary.db_name: summary for summary in summarize(builds, find_regressions(builds))}
+
+    assert summaries["us_pssb"].errors == 1
+    assert all(summary.errors == 0 for name, summary in summaries.items() if name != "us_pssb")
+    assert summaries["us_pssb"].builds == sum(1 for build in builds if build.db_name == "us_pssb" and build.status == "Done")
+
+
+def test_window_is_measured_from_database_clock():
+    assert _fixture_builds(days=90)
+    assert not _fixture_builds(days=0)
+
+
+def test_only_latest_build_marks_tenant_regressed():
+    start = datetime(2026, 1, 1)
+    minutes = [40, 40, 40, 90, 40]
+    builds = [
+        BuildRecord(job_id=index, client_id="1", db_name="us_apple", status="Done", scheduled_at=start + timedelta(days=index),
+                    started_at=start + timedelta(days=index), finished_at=start + timedelta(days=index, minutes=duration))
+        for index, duration in enumerate(minutes)
+    ]
+    regressions = find_regressions(builds)
+
+    assert [regression.job_id for regression in regressions] == [3]
+    assert not summarize(builds, regressions)[0].regressed
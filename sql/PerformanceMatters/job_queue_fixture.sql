@@ -0,0 +1,51 @@
+-- SQLite fixture of pmi_build.job_queue history for skunk_works/pm_build_report.py:
+--     python pm_build_report.py --sqlite ../sql/PerformanceMatters/job_queue_fixture.sql
+-- Timestamps are relative to now so the rows always fall inside the report window.
+-- us_apple's latest build runs well over its baseline, and us_pssb has one build that ended in Error.
+CREATE TABLE IF NOT EXISTS pmi_build.job_queue (
+	job_queue_id INTEGER PRIMARY KEY,
+	db_name VARCHAR(64) NOT NULL,
+	build_group INT NOT NULL,
+	client_id INT NOT NULL,
+	status VARCHAR(16) NOT NULL,
+	processing_server_id INT NOT NULL DEFAULT 0,
+	scheduled_start_timestamp DATETIME,
+	start_timestamp DATETIME,
+	end_timestamp DATETIME
+);
+
+INSERT INTO
+	pmi_build.job_queue(db_name, build_group, client_id, status, processing_server_id, scheduled_start_timestamp, start_timestamp, end_timestamp)
+VALUES
+	('tx_applegrove', 1, 31009987, 'Done', 1, datetime('now', '-16 days'), datetime('now', '-16 days', '+6 minutes'), datetime('now', '-16 days', '+46 minutes')),
+	('us_apple', 1, 3100683, 'Done', 2, datetime('now', '-16 days'), datetime('now', '-16 days', '+7 minutes'), datetime('now', '-16 days', '+68 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 3, datetime('now', '-16 days'), datetime('now', '-16 days', '+2 minutes'), datetime('now', '-16 days', '+44 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 1, datetime('now', '-16 days'), datetime('now', '-16 days', '+2 minutes'), datetime('now', '-16 days', '+54 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 2, datetime('now', '-14 days'), datetime('now', '-14 days', '+1 minutes'), datetime('now', '-14 days', '+47 minutes')),
+	('us_apple', 1, 3100683, 'Done', 3, datetime('now', '-14 days'), datetime('now', '-14 days', '+4 minutes'), datetime('now', '-14 days', '+65 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 1, datetime('now', '-14 days'), datetime('now', '-14 days', '+2 minutes'), datetime('now', '-14 days', '+42 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 2, datetime('now', '-14 days'), datetime('now', '-14 days', '+7 minutes'), datetime('now', '-14 days', '+55 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 3, datetime('now', '-12 days'), datetime('now', '-12 days', '+4 minutes'), datetime('now', '-12 days', '+43 minutes')),
+	('us_apple', 1, 3100683, 'Done', 1, datetime('now', '-12 days'), datetime('now', '-12 days', '+9 minutes'), datetime('now', '-12 days', '+76 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 2, datetime('now', '-12 days'), datetime('now', '-12 days', '+1 minutes'), datetime('now', '-12 days', '+36 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 3, datetime('now', '-12 days'), datetime('now', '-12 days', '+4 minutes'), datetime('now', '-12 days', '+51 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 1, datetime('now', '-10 days'), datetime('now', '-10 days', '+7 minutes'), datetime('now', '-10 days', '+45 minutes')),
+	('us_apple', 1, 3100683, 'Done', 2, datetime('now', '-10 days'), datetime('now', '-10 days', '+4 minutes'), datetime('now', '-10 days', '+65 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 3, datetime('now', '-10 days'), datetime('now', '-10 days', '+9 minutes'), datetime('now', '-10 days', '+45 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 1, datetime('now', '-10 days'), datetime('now', '-10 days', '+5 minutes'), datetime('now', '-10 days', '+58 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 2, datetime('now', '-8 days'), datetime('now', '-8 days', '+3 minutes'), datetime('now', '-8 days', '+49 minutes')),
+	('us_apple', 1, 3100683, 'Done', 3, datetime('now', '-8 days'), datetime('now', '-8 days', '+2 minutes'), datetime('now', '-8 days', '+67 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 1, datetime('now', '-8 days'), datetime('now', '-8 days', '+9 minutes'), datetime('now', '-8 days', '+45 minutes')),
+	('us_pssb', 1, 31009660, 'Error', 2, datetime('now', '-8 days'), datetime('now', '-8 days', '+2 minutes'), datetime('now', '-8 days', '+14 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 3, datetime('now', '-6 days'), datetime('now', '-6 days', '+6 minutes'), datetime('now', '-6 days', '+45 minutes')),
+	('us_apple', 1, 3100683, 'Done', 1, datetime('now', '-6 days'), datetime('now', '-6 days', '+9 minutes'), datetime('now', '-6 days', '+71 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 2, datetime('now', '-6 days'), datetime('now', '-6 days', '+1 minutes'), datetime('now', '-6 days', '+38 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 3, datetime('now', '-6 days'), datetime('now', '-6 days', '+8 minutes'), datetime('now', '-6 days', '+63 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 1, datetime('now', '-4 days'), datetime('now', '-4 days', '+7 minutes'), datetime('now', '-4 days', '+50 minutes')),
+	('us_apple', 1, 3100683, 'Done', 2, datetime('now', '-4 days'), datetime('now', '-4 days', '+8 minutes'), datetime('now', '-4 days', '+76 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 3, datetime('now', '-4 days'), datetime('now', '-4 days', '+6 minutes'), datetime('now', '-4 days', '+44 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 1, datetime('now', '-4 days'), datetime('now', '-4 days', '+4 minutes'), datetime('now', '-4 days', '+53 minutes')),
+	('tx_applegrove', 1, 31009987, 'Done', 2, datetime('now', '-2 days'), datetime('now', '-2 days', '+4 minutes'), datetime('now', '-2 days', '+43 minutes')),
+	('us_apple', 1, 3100683, 'Done', 3, datetime('now', '-2 days'), datetime('now', '-2 days', '+5 minutes'), datetime('now', '-2 days', '+135 minutes')),
+	('us_apple2', 1, 3100860, 'Done', 1, datetime('now', '-2 days'), datetime('now', '-2 days', '+8 minutes'), datetime('now', '-2 days', '+47 minutes')),
+	('us_pssb', 1, 31009660, 'Done', 2, datetime('now', '-2 days'), datetime('now', '-2 days', '+8 minutes'), datetime('now', '-2 days', '+59 minutes'));